@@ -0,0 +1,642 @@
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+import main
+import synthetic
+import text_engine
+from schema import RESULTS_SCHEMA, apply_schema, without_schema
+from sinks import ExcelSink
+
+# Numbers of finishers per result list of the benchmark suite
+SUITE_SIZES: Tuple[int, ...] = (100, 1_000, 10_000, 100_000)
+
+# The years and layouts of the synthetic result lists, not 2012, which takes the birth years from a supplement
+SYNTHETIC_YEARS: Dict[int, str] = {2030: "2012", 2031: "2023"}
+
+# Writing and reading Excel files takes minutes for larger lists, so it is only measured up to this size
+EXCEL_MAX_FINISHERS: int = 10_000
+
+# The saved results of the benchmark suite, reports/benchmarks/baseline.json in the project directory
+BASELINE_FILE: str = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "reports", "benchmarks", "baseline.json"
+)
+
+# A result is a regression if it is slower than the baseline by this factor and by more than the minimum time,
+# smaller differences are within the noise of the measurement
+REGRESSION_FACTOR: float = 1.5
+REGRESSION_MIN_SECONDS: float = 0.005
+
+# How often a size with a regression is measured again before the regression is reported,
+# a regression only counts if the function is slower than the baseline in every run
+CONFIRM_RUNS: int = 2
+
+# The key of the time of the calibration workload in the results of each size, see calibrate
+CALIBRATION: str = "calibration"
+
+# The maximum start times of the light commands of the command line interface in seconds
+STARTUP_BUDGETS: Dict[str, float] = {"--help": 0.5, "validate": 0.5, "query": 1.5}
+
+# The arguments of the light commands, '{results}' is replaced by the file of write_startup_results
+STARTUP_COMMANDS: Dict[str, List[str]] = {
+    "--help": ["--help"],
+    "validate": ["validate"],
+    "query": ["query", "--results", "{results}", "rank", "--year", "2031", "--time", "45:00"],
+}
+
+# Modules the light commands must not import, they take most of the start time of main.py
+HEAVY_MODULES: Tuple[str, ...] = ("pandas", "numpy", "openpyxl", "tabula", "jpype", "pypdfium2", "pyarrow")
+
+# The queries need pandas and pyarrow for the saved results, but not the extraction pipeline
+PIPELINE_MODULES: Tuple[str, ...] = (
+    "main",
+    "text_engine",
+    "corrections",
+    "supplements",
+    "openpyxl",
+    "tabula",
+    "jpype",
+    "pypdfium2",
+)
+
+# The modules each light command must not import
+STARTUP_FORBIDDEN_MODULES: Dict[str, Tuple[str, ...]] = {
+    "--help": HEAVY_MODULES,
+    "validate": HEAVY_MODULES,
+    "query": PIPELINE_MODULES,
+}
+
+
+def copy_archive(copies: int, target_dir: str) -> int:
+    """
+    This function fills a directory with copies of the PDF files in data/raw to simulate a larger archive.
+    Every copy gets its own year prefix, so it is processed as a separate race.
+
+    Parameters:
+    copies (int): The number of copies of each PDF file
+    target_dir (str): The directory the copies are written to
+
+    Returns:
+    int: The number of PDF files in the directory
+    """
+    filenames = list(main.filenames_and_prefix_from_dir(main.get_pdf_dir()))
+    for i in range(copies):
+        for filename in filenames:
+            # The year prefixes 1000, 1001, ... are never used by real races
+            shutil.copyfile(
+                os.path.join(main.get_pdf_dir(), filename), os.path.join(target_dir, f"{1000 + i}_{filename}")
+            )
+    return copies * len(filenames)
+
+
+def measure(func: Callable[[], Any]) -> Tuple[Any, float, int]:
+    """
+    This function calls a function and measures its run time and the peak of the memory allocated by Python.
+
+    Parameters:
+    func (Callable[[], Any]): The function to measure
+
+    Returns:
+    Tuple[Any, float, int]: The result of the function, the run time in seconds and the peak memory in bytes
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = func()
+        seconds = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, seconds, peak
+
+
+def benchmark_memory(copies: int) -> None:
+    """
+    This function compares the peak memory of building the combined dataframe in memory
+    with streaming the pages into the Excel file, for an archive of copies of the PDF files in data/raw.
+    The PDF files are read from the table cache, so the first run also fills the cache.
+
+    Parameters:
+    copies (int): The number of copies of each PDF file
+    """
+    with tempfile.TemporaryDirectory() as pdf_dir:
+        files = copy_archive(copies, pdf_dir)
+        output_file = os.path.join(pdf_dir, "benchmark.xlsx")
+
+        def build_in_memory() -> int:
+            return len(main.get_one_dataframe(main.get_dataframes(pdf_dir=pdf_dir), output_file))
+
+        def stream() -> int:
+            with ExcelSink(output_file) as sink:
+                return main.stream_results(sink, pdf_dir=pdf_dir)
+
+        # Fill the table cache, so both variants measure the same work
+        main.get_dataframes(pdf_dir=pdf_dir)
+
+        print(f"{files} PDF files")
+        for name, func in [("in memory", build_in_memory), ("streaming", stream)]:
+            rows, seconds, peak = measure(func)
+            print(f"{name:>10}: {rows} rows, {seconds:.2f} s, peak memory {peak / 1024 / 1024:.1f} MB")
+
+
+def make_page(rows: int, year: str = "2023") -> pd.DataFrame:
+    """
+    This function creates a processed page with the layout of the output of clean_table.
+
+    Parameters:
+    rows (int): The number of rows of the page
+    year (str): The year of competition
+
+    Returns:
+    pd.DataFrame: The processed page
+    """
+    return pd.DataFrame(
+        {
+            "C1": [f"{i + 1}." for i in range(rows)],
+            "C2": [f"{i // 10 + 1}.M35" for i in range(rows)],
+            "C3": [str(200 + i) for i in range(rows)],
+            "C4": ["Ludwig"] * rows,
+            "C5": ["Christian"] * rows,
+            "C6": ["nan"] * rows,
+            "C7": ["1987"] * rows,
+            "C8": ["m"] * rows,
+            "Zeit": [f"{37 + i // 60:02d}:{i % 60:02d}" for i in range(rows)],
+            "Jahr": [year] * rows,
+        }
+    )
+
+
+def benchmark_scaling(page_counts: Tuple[int, ...] = (10, 100, 1000), rows_per_page: int = 50) -> Dict[int, float]:
+    """
+    This function measures how the time to combine the processed pages grows with the number of pages.
+    With a single concatenation the time per page stays constant.
+
+    Parameters:
+    page_counts (Tuple[int, ...]): The numbers of pages to combine
+    rows_per_page (int): The number of rows of each page
+
+    Returns:
+    Dict[int, float]: The time in seconds for each number of pages
+    """
+    results = {}
+    for pages in page_counts:
+        dic = {f"split_df{j + 1}": make_page(rows_per_page) for j in range(pages)}
+        start = time.perf_counter()
+        one_df = main.combine_dataframes(dic.values())
+        results[pages] = time.perf_counter() - start
+        print(
+            f"{pages:>6} pages, {len(one_df):>7} rows: {results[pages]:.3f} s, "
+            f"{results[pages] / pages * 1000:.2f} ms per page"
+        )
+    return results
+
+
+def benchmark_stages(repeat: int = 20) -> Dict[str, float]:
+    """
+    This function measures the time of each stage of the cleaning chain on the pages of the PDF files in data/raw.
+    The PDF files are read from the table cache.
+
+    Parameters:
+    repeat (int): How often every page is cleaned
+
+    Returns:
+    Dict[str, float]: The total time in seconds of each stage
+    """
+    pdf_dir = main.get_pdf_dir()
+    pages = []
+    for filename, year in main.filenames_and_prefix_from_dir(pdf_dir).items():
+        tables, _ = main.extract_pdf(os.path.join(pdf_dir, filename), year)
+        pages.extend(enumerate(tables))
+
+    totals: Dict[str, float] = {}
+    for _ in range(repeat):
+        for page_index, table in pages:
+            df = table.copy()
+            for name, stage in main.cleaning_stages(page_index):
+                start = time.perf_counter()
+                df = stage(df)
+                totals[name] = totals.get(name, 0.0) + time.perf_counter() - start
+
+    # Print the stages with the time per page
+    runs = repeat * len(pages)
+    for name, seconds in totals.items():
+        print(f"{name:>30}: {seconds / runs * 1000:7.2f} ms per page")
+    print(f"{'total':>30}: {sum(totals.values()) / runs * 1000:7.2f} ms per page")
+    return totals
+
+
+def benchmark_engines(repeat: int = 3) -> Dict[str, float]:
+    """
+    This function compares the extraction engines on the PDF files in data/raw without the table cache.
+    The first run of each engine includes its start, e.g. the start of the JVM for tabula.
+    The result of each engine is compared cell by cell with the result of tabula.
+
+    Parameters:
+    repeat (int): How often the PDF files are processed with each engine
+
+    Returns:
+    Dict[str, float]: The time in seconds of the first run of each engine
+    """
+    results: Dict[str, pd.DataFrame] = {}
+    first_runs: Dict[str, float] = {}
+    for engine in main.ENGINES:
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            df = main.get_one_dataframe(main.get_dataframes(use_cache=False, engine=engine), None)
+            times.append(time.perf_counter() - start)
+        results[engine] = without_schema(df)
+        first_runs[engine] = times[0]
+        print(f"{engine:>7}: {len(df)} rows, first run {times[0]:.2f} s, then {min(times[1:], default=times[0]):.2f} s")
+
+    # Count the cells that differ from tabula, both missing counts as equal
+    reference = results["tabula"]
+    for engine, df in results.items():
+        if engine != "tabula" and df.shape == reference.shape:
+            different = (df != reference) & ~(df.isna() & reference.isna())
+            print(
+                f"{engine:>7}: {int(different.to_numpy().sum())} cells in {int(different.any(axis=1).sum())} rows differ from tabula"
+            )
+        elif engine != "tabula":
+            print(f"{engine:>7}: {len(df)} rows instead of {len(reference)} rows of tabula")
+    return first_runs
+
+
+def best_time(func: Callable[[], Any], repeat: int) -> float:
+    """
+    This function calls a function several times and returns the shortest run time,
+    which is the least disturbed by other processes.
+
+    Parameters:
+    func (Callable[[], Any]): The function to measure
+    repeat (int): The number of calls
+
+    Returns:
+    float: The shortest run time in seconds
+    """
+    times = []
+    for _ in range(max(repeat, 1)):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def calibrate(repeat: int = 5) -> float:
+    """
+    This function measures a fixed workload of Python and pandas that does not use the code of the project.
+    Its time is saved with the results of each size, so the times of the baseline can be scaled to the speed
+    the machine has in a later run, e.g. on a shared machine or with another CPU frequency.
+
+    Parameters:
+    repeat (int): The number of runs, the shortest time is used
+
+    Returns:
+    float: The time of the workload in seconds
+    """
+    df = make_page(20_000)
+
+    def workload() -> None:
+        sorted(f"{i:06d}" for i in range(200_000, 0, -1))
+        df["Zeit"].str.split(":", expand=True).astype(int).groupby(0).sum()
+
+    return best_time(workload, repeat)
+
+
+def benchmark_size(finishers: int, repeat: int, work_dir: str) -> Dict[str, float]:
+    """
+    This function measures the public functions of main and the whole pipeline on synthetic result lists
+    with the layouts of 2012 and 2023.
+    The stages of the cleaning chain are measured as total time over all pages of both lists.
+
+    Parameters:
+    finishers (int): The number of finishers of each result list
+    repeat (int): How often each function is called, the shortest time is used
+    work_dir (str): A directory for the generated PDF files and the output files
+
+    Returns:
+    Dict[str, float]: The time in seconds of each function
+    """
+    # Generate the raw tables as tabula reads them, the text lines and the PDF files of both layouts
+    raw_tables: List[Tuple[int, pd.DataFrame]] = []
+    text_pages: List[Tuple[List[str], str]] = []
+    time_texts: List[str] = []
+    for year, layout in SYNTHETIC_YEARS.items():
+        results = synthetic.generate_results(finishers, year, layout, seed=year)
+        for page_index, table in enumerate(synthetic.to_raw_tables(results, layout)):
+            table.insert(len(table.columns), "Jahr", str(year))
+            raw_tables.append((page_index, table))
+        text_pages.extend((lines, str(year)) for lines in synthetic.to_text_lines(results, layout))
+        time_texts.extend(results["Zeit_text"])
+    pdf_dir = os.path.join(work_dir, f"pdf_{finishers}")
+    synthetic.write_archive(pdf_dir, finishers, SYNTHETIC_YEARS)
+    lines = [line for page_lines, _ in text_pages for line in page_lines]
+
+    timings: Dict[str, float] = {CALIBRATION: calibrate()}
+
+    # The stages of the cleaning chain, summed over all pages
+    stage_times: Dict[str, List[float]] = {}
+    for _ in range(max(repeat, 1)):
+        totals: Dict[str, float] = {}
+        cleaned = []
+        for page_index, table in raw_tables:
+            df = table.copy()
+            for name, stage in main.cleaning_stages(page_index):
+                start = time.perf_counter()
+                df = stage(df)
+                totals[name] = totals.get(name, 0.0) + time.perf_counter() - start
+            cleaned.append(df)
+        for name, seconds in totals.items():
+            stage_times.setdefault(name, []).append(seconds)
+    timings.update({name: min(times) for name, times in stage_times.items()})
+    timings["clean_table"] = best_time(lambda: [main.clean_table(t.copy(), i) for i, t in raw_tables], repeat)
+
+    # Combining the pages and converting the data types
+    dic = {f"split_df{j + 1}": df for j, df in enumerate(cleaned)}
+    combined = main.combine_dataframes(cleaned)
+    timings["align_columns"] = best_time(lambda: [main.align_columns(df) for df in cleaned], repeat)
+    timings["combine_dataframes"] = best_time(lambda: main.combine_dataframes(cleaned), repeat)
+    timings["convert_column_types"] = best_time(lambda: main.convert_column_types(combined.copy()), repeat)
+    timings["get_one_dataframe"] = best_time(lambda: main.get_one_dataframe(dic, None), repeat)
+    one_df = main.get_one_dataframe(dic, None)
+
+    # The helpers for single values
+    timings["check_time_format"] = best_time(lambda: [main.check_time_format(t) for t in time_texts], repeat)
+    timings["find_time_formats_in_string"] = best_time(
+        lambda: [main.find_time_formats_in_string(line) for line in lines], repeat
+    )
+
+    # The text engine
+    timings["text_engine.parse_page"] = best_time(
+        lambda: [text_engine.parse_page(page_lines, year) for page_lines, year in text_pages], repeat
+    )
+
+    # Saving and loading the results
+    output_files = []
+    if importlib.util.find_spec("pyarrow") is not None:
+        output_files.append(os.path.join(work_dir, "results.parquet"))
+    if finishers <= EXCEL_MAX_FINISHERS:
+        output_files.append(os.path.join(work_dir, "results.xlsx"))
+    for output_file in output_files:
+        kind = "xlsx" if output_file.endswith(".xlsx") else "parquet"
+        timings[f"save_results ({kind})"] = best_time(lambda: main.save_results(one_df, output_file), repeat)
+        timings[f"load_results ({kind})"] = best_time(lambda: main.load_results(output_file), repeat)
+
+    # The whole pipeline on the synthetic PDF files, without the cache and with the printed timings suppressed
+    with contextlib.redirect_stdout(io.StringIO()):
+        timings["main (text engine)"] = best_time(
+            lambda: main.main(
+                use_cache=False, output_file=output_files[0] if output_files else None, engine="text", pdf_dir=pdf_dir
+            ),
+            repeat,
+        )
+    return timings
+
+
+def environment() -> Dict[str, str]:
+    """
+    This function returns the versions and the machine the benchmark suite runs with, they are saved
+    with the baseline.
+
+    Returns:
+    Dict[str, str]: The versions of Python, pandas and numpy and the machine type
+    """
+    return {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+    }
+
+
+def find_regressions(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]]) -> List[str]:
+    """
+    This function compares the results of the benchmark suite with the baseline.
+    The times of the baseline are scaled up by the ratio of the calibration times if the machine is slower than
+    when the baseline was saved, see calibrate.
+
+    Parameters:
+    results (Dict[str, Dict[str, float]]): The time in seconds of each function for each size
+    baseline (Dict[str, Dict[str, float]]): The saved results in the same structure
+
+    Returns:
+    List[str]: A description of each function that got slower by more than REGRESSION_FACTOR
+    """
+    regressions = []
+    for size, timings in results.items():
+        # Scale the times of the baseline to the current speed of the machine, if both have a calibration time.
+        # They are only scaled up, a fast calibration run alone must not turn the noise of a function into a regression
+        scale = 1.0
+        if CALIBRATION in timings and CALIBRATION in baseline.get(size, {}):
+            scale = max(timings[CALIBRATION] / baseline[size][CALIBRATION], 1.0)
+        for name, seconds in timings.items():
+            reference = baseline.get(size, {}).get(name)
+            if reference is None or name == CALIBRATION:
+                continue
+            reference *= scale
+            if seconds > reference * REGRESSION_FACTOR and seconds - reference > REGRESSION_MIN_SECONDS:
+                regressions.append(
+                    f"{name} with {size} finishers: {seconds * 1000:.1f} ms instead of {reference * 1000:.1f} ms"
+                )
+    return regressions
+
+
+def benchmark_suite(
+    sizes: Tuple[int, ...] = SUITE_SIZES,
+    repeat: int = 3,
+    save_baseline: bool = False,
+    baseline_file: str = BASELINE_FILE,
+) -> int:
+    """
+    This function runs the benchmark suite for each size, prints the times and compares them with the baseline.
+    With save_baseline the results are saved as new baseline instead.
+
+    Parameters:
+    sizes (Tuple[int, ...]): The numbers of finishers of each result list
+    repeat (int): How often each function is called, the shortest time is used
+    save_baseline (bool): Whether the results are saved as new baseline
+    baseline_file (str): The JSON file of the baseline
+
+    Returns:
+    int: The number of regressions, 0 if the baseline is saved or does not exist
+    """
+    results: Dict[str, Dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        for finishers in sizes:
+            results[str(finishers)] = benchmark_size(finishers, repeat, work_dir)
+            print(f"{finishers} finishers per list done")
+
+    # Print the times in milliseconds with one column per size
+    table = pd.DataFrame(results) * 1000
+    print(table.to_string(float_format=lambda value: f"{value:10.2f}", na_rep="-"))
+
+    if save_baseline:
+        os.makedirs(os.path.dirname(baseline_file), exist_ok=True)
+        with open(baseline_file, "w", encoding="utf-8") as file:
+            json.dump({"environment": environment(), "repeat": repeat, "results": results}, file, indent=2)
+        print(f"Baseline written to {baseline_file}")
+        return 0
+
+    if not os.path.exists(baseline_file):
+        print(f"No baseline in {baseline_file}, save one with --save-baseline")
+        return 0
+    with open(baseline_file, encoding="utf-8") as file:
+        baseline = json.load(file)
+
+    # A baseline of another environment or of functions that were removed or renamed is out of date,
+    # it has to be saved again after every change of the pipeline that changes its times
+    removed = sorted(
+        {name for size, timings in results.items() for name in baseline["results"].get(size, {}) if name not in timings}
+    )
+    if baseline.get("environment") != environment():
+        print(f"The baseline was saved in another environment: {baseline.get('environment')}")
+    if removed:
+        print(f"The baseline has functions that are not measured anymore: {', '.join(removed)}")
+        print("Save a new baseline with --save-baseline")
+
+    # Measure the sizes with a regression again and keep the shortest time of each function,
+    # so a single slow run of a busy machine is not reported
+    with tempfile.TemporaryDirectory() as work_dir:
+        for _ in range(CONFIRM_RUNS):
+            for size in [size for size in results if find_regressions({size: results[size]}, baseline["results"])]:
+                print(f"Measuring {size} finishers per list again to confirm the regressions")
+                timings = benchmark_size(int(size), repeat, work_dir)
+                results[size] = {
+                    name: min(seconds, timings.get(name, seconds)) for name, seconds in results[size].items()
+                }
+
+    regressions = find_regressions(results, baseline["results"])
+    for regression in regressions:
+        print(f"Regression: {regression}")
+    print(f"{len(regressions)} regressions compared with {baseline_file}")
+    return len(regressions)
+
+
+def write_startup_results(output_file: str) -> None:
+    """
+    This function saves a small synthetic combined dataframe for the queries of the light commands.
+
+    Parameters:
+    output_file (str): The Excel file or the directory of the Parquet dataset
+    """
+    results = synthetic.generate_results(200, 2031, SYNTHETIC_YEARS[2031], seed=2031)
+    main.save_results(apply_schema(results[list(RESULTS_SCHEMA)]), output_file)
+
+
+def startup_arguments(command: str, results_file: str) -> List[str]:
+    """
+    This function returns the arguments of cli.py for a light command of STARTUP_COMMANDS.
+
+    Parameters:
+    command (str): The light command, a key of STARTUP_BUDGETS
+    results_file (str): The file written by write_startup_results
+
+    Returns:
+    List[str]: The arguments after cli.py
+    """
+    return [argument.format(results=results_file) for argument in STARTUP_COMMANDS[command]]
+
+
+def benchmark_startup(repeat: int = 5) -> int:
+    """
+    This function measures the start time of the light commands of cli.py in new processes
+    and checks them against STARTUP_BUDGETS. It also checks that these commands do not import
+    the modules of STARTUP_FORBIDDEN_MODULES and prints the import time of main.py for comparison.
+
+    Parameters:
+    repeat (int): How often each command is started, the shortest time is used
+
+    Returns:
+    int: The number of exceeded budgets and forbidden imports
+    """
+    src_dir = os.path.dirname(os.path.abspath(__file__))
+    problems = 0
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        results_file = os.path.join(work_dir, "results.parquet")
+        write_startup_results(results_file)
+
+        for command, budget in STARTUP_BUDGETS.items():
+            arguments = startup_arguments(command, results_file)
+            seconds = best_time(
+                lambda: subprocess.run(
+                    [sys.executable, "cli.py", *arguments], cwd=src_dir, stdout=subprocess.DEVNULL, check=False
+                ),
+                repeat,
+            )
+            within_budget = seconds <= budget
+            problems += not within_budget
+            print(f"cli.py {command}: {seconds:.3f} s (budget {budget:.1f} s){'' if within_budget else ' EXCEEDED'}")
+
+            # Run the command in a new process and list the forbidden modules it imported
+            forbidden = STARTUP_FORBIDDEN_MODULES[command]
+            script = (
+                "import sys, contextlib, io, cli\n"
+                "with contextlib.redirect_stdout(io.StringIO()), contextlib.suppress(SystemExit):\n"
+                f"    cli.main({arguments!r})\n"
+                f"print(','.join(m for m in {forbidden!r} if m in sys.modules))"
+            )
+            output = subprocess.run(
+                [sys.executable, "-c", script], cwd=src_dir, capture_output=True, text=True, check=True
+            ).stdout.strip()
+            if output:
+                problems += 1
+                print(f"cli.py {command} imports {output}")
+
+    seconds = best_time(lambda: subprocess.run([sys.executable, "-c", "import main"], cwd=src_dir, check=True), repeat)
+    print(f"import main: {seconds:.3f} s")
+    return problems
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks of the HACO-Lauf pipeline.")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+    memory_parser = subparsers.add_parser("memory", help="peak memory of the in-memory and the streaming pipeline")
+    memory_parser.add_argument("--copies", type=int, default=20, help="number of copies of each PDF file")
+    scaling_parser = subparsers.add_parser("scaling", help="time to combine 10 to 1000 pages into one dataframe")
+    scaling_parser.add_argument("--rows-per-page", type=int, default=50, help="number of rows of each page")
+    stages_parser = subparsers.add_parser("stages", help="time of each stage of the cleaning chain")
+    stages_parser.add_argument("--repeat", type=int, default=20, help="how often every page is cleaned")
+    engines_parser = subparsers.add_parser("engines", help="time and result of the extraction engines")
+    engines_parser.add_argument("--repeat", type=int, default=3, help="how often the PDF files are processed")
+    suite_parser = subparsers.add_parser(
+        "suite", help="time the functions of the pipeline on synthetic result lists and compare with the baseline"
+    )
+    suite_parser.add_argument(
+        "--sizes", type=int, nargs="+", default=list(SUITE_SIZES), help="numbers of finishers per result list"
+    )
+    suite_parser.add_argument("--repeat", type=int, default=3, help="how often each function is called")
+    suite_parser.add_argument("--save-baseline", action="store_true", help="save the results as new baseline")
+    startup_parser = subparsers.add_parser(
+        "startup", help="start time of the light commands of cli.py, checked against the budgets"
+    )
+    startup_parser.add_argument("--repeat", type=int, default=5, help="number of starts of each command")
+    args = parser.parse_args()
+
+    if args.benchmark == "memory":
+        benchmark_memory(args.copies)
+    elif args.benchmark == "scaling":
+        benchmark_scaling(rows_per_page=args.rows_per_page)
+    elif args.benchmark == "stages":
+        benchmark_stages(args.repeat)
+    elif args.benchmark == "engines":
+        benchmark_engines(args.repeat)
+    elif args.benchmark == "suite":
+        # A non-zero exit code marks regressions, e.g. for a CI job
+        sys.exit(1 if benchmark_suite(tuple(args.sizes), args.repeat, args.save_baseline) else 0)
+    elif args.benchmark == "startup":
+        sys.exit(1 if benchmark_startup(args.repeat) else 0)
@@ -0,0 +1,389 @@
+import json
+import os
+import shutil
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from schema import RESULTS_SCHEMA, apply_schema
+
+# A binary store is a directory whose name ends with this suffix
+BINARY_STORE_SUFFIX: str = ".bin"
+
+# The fixed-width record of one row. The string columns hold codes into the string dictionary,
+# the time is stored in nanoseconds, NaT as the smallest int64 like in numpy
+RECORD_DTYPE: np.dtype = np.dtype(
+    [
+        ("Gesamt Platz", "<i4"),
+        ("Platz AK", "<u4"),
+        ("Startnummer", "<i4"),
+        ("Name", "<u4"),
+        ("Vorname1", "<u4"),
+        ("Vorname2", "<u4"),
+        ("Jahrgang", "<i2"),
+        ("Geschlecht", "<u4"),
+        ("Zeit", "<i8"),
+        ("Jahr", "<i2"),
+    ]
+)
+
+# The columns that are stored as codes into the string dictionary
+STRING_COLUMNS: List[str] = ["Platz AK", "Name", "Vorname1", "Vorname2", "Geschlecht"]
+
+# Version of the format, stored in the header
+FORMAT_VERSION: int = 1
+
+
+def index_keys(years: np.ndarray, bibs: np.ndarray) -> np.ndarray:
+    """
+    This function combines the year and the bib number into one sortable key.
+
+    Parameters:
+    years (np.ndarray): The years of competition
+    bibs (np.ndarray): The bib numbers
+
+    Returns:
+    np.ndarray: The keys as int64, sorted like the pairs (year, bib number)
+    """
+    return (years.astype(np.int64) << 32) + bibs.astype(np.int64)
+
+
+def index_file_name(rows: int) -> str:
+    """
+    This function returns the name of the index file of a store with a number of rows.
+
+    Parameters:
+    rows (int): The number of rows
+
+    Returns:
+    str: The file name, e.g. index.296.bin
+    """
+    return f"index.{rows}.bin"
+
+
+def is_binary_store(path: str) -> bool:
+    """
+    This function checks whether a path is a binary store.
+
+    Parameters:
+    path (str): The path
+
+    Returns:
+    bool: True if the path ends with BINARY_STORE_SUFFIX
+    """
+    return path.rstrip(os.sep).lower().endswith(BINARY_STORE_SUFFIX)
+
+
+class BinaryStore:
+    """
+    This class stores the combined dataframe in an append-only directory of binary files:
+    records.bin with one fixed-width record per row, strings.jsonl with the string dictionary,
+    index.<rows>.bin with the keys (year, bib number) in sorted order and the matching row numbers,
+    and header.json with the number of rows and the name of the current index file.
+
+    The records and the index are opened with np.memmap, so nothing is loaded until it is read.
+    A lookup of a bib number in a year is a binary search in the index and reads a single record.
+    New rows are appended to the end of the files and the new index is written to a new file. Both become visible
+    when header.json is replaced, so readers never see half-written rows or an index that does not match the header.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        This function opens a binary store, an empty store is created if the directory does not exist.
+
+        Parameters:
+        path (str): The directory of the store
+        """
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        if not os.path.exists(self._file("header.json")):
+            for name in ("records.bin", "strings.jsonl"):
+                open(self._file(name), "wb").close()
+            self._write_header(0)
+
+        with open(self._file("header.json"), encoding="utf-8") as file:
+            header = json.load(file)
+        if header["version"] != FORMAT_VERSION:
+            raise ValueError(f"{path} has the format version {header['version']} instead of {FORMAT_VERSION}")
+        self.rows: int = header["rows"]
+        self.string_count: int = header["strings"]
+        self.index_file: str = header["index"]
+
+        # The string dictionary is small, it is read completely
+        with open(self._file("strings.jsonl"), encoding="utf-8") as file:
+            self.strings: List[str] = [json.loads(line) for _, line in zip(range(self.string_count), file)]
+        self.codes: Dict[str, int] = {value: code for code, value in enumerate(self.strings)}
+        self._map()
+
+    def _file(self, name: str) -> str:
+        """
+        This function returns the path of a file of the store.
+
+        Parameters:
+        name (str): The name of the file
+
+        Returns:
+        str: The path
+        """
+        return os.path.join(self.path, name)
+
+    def _write_header(self, rows: int, strings: int = 0) -> None:
+        """
+        This function replaces the header, which makes appended rows and their index visible.
+        The header is the only commit point of the store.
+
+        Parameters:
+        rows (int): The number of rows
+        strings (int): The number of strings in the dictionary
+        """
+        tmp_file = self._file(f".header.{os.getpid()}.tmp")
+        header = {"version": FORMAT_VERSION, "rows": rows, "strings": strings, "index": index_file_name(rows)}
+        with open(tmp_file, "w", encoding="utf-8") as file:
+            json.dump(header, file)
+        os.replace(tmp_file, self._file("header.json"))
+
+    def _map(self) -> None:
+        """
+        This function maps the records and the index of the committed rows into memory.
+        """
+        if self.rows == 0:
+            self.records = np.empty(0, dtype=RECORD_DTYPE)
+            self.keys = np.empty(0, dtype=np.int64)
+            self.positions = np.empty(0, dtype=np.int64)
+            return
+        # Plain arrays on top of the maps, indexing np.memmap itself is slower for single elements
+        records = np.memmap(self._file("records.bin"), dtype=RECORD_DTYPE, mode="r", shape=(self.rows,))
+        index = np.memmap(self._file(self.index_file), dtype=np.int64, mode="r", shape=(2, self.rows))
+        self.records = np.asarray(records)
+        self.keys, self.positions = np.asarray(index[0]), np.asarray(index[1])
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def _encode(self, values: pd.Series) -> np.ndarray:
+        """
+        This function converts strings into their codes and adds new strings to the dictionary.
+
+        Parameters:
+        values (pd.Series): The strings
+
+        Returns:
+        np.ndarray: The codes
+        """
+        # Look up every distinct string once
+        uniques, inverse = np.unique(values.astype(str).to_numpy(), return_inverse=True)
+        unique_codes = np.empty(len(uniques), dtype=np.uint32)
+        for i, value in enumerate(uniques):
+            code = self.codes.get(value)
+            if code is None:
+                code = len(self.strings)
+                self.strings.append(value)
+                self.codes[value] = code
+            unique_codes[i] = code
+        return unique_codes[inverse]
+
+    def append(self, df: pd.DataFrame) -> int:
+        """
+        This function appends the rows of a combined dataframe and rebuilds the index.
+
+        Parameters:
+        df (pd.DataFrame): The rows with the columns of schema.RESULTS_SCHEMA
+
+        Returns:
+        int: The number of rows in the store
+
+        Raises:
+        ValueError: If a bib number of a year is already in the store or appears twice in the rows
+        """
+        if df.empty:
+            return self.rows
+        years = df["Jahr"].astype(int).to_numpy()
+        bibs = df["Startnummer"].astype(int).to_numpy()
+        new_keys = index_keys(years, bibs)
+        duplicated = pd.Index(new_keys).duplicated() | np.isin(new_keys, self.keys)
+        if duplicated.any():
+            first = int(np.flatnonzero(duplicated)[0])
+            raise ValueError(f"The bib number {bibs[first]} of {years[first]} is already in the store")
+
+        records = np.empty(len(df), dtype=RECORD_DTYPE)
+        string_count = len(self.strings)
+        for column in RECORD_DTYPE.names:
+            if column in STRING_COLUMNS:
+                records[column] = self._encode(df[column])
+            elif column == "Zeit":
+                records[column] = df[column].to_numpy(dtype="timedelta64[ns]").view(np.int64)
+            else:
+                records[column] = df[column].astype(int).to_numpy()
+
+        # Append the new strings and records behind the committed data
+        self._truncate(string_count)
+        with open(self._file("strings.jsonl"), "a", encoding="utf-8") as file:
+            file.writelines(json.dumps(value, ensure_ascii=False) + "\n" for value in self.strings[string_count:])
+        with open(self._file("records.bin"), "r+b") as file:
+            file.seek(self.rows * RECORD_DTYPE.itemsize)
+            file.write(records.tobytes())
+            file.truncate()
+
+        # Merge the new keys into the sorted index and write it into a new file next to the committed index.
+        # The file name contains the new number of rows, so it never replaces the index the header names
+        rows = self.rows + len(df)
+        keys = np.concatenate([np.asarray(self.keys), new_keys])
+        positions = np.concatenate([np.asarray(self.positions), np.arange(self.rows, rows)])
+        order = np.argsort(keys, kind="stable")
+        tmp_index = self._file(f".index.{os.getpid()}.tmp")
+        np.stack([keys[order], positions[order]]).astype(np.int64).tofile(tmp_index)
+        os.replace(tmp_index, self._file(index_file_name(rows)))
+
+        # Commit, then remove the old index and the index files of interrupted appends, no reader of the new
+        # header uses them
+        self._release()
+        self._write_header(rows, len(self.strings))
+        self.rows = rows
+        self.index_file = index_file_name(rows)
+        for name in os.listdir(self.path):
+            if name != self.index_file and name.startswith("index.") and name.endswith(".bin"):
+                os.remove(self._file(name))
+        self._map()
+        return rows
+
+    def _truncate(self, string_count: int) -> None:
+        """
+        This function removes the strings of an interrupted append that were written but not committed.
+
+        Parameters:
+        string_count (int): The number of committed strings
+        """
+        with open(self._file("strings.jsonl"), "r+b") as file:
+            for _ in range(string_count):
+                file.readline()
+            file.truncate(file.tell())
+
+    def _release(self) -> None:
+        """
+        This function closes the memory maps before their files are replaced.
+        """
+        self.records = np.empty(0, dtype=RECORD_DTYPE)
+        self.keys = np.empty(0, dtype=np.int64)
+        self.positions = np.empty(0, dtype=np.int64)
+
+    def write(self, df: pd.DataFrame) -> None:
+        """
+        This function appends the rows of a dataframe, so the store can be used like the sinks of sinks.py.
+
+        Parameters:
+        df (pd.DataFrame): The rows with the columns of schema.RESULTS_SCHEMA
+        """
+        self.append(df)
+
+    def _decode(self, records: np.ndarray) -> pd.DataFrame:
+        """
+        This function converts records into rows of the combined dataframe.
+
+        Parameters:
+        records (np.ndarray): The records
+
+        Returns:
+        pd.DataFrame: The rows with the data types of schema.RESULTS_SCHEMA
+        """
+        strings = np.array(self.strings, dtype=object)
+        columns: Dict[str, Any] = {}
+        for column in RESULTS_SCHEMA:
+            values = records[column]
+            if column in STRING_COLUMNS:
+                columns[column] = strings[values] if len(strings) else np.empty(0, dtype=object)
+            elif column == "Zeit":
+                columns[column] = np.asarray(values).view("timedelta64[ns]")
+            else:
+                columns[column] = np.asarray(values)
+        return apply_schema(pd.DataFrame(columns))
+
+    def lookup(self, year: int, bib: int) -> Optional[Dict[str, Any]]:
+        """
+        This function returns the row of a bib number in a year with a binary search in the index.
+        Only the index entries on the search path and one record are read from disk.
+
+        Parameters:
+        year (int): The year of competition
+        bib (int): The bib number, 'Startnummer'
+
+        Returns:
+        Optional[Dict[str, Any]]: The values of the row or None if the bib number is not in the year
+        """
+        key = (int(year) << 32) + int(bib)
+        i = int(np.searchsorted(self.keys, key))
+        if i == len(self.keys) or self.keys[i] != key:
+            return None
+        record = dict(zip(RECORD_DTYPE.names, self.records[self.positions[i]].item()))
+        row = {}
+        for column in RESULTS_SCHEMA:
+            value = record[column]
+            if column in STRING_COLUMNS:
+                row[column] = self.strings[value]
+            elif column == "Zeit":
+                row[column] = pd.Timedelta(value, unit="ns")
+            else:
+                row[column] = value
+        return row
+
+    def year(self, year: int) -> pd.DataFrame:
+        """
+        This function returns the rows of a year with a range of the index. The rows are read in the order
+        of the store, which is the order of the overall places within an appended year.
+
+        Parameters:
+        year (int): The year of competition
+
+        Returns:
+        pd.DataFrame: The rows of the year
+        """
+        start, end = np.searchsorted(self.keys, [int(year) << 32, (int(year) + 1) << 32])
+        return self._decode(self.records[np.sort(np.asarray(self.positions[start:end]))])
+
+    def jahrgang(self, jahrgang: int) -> pd.DataFrame:
+        """
+        This function returns the rows of all runners born in a year. Only the column of the year of birth
+        is scanned, the other columns are only read for the matching rows.
+
+        Parameters:
+        jahrgang (int): The year of birth
+
+        Returns:
+        pd.DataFrame: The rows in the order of the store
+        """
+        return self._decode(self.records[np.flatnonzero(self.records["Jahrgang"] == jahrgang)])
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        This function returns all rows of the store.
+
+        Returns:
+        pd.DataFrame: The combined dataframe
+        """
+        return self._decode(self.records)
+
+
+def write_binary_store(df: pd.DataFrame, path: str) -> BinaryStore:
+    """
+    This function writes a combined dataframe into a new binary store, an existing store is replaced.
+    The store is written into a temporary directory first. The previous store is renamed before the new one
+    is renamed into its place, so there is always a complete store on disk, and it is only deleted afterwards.
+
+    Parameters:
+    df (pd.DataFrame): The combined dataframe
+    path (str): The directory of the store
+
+    Returns:
+    BinaryStore: The new store
+    """
+    tmp_dir = f"{path.rstrip(os.sep)}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    BinaryStore(tmp_dir).append(df)
+
+    old_dir = f"{path.rstrip(os.sep)}.{os.getpid()}.old"
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if os.path.exists(path):
+        os.replace(path, old_dir)
+    os.replace(tmp_dir, path)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return BinaryStore(path)
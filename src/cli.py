@@ -0,0 +1,472 @@
+import argparse
+import sys
+from typing import List, Optional
+
+from helpers import (
+    ENGINES,
+    OUTPUT_FILE,
+    PROFILE_FILE,
+    QUALITY_REPORT_FILE,
+    QUARANTINE_FILE,
+    check_time_format,
+    filenames_and_prefix_from_dir,
+    get_pdf_dir,
+)
+
+# The command line interface only imports the standard library and helpers.py at start.
+# pandas, tabula, pypdfium2 and openpyxl are imported inside the subcommands that need them,
+# so 'cli.py validate' and 'cli.py --help' start without loading them.
+
+
+def add_ingest_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    This function adds the arguments of the extraction of the PDF files to a parser.
+
+    Parameters:
+    parser (argparse.ArgumentParser): The parser of the 'ingest' subcommand or of main.py
+    """
+    parser.add_argument("--no-cache", action="store_true", help="do not use the cache of extracted PDF tables")
+    parser.add_argument("--clear-cache", action="store_true", help="remove all cached PDF tables before the extraction")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only process PDF files whose year is not yet in the saved table and append their rows",
+    )
+    parser.add_argument(
+        "--stream", action="store_true", help="process the PDF files page by page and stream the rows into the file"
+    )
+    parser.add_argument(
+        "--correction-report", action="store_true", help="print how often each name correction was applied"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, help="number of worker processes to extract and clean the PDF files"
+    )
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default="tabula",
+        help="extraction engine: tabula (needs Java) or text (parses the text layer of the PDF with pypdfium2)",
+    )
+    parser.add_argument(
+        "--memory-report",
+        action="store_true",
+        help="print the memory of each column of the combined table with and without the compact schema",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=PROFILE_FILE,
+        metavar="JSON_FILE",
+        help="record the time and rows of each stage for each page, print a summary and write the report "
+        "to JSON_FILE (default: reports/profile.json)",
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="also record the memory of each stage with tracemalloc in a separate run of the stage, "
+        "implies --profile. The times are still measured without tracemalloc",
+    )
+    parser.add_argument(
+        "--runner-index",
+        action="store_true",
+        help="add the years that are not yet in the runner index to it, the index assigns persistent runner IDs "
+        "across years (data/processed/runner_index.csv)",
+    )
+    parser.add_argument(
+        "--quality-report",
+        default=QUALITY_REPORT_FILE,
+        metavar="CSV_FILE",
+        help="CSV file of the validation report with the rows and failed checks of each PDF file "
+        "(default: reports/quality_report.csv)",
+    )
+    parser.add_argument(
+        "--quarantine",
+        default=QUARANTINE_FILE,
+        metavar="CSV_FILE",
+        help="CSV file of the rows that failed the validation and are left out of the output "
+        "(default: data/interim/quarantine.csv)",
+    )
+    parser.add_argument(
+        "--output",
+        default=OUTPUT_FILE,
+        help="output file, paths ending in .xlsx are written as Excel file, "
+        "other paths as Parquet dataset partitioned by year (requires pyarrow)",
+    )
+
+
+def add_query_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    This function adds the queries of the rankings as subcommands to a parser.
+
+    Parameters:
+    parser (argparse.ArgumentParser): The parser of the 'query' subcommand or of ranking.py
+    """
+    parser.add_argument("--results", default=OUTPUT_FILE, help="Excel file or Parquet dataset of the results")
+    subparsers = parser.add_subparsers(dest="query", required=True)
+
+    for query, help_text in (
+        ("rank", "place and percentile of a time"),
+        ("top", "the fastest runners of a ranking"),
+    ):
+        query_parser = subparsers.add_parser(query, help=help_text)
+        query_parser.add_argument("--year", type=int, required=True, help="year of competition")
+        query_parser.add_argument("--gender", choices=["m", "w"], help="gender, all runners of the year if not given")
+        query_parser.add_argument("--age-class", help="age class, e.g. M35 or WJ_U20")
+        if query == "rank":
+            query_parser.add_argument("--time", required=True, help="race time, e.g. 42:57 or 1:05:56")
+        else:
+            query_parser.add_argument("-k", type=int, default=10, help="number of runners")
+
+    runner_parser = subparsers.add_parser("runner", help="placements of a runner in the year, gender and age class")
+    runner_parser.add_argument("--year", type=int, required=True, help="year of competition")
+    runner_parser.add_argument("--bib", type=int, required=True, help="bib number")
+
+    subparsers.add_parser("improvements", help="year-over-year changes of runners with several results")
+
+
+def ingest(args: argparse.Namespace) -> None:
+    """
+    This function extracts the PDF files into the combined dataframe and saves it, with the reports
+    selected by the arguments.
+
+    Parameters:
+    args (argparse.Namespace): The arguments of add_ingest_arguments
+    """
+    import corrections
+    import main
+    import runner_index
+    import table_cache
+    from profiling import StageProfiler
+    from schema import memory_report, without_schema
+    from validation import UNPARSED_LINE, QualityReport
+
+    if args.clear_cache:
+        print(f"Removed {table_cache.clear_cache()} cached PDF files.")
+    if args.profile_memory and not args.profile:
+        args.profile = PROFILE_FILE
+    profiler = StageProfiler(trace_memory=args.profile_memory) if args.profile else None
+    quality = QualityReport()
+    if args.stream:
+        main.main_streaming(
+            use_cache=not args.no_cache,
+            output_file=args.output,
+            engine=args.engine,
+            profiler=profiler,
+            quality=quality,
+        )
+        onedf_all = main.load_results(args.output) if args.memory_report or args.runner_index else None
+    elif args.incremental:
+        onedf_all = main.main_incremental(
+            use_cache=not args.no_cache,
+            output_file=args.output,
+            workers=args.workers,
+            engine=args.engine,
+            profiler=profiler,
+            quality=quality,
+        )
+    else:
+        onedf_all = main.main(
+            use_cache=not args.no_cache,
+            output_file=args.output,
+            workers=args.workers,
+            engine=args.engine,
+            profiler=profiler,
+            quality=quality,
+        )
+    # The rows that failed the validation were left out, they are listed in the quarantine file
+    quality.write(args.quality_report, args.quarantine)
+    summary = quality.summary()
+    quarantined = int(summary["quarantined"].sum())
+    if quarantined:
+        print(f"{quarantined} rows failed the validation, see {args.quality_report} and {args.quarantine}")
+    unparsed = int(summary[UNPARSED_LINE].sum())
+    if unparsed:
+        print(f"{unparsed} lines look like rows but could not be parsed, see {args.quarantine}")
+    if profiler is not None:
+        print(profiler.summary().to_string(float_format=lambda value: f"{value:.4f}"))
+        profiler.write_json(args.profile)
+        print(f"Profile written to {args.profile}")
+    if args.runner_index:
+        index = runner_index.update_runner_index(onedf_all)
+        print(f"Runner index: {index.next_id - 1} runners with {len(index.spellings)} spellings.")
+    if args.memory_report:
+        print(memory_report(without_schema(onedf_all), onedf_all).to_string())
+    if args.correction_report:
+        # The counts include the pages cleaned in worker processes
+        print(corrections.default_corrector().report().to_string(index=False))
+
+
+def export(args: argparse.Namespace) -> None:
+    """
+    This function converts the saved combined dataframe into another format,
+    e.g. the Excel file into a Parquet dataset, optionally only some years.
+
+    Parameters:
+    args (argparse.Namespace): The arguments with the input file, the output file and the years
+    """
+    import main
+    from binstore import is_binary_store, write_binary_store
+
+    df = main.load_results(args.results, years=args.years)
+    if is_binary_store(args.output):
+        write_binary_store(df, args.output)
+    else:
+        main.save_results(df, args.output)
+    print(f"Exported {len(df)} rows to {args.output}")
+
+
+def lookup(args: argparse.Namespace) -> None:
+    """
+    This function prints the rows of a binary store exported by 'cli.py export', either the row of a bib number
+    in a year or all rows of a year of birth.
+
+    Parameters:
+    args (argparse.Namespace): The arguments with the store, the year and the bib number or the year of birth
+    """
+    import pandas as pd
+
+    from binstore import BinaryStore
+
+    store = BinaryStore(args.store)
+    if args.jahrgang is not None:
+        print(store.jahrgang(args.jahrgang).to_string())
+        return
+    if args.year is None or args.bib is None:
+        raise SystemExit("lookup needs --year and --bib or --jahrgang")
+    row = store.lookup(args.year, args.bib)
+    if row is None:
+        raise SystemExit(f"No runner with the bib number {args.bib} in {args.year}")
+    print(pd.Series(row).to_string())
+
+
+def query(args: argparse.Namespace) -> None:
+    """
+    This function answers a query of the rankings of the saved combined dataframe.
+
+    Parameters:
+    args (argparse.Namespace): The arguments of add_query_arguments
+    """
+    import os
+
+    import numpy as np
+    import pandas as pd
+
+    import runner_index
+    from race_times import format_race_times, parse_race_times
+    from ranking import RankingIndex
+    from sinks import load_results
+
+    # load_results lives in sinks, so the queries start without the extraction pipeline of main
+    index = RankingIndex(load_results(args.results))
+    if args.query == "rank":
+        time = parse_race_times(pd.Series([args.time])).iloc[0]
+        if pd.isna(time):
+            raise SystemExit(f"Invalid race time: {args.time}")
+        place = index.rank(time, args.year, args.gender, args.age_class)
+        percentile = index.percentile(time, args.year, args.gender, args.age_class)
+        finishers = len(index.ranking_times(args.year, args.gender, args.age_class))
+        print(f"Place {place} of {finishers}, faster than {percentile:.1f} % of the finishers")
+    elif args.query == "top":
+        top = index.top(args.k, args.year, args.gender, args.age_class)
+        top["Zeit"] = format_race_times(top["Zeit"])
+        print(top.to_string(index=False))
+    elif args.query == "runner":
+        print(index.placements(args.year, args.bib).to_string(index=False, float_format=lambda value: f"{value:.1f}"))
+    else:
+        # The runner IDs come from the saved runner index, without it no runner can be followed across years
+        if not os.path.exists(runner_index.RUNNER_INDEX_FILE):
+            raise SystemExit(
+                f"No runner index in {runner_index.RUNNER_INDEX_FILE}, create it with 'cli.py ingest --runner-index'"
+            )
+        changes = index.improvements(runner_index.RunnerIndex.load().lookup(index.df))
+        changes = changes[changes["runner_id"] > 0].copy()
+        sign = np.where(changes["Veränderung"] < pd.Timedelta(0), "-", "+")
+        change_text = sign + format_race_times(changes["Veränderung"].abs())
+        changes["Veränderung"] = change_text.where(changes["Veränderung"].notna(), "")
+        changes["Zeit"] = format_race_times(changes["Zeit"])
+        print(changes.to_string(index=False))
+
+
+def validate(args: argparse.Namespace) -> int:
+    """
+    This function checks the PDF files in the directory of the raw data and the given race times
+    without loading pandas: every PDF file needs a year as prefix and every year may only have one PDF file.
+
+    Parameters:
+    args (argparse.Namespace): The arguments with the directory and the race times
+
+    Returns:
+    int: The number of problems found
+    """
+    import os
+
+    pdf_dir = args.pdf_dir or get_pdf_dir()
+    problems = []
+
+    # PDF files without the year as prefix are skipped by the pipeline
+    filenames_prefix = filenames_and_prefix_from_dir(pdf_dir)
+    for filename in sorted(os.listdir(pdf_dir)):
+        if filename.endswith(".pdf") and filename not in filenames_prefix:
+            problems.append(f"{filename}: no year as prefix, the file is skipped")
+
+    # Two PDF files of the same year would both be added to the combined dataframe
+    years = list(filenames_prefix.values())
+    for year in sorted({year for year in years if years.count(year) > 1}):
+        problems.append(f"{year}: more than one PDF file")
+
+    for time_string in args.time or []:
+        if not check_time_format(time_string):
+            problems.append(f"{time_string}: not a valid time")
+
+    for problem in problems:
+        print(problem)
+    print(f"{len(filenames_prefix)} PDF files of the years {', '.join(sorted(set(years)))}, {len(problems)} problems")
+    return len(problems)
+
+
+def watch(args: argparse.Namespace) -> None:
+    """
+    This function watches the directory of the PDF files and updates the saved table when files are added,
+    written again or removed, until it is interrupted.
+
+    Parameters:
+    args (argparse.Namespace): The arguments of the 'watch' subcommand
+    """
+    from watch import Watcher
+
+    watcher = Watcher(
+        pdf_dir=args.pdf_dir,
+        output_file=args.output,
+        workers=args.workers,
+        engine=args.engine,
+        use_cache=not args.no_cache,
+        debounce_seconds=args.debounce,
+        report_file=args.quality_report,
+        quarantine_file=args.quarantine,
+    )
+    watcher.run(poll_seconds=args.poll)
+
+
+def serve(args: argparse.Namespace) -> None:
+    """
+    This function runs the ingest service with its HTTP endpoint on the local machine until it is interrupted.
+
+    Parameters:
+    args (argparse.Namespace): The arguments of the 'serve' subcommand
+    """
+    import asyncio
+
+    import service
+
+    try:
+        asyncio.run(
+            service.serve(
+                port=args.port,
+                workers=args.workers,
+                max_queued_jobs=args.queue_size,
+                engine=args.engine,
+                output_dir=args.output_dir or service.OUTPUT_DIR,
+            )
+        )
+    except KeyboardInterrupt:
+        pass
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    This function creates the parser of the command line interface with one subcommand per task.
+
+    Returns:
+    argparse.ArgumentParser: The parser
+    """
+    parser = argparse.ArgumentParser(prog="cli.py", description="Process and query the HACO-Lauf result lists.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = subparsers.add_parser("ingest", help="extract the PDF files into one table")
+    add_ingest_arguments(ingest_parser)
+
+    export_parser = subparsers.add_parser("export", help="convert the saved table into another format")
+    export_parser.add_argument("--results", default=OUTPUT_FILE, help="Excel file or Parquet dataset of the results")
+    export_parser.add_argument(
+        "--output", required=True, help="output file, .xlsx for Excel, .bin for a binary store, else Parquet dataset"
+    )
+    export_parser.add_argument("--years", type=int, nargs="+", help="only export these years")
+
+    query_parser = subparsers.add_parser("query", help="query the rankings of the saved table")
+    add_query_arguments(query_parser)
+
+    lookup_parser = subparsers.add_parser("lookup", help="look up rows in a binary store")
+    lookup_parser.add_argument("--store", required=True, help="directory of the binary store, ending in .bin")
+    lookup_parser.add_argument("--year", type=int, help="year of competition")
+    lookup_parser.add_argument("--bib", type=int, help="bib number")
+    lookup_parser.add_argument("--jahrgang", type=int, help="year of birth, prints all rows of the runners born then")
+
+    watch_parser = subparsers.add_parser("watch", help="update the saved table whenever PDF files change")
+    watch_parser.add_argument("--pdf-dir", help="directory of the PDF files, data/raw if not given")
+    watch_parser.add_argument("--output", default=OUTPUT_FILE, help="Excel file or Parquet dataset that is updated")
+    watch_parser.add_argument("--workers", type=int, default=2, help="number of worker processes")
+    watch_parser.add_argument("--engine", choices=ENGINES, default="tabula", help="extraction engine")
+    watch_parser.add_argument("--no-cache", action="store_true", help="do not use the cache of extracted PDF tables")
+    watch_parser.add_argument("--poll", type=float, default=1.0, help="seconds between two scans of the directory")
+    watch_parser.add_argument(
+        "--debounce", type=float, default=2.0, help="seconds the files must stay unchanged before they are processed"
+    )
+    watch_parser.add_argument(
+        "--quality-report",
+        default=QUALITY_REPORT_FILE,
+        metavar="CSV_FILE",
+        help="CSV file of the validation report of the processed years (default: reports/quality_report.csv)",
+    )
+    watch_parser.add_argument(
+        "--quarantine",
+        default=QUARANTINE_FILE,
+        metavar="CSV_FILE",
+        help="CSV file of the rows that failed the validation and are left out of the output "
+        "(default: data/interim/quarantine.csv)",
+    )
+
+    serve_parser = subparsers.add_parser("serve", help="run the ingest service with a local HTTP status endpoint")
+    serve_parser.add_argument("--port", type=int, default=8765, help="port of the HTTP endpoint on 127.0.0.1")
+    serve_parser.add_argument("--workers", type=int, default=2, help="number of worker processes")
+    serve_parser.add_argument("--queue-size", type=int, default=8, help="maximum number of waiting jobs")
+    serve_parser.add_argument("--engine", choices=ENGINES, default="tabula", help="extraction engine")
+    serve_parser.add_argument(
+        "--output-dir", default=None, help="directory the results of the jobs are saved in, data/processed by default"
+    )
+
+    validate_parser = subparsers.add_parser("validate", help="check the PDF files and race times")
+    validate_parser.add_argument("--pdf-dir", help="directory of the PDF files, data/raw if not given")
+    validate_parser.add_argument("--time", nargs="+", help="race times to check, e.g. 42:57")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    This function runs the subcommand of the command line.
+
+    Parameters:
+    argv (Optional[List[str]]): The arguments, sys.argv if None
+
+    Returns:
+    int: The exit code
+    """
+    args = build_parser().parse_args(argv)
+    if args.command == "ingest":
+        ingest(args)
+    elif args.command == "export":
+        export(args)
+    elif args.command == "query":
+        query(args)
+    elif args.command == "lookup":
+        lookup(args)
+    elif args.command == "watch":
+        watch(args)
+    elif args.command == "serve":
+        serve(args)
+    else:
+        return 1 if validate(args) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+import csv
+import functools
+import os
+import re
+from collections import Counter
+from typing import Any, Callable, List, Tuple
+
+import pandas as pd
+
+# File with the name corrections, one rule per row with the columns 'pattern' and 'replacement'
+CORRECTIONS_FILE: str = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "references", "name_corrections.csv"
+)
+
+
+class NameCorrector:
+    """
+    This class replaces wrong or incomplete names in the result lists.
+    All rules are compiled into one regular expression, so a column is scanned once for all rules
+    instead of once per rule. The number of replacements of each rule is counted.
+    """
+
+    def __init__(self, rules: List[Tuple[str, str]]) -> None:
+        """
+        This function compiles the rules.
+        If several rules match at the same position, the first rule in the list is used.
+
+        Parameters:
+        rules (List[Tuple[str, str]]): The rules as pairs of a regular expression and its replacement text
+        """
+        self.rules = rules
+        self.counts: Counter = Counter()
+
+        # Every rule gets a named group, so the matching rule can be found from the match
+        alternatives = [f"(?P<rule{i}>{pattern})" for i, (pattern, _) in enumerate(rules)]
+        self.pattern = re.compile("|".join(alternatives)) if rules else None
+
+        # The same rules without named groups, used to find the rows with a match.
+        # Without groups the regular expression engine can skip positions that cannot start a match,
+        # which makes the search much faster than with the named groups
+        self.search_pattern = re.compile("|".join(f"(?:{pattern})" for pattern, _ in rules)) if rules else None
+
+    @classmethod
+    def from_csv(cls, path: str = CORRECTIONS_FILE) -> "NameCorrector":
+        """
+        This function reads the rules from a CSV file with the columns 'pattern' and 'replacement'.
+
+        Parameters:
+        path (str): The path to the CSV file
+
+        Returns:
+        NameCorrector: The compiled rules
+        """
+        with open(path, newline="", encoding="utf-8") as file:
+            rules = [(row["pattern"], row["replacement"]) for row in csv.DictReader(file)]
+        return cls(rules)
+
+    def _replace(self, match: re.Match) -> str:
+        """
+        This function returns the replacement text of the rule that produced a match and counts the match.
+
+        Parameters:
+        match (re.Match): The match
+
+        Returns:
+        str: The replacement text
+        """
+        # The group of the rule is the outermost group that matched, so it is the last one that was closed
+        rule_index = int(match.lastgroup[len("rule") :])
+        self.counts[rule_index] += 1
+        return self.rules[rule_index][1]
+
+    def apply(self, series: pd.Series) -> pd.Series:
+        """
+        This function applies all rules to a column in one pass.
+
+        Parameters:
+        series (pd.Series): The column with the names
+
+        Returns:
+        pd.Series: The column with the corrected names
+        """
+        if self.pattern is None:
+            return series
+
+        # Find the rows with a match and only replace the names in these rows
+        matches = series.str.contains(self.search_pattern, na=False)
+        if not matches.any():
+            return series
+        series = series.copy()
+        series[matches] = series[matches].str.replace(self.pattern, self._replace, regex=True)
+        return series
+
+    def add_counts(self, counts: Counter) -> None:
+        """
+        This function adds the replacements counted by the same rules in another process.
+
+        Parameters:
+        counts (Counter): The number of replacements of each rule, see run_counted
+        """
+        self.counts.update(counts)
+
+    def report(self) -> pd.DataFrame:
+        """
+        This function returns how often each rule was applied since the rules were compiled.
+
+        Returns:
+        pd.DataFrame: The rules with the columns 'pattern', 'replacement' and 'count'
+        """
+        return pd.DataFrame(
+            [(pattern, replacement, self.counts[i]) for i, (pattern, replacement) in enumerate(self.rules)],
+            columns=["pattern", "replacement", "count"],
+        )
+
+
+@functools.lru_cache(maxsize=None)
+def default_corrector() -> NameCorrector:
+    """
+    This function returns the rules of references/name_corrections.csv, the file is only read once per process.
+
+    Returns:
+    NameCorrector: The compiled rules
+    """
+    return NameCorrector.from_csv()
+
+
+def run_counted(func: Callable[..., Any], *args: Any) -> Tuple[Any, Counter]:
+    """
+    This function calls a function, e.g. a cleaning task in a worker process, and returns its result with the
+    replacements of default_corrector that were made during the call. The parent process adds them with add_counts,
+    a worker process is used for several tasks, so only the difference of the counts is returned.
+
+    Parameters:
+    func (Callable[..., Any]): The function
+    args (Any): The arguments of the function
+
+    Returns:
+    Tuple[Any, Counter]: The result of the function and the number of replacements of each rule
+    """
+    corrector = default_corrector()
+    counts_before = corrector.counts.copy()
+    result = func(*args)
+    return result, corrector.counts - counts_before
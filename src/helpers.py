@@ -0,0 +1,100 @@
+import os
+import re
+from typing import Dict, List
+
+# Regular expression pattern for a time in the format 'HH:MM:SS' or 'MM:SS'
+TIME_PATTERN = r"(\d{1,2}:\d{2}(?::\d{2})?)"
+
+# Regular expression of a complete time accepted by check_time_format: 'H:MM:SS' with hours up to 23 or 'MM:SS'
+TIME_FORMAT_PATTERN = r"^(?:\d|1\d|2[0-3]):[0-5]\d:[0-5]\d$|^[0-5]\d:[0-5]\d$"
+
+# File the combined dataframe is saved to
+OUTPUT_FILE = "one_def_1.xlsx"
+
+# The JSON file of the report of --profile, reports/profile.json in the project directory
+PROFILE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "reports", "profile.json")
+
+# The extraction engines: tabula reads the tables with Java, text parses the text layer of the PDF with pypdfium2
+ENGINES = ("tabula", "text")
+
+# The CSV files of the quality report of each PDF file and of the rows that failed the validation
+QUALITY_REPORT_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "reports", "quality_report.csv"
+)
+QUARANTINE_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "interim", "quarantine.csv"
+)
+
+
+def filenames_and_prefix_from_dir(directory: str) -> Dict[str, str]:
+    """
+    This function creates a dictionary of PDF filenames with their numeric prefixes from a given directory.
+
+    Parameters:
+    directory (str): The directory to search for PDF files
+
+    Returns:
+    pdf_dict (Dict[str, str]): A dictionary where the keys are the PDF filenames and the values are their numeric prefixes
+    """
+    # Initialize an empty dictionary to store the PDF filenames and their numeric prefixes
+    pdf_dict: Dict[str, str] = {}
+
+    # Iterate over all files in the specified directory, sorted so every run processes them in the same order
+    for filename in sorted(os.listdir(directory)):
+        # Use regex to match the first four digits in the filename
+        match = re.match(r"^(\d{4})", filename)
+
+        # If the file is a PDF and the regex match is successful, add it to the dictionary
+        if filename.endswith(".pdf") and match:
+            pdf_dict[filename] = match.group(1)
+
+    # Return the dictionary
+    return pdf_dict
+
+
+def get_pdf_dir() -> str:
+    """
+    This function returns the directory where the raw PDF data is stored.
+
+    Returns:
+    str: The directory data/raw in the project directory
+    """
+    # Get the path to the currently executing file
+    current_directory = os.path.dirname(os.path.abspath(__file__))
+
+    # Define the directory where the raw PDF data is stored
+    parent_directory = os.path.dirname(current_directory)
+    return parent_directory + "/data/raw"
+
+
+def check_time_format(time_string) -> bool:
+    """
+    This function checks if a given time string is in a valid format.
+    Valid formats are 'HH:MM:SS' or 'MM:SS', where HH is 00-23, MM is 00-59, and SS is 00-59.
+
+    Parameters:
+    time_string (str): The time string to check
+
+    Returns:
+    bool: True if the time string is in a valid format, False otherwise
+    """
+    # Use the re.match function to check if the time string matches the pattern
+    return bool(re.match(TIME_FORMAT_PATTERN, time_string))
+
+
+def find_time_formats_in_string(input_string) -> List[str]:
+    """
+    This function finds all time formats in a given string.
+    The time formats can be 'HH:MM:SS' or 'MM:SS', where HH is 00-23, MM is 00-59, and SS is 00-59.
+
+    Parameters:
+    input_string (str): The string to search for time formats
+
+    Returns:
+    matches (List[str]): A list of all time formats found in the string
+    """
+    # Use the re.findall function to find all occurrences of the pattern in the string
+    matches = re.findall(TIME_PATTERN, input_string)
+
+    # Return the list of all time formats found in the string
+    return matches
@@ -1,44 +1,40 @@
 import pandas as pd
-import tabula
 import numpy as np
 import os
 import re
-from typing import Dict
-from icecream import ic
-import os
-import openpyxl
-
-
-def filenames_and_prefix_from_dir(directory: str) -> Dict[str, str]:
-    """
-    This function creates a dictionary of PDF filenames with their numeric prefixes from a given directory.
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import argparse
+import functools
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+import corrections
+import supplements
+from profiling import StageProfiler
+from validation import QualityReport
+import table_cache
+import text_engine
+from schema import apply_schema
+from race_times import RACE_TIME_PATTERN, parse_race_times
+from sinks import load_results, open_sink
+import cli
+from helpers import (
+    ENGINES,
+    OUTPUT_FILE,
+    check_time_format,
+    filenames_and_prefix_from_dir,
+    find_time_formats_in_string,
+    get_pdf_dir,
+)
+
+# Settings passed to tabula.read_pdf, they are part of the cache key of the extracted tables
+TABULA_SETTINGS = {"pages": "all"}
 
-    Parameters:
-    directory (str): The directory to search for PDF files
-
-    Returns:
-    pdf_dict (Dict[str, str]): A dictionary where the keys are the PDF filenames and the values are their numeric prefixes
-    """
-    # Initialize an empty dictionary to store the PDF filenames and their numeric prefixes
-    pdf_dict: Dict[str, str] = {}
 
-    # Iterate over all files in the specified directory
-    for filename in os.listdir(directory):
-        # Use regex to match the first four digits in the filename
-        match = re.match(r"^(\d{4})", filename)
-
-        # If the file is a PDF and the regex match is successful, add it to the dictionary
-        if filename.endswith(".pdf") and match:
-            pdf_dict[filename] = match.group(1)
-
-    # Return the dictionary
-    return pdf_dict
-
-
-# Function to convert special names
 def replace_special_names(df: pd.DataFrame) -> pd.DataFrame:
     """
     This function replaces specific names in the first column of the DataFrame with corrected versions.
+    The corrections are read from references/name_corrections.csv and applied in one pass.
 
     Parameters:
     df (pd.DataFrame): The DataFrame with names to correct
@@ -49,28 +45,7 @@ def replace_special_names(df: pd.DataFrame) -> pd.DataFrame:
     # Get the first column of the DataFrame
     first_column = df.columns[0]
 
-    df.loc[:, first_column] = df[first_column].str.replace("Aus der Fünten", "Aus-der-Fünten")
-    df.loc[:, first_column] = df[first_column].str.replace("Weiker", "Weiler")
-    df.loc[:, first_column] = df[first_column].str.replace("Wilhelm 194", "Wilhelm, unknown 194")
-    df.loc[:, first_column] = df[first_column].str.replace("Schumacher, 198", "Schumacher, unknown 198")
-    df.loc[:, first_column] = df[first_column].str.replace("Kornenberger, 197", "Kornenberger, unknown 197")
-    df.loc[:, first_column] = df[first_column].str.replace("Nickels-Barth, 197", "Nickels-Barth, unknown 197")
-    df.loc[:, first_column] = df[first_column].str.replace("Angelico, 197", "Angelico, unknown 197")
-    df.loc[:, first_column] = df[first_column].str.replace("Maldener, 197", "Maldener, unknown 197")
-    df.loc[:, first_column] = df[first_column].str.replace("Trampert, 198", "Trampert, unknown 198")
-    df.loc[:, first_column] = df[first_column].str.replace("Grünewald, 196", "Grünewald, unknown 196")
-    df.loc[:, first_column] = df[first_column].str.replace("Wilhelm, 194", "Wilhelm, unknown 194")
-    df.loc[:, first_column] = df[first_column].str.replace("Schumacher, 194", "Schumacher, unknown 194")
-    df.loc[:, first_column] = df[first_column].str.replace("Kallenberger, 197", "Kallenberger, unknown 197")
-    df.loc[:, first_column] = df[first_column].str.replace("Haupenthal, 198", "Haupenthal, unknown 198")
-    df.loc[:, first_column] = df[first_column].str.replace("Przywarra, 198", "Przywarra, unknown 198")
-    df.loc[:, first_column] = df[first_column].str.replace("Freudenreich, 198", "Freudenreich, unknown 198")
-    df.loc[:, first_column] = df[first_column].str.replace("Oberle 197", "Oberle, unknown 197")
-    df.loc[:, first_column] = df[first_column].str.replace("Schneider, 198", "Schneider, unknown 198")
-    df.loc[:, first_column] = df[first_column].str.replace("Mörsdorf, 197", "Mörsdorf, unknown 197")
-    df.loc[:, first_column] = df[first_column].str.replace("Bernarding, 196", "Bernarding, unknown 196")
-    df.loc[:, first_column] = df[first_column].str.replace("Kautenburger, 198", "Kautenburger, unknown 198")
-    df.loc[:, first_column] = df[first_column].str.replace("Müller, Philip", "Müller, Philipp")
+    df.loc[:, first_column] = corrections.default_corrector().apply(df[first_column])
 
     # Return the dataframe with corrected names
     return df
@@ -92,70 +67,50 @@ def delete_first_row(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def split_first_column(df: pd.DataFrame) -> pd.DataFrame:
-    """
-    Function that takes the first column of a dataframe and splits the words by spaces and writes the words into new columns
-    """
+# Pattern of the first column of a page: 'Gesamt Platz AK Platz Startnummer Nachname, Vorname [Vorname2] [Jahrgang] [Rest]',
+# e.g. '1. 1.M30 454 Schedler, Martin 198 m Senioren M30'. The surname is everything up to the comma,
+# a second given name must not look like a year and the year of birth may be cut to 3 digits by tabula
+FIRST_COLUMN_PATTERN = re.compile(
+    r"^\s*(?P<GesamtPlatz>\S+)\s+(?P<PlatzAK>\S+)\s+(?P<Startnummer>\S+)\s+(?P<Name>[^,]+?)\s*,\s*(?P<Vorname1>\S+)"
+    r"(?:\s+(?!(?:19|20)\d)(?P<Vorname2>\S+))?(?:\s+(?P<Jahrgang>(?:19|20)\d{1,2}))?(?:\s+(?P<Rest>.*?))?\s*$"
+)
 
-    # Get the name of the first column
-    first_column = df.columns[0]
-
-    # Remove the "," from the first column
-    df.loc[:, first_column] = df[first_column].str.replace(",", "")
-
-    # Check if the last 4 characters of the first column start with '19' or '20'
-    if df[first_column].str[-4:].str.contains("19|20").all():
-        # If yes, create a separate column for the last 4 characters
-        df.insert(1, "Jahrg", df[first_column].str[-4:])
-        # And remove them from the first column
-        df.loc[:, first_column] = df[first_column].str[:-5]
-
-    # Split the first column by space and expand the result into separate columns
-    split_data = df[first_column].str.split(" ", expand=True)
-
-    # Insert the new columns into the dataframe and remove the original first column
-    for i, col in enumerate(split_data.columns):
-        df.insert(i, f"new_col_{i+1}", split_data[col])
-    df.pop(first_column)
-
-    # Fill any NaN values with an empty string
-    df = df.fillna("")
-
-    return df
+# Pattern of a year of birth at the start of the second column, where tabula puts it on some pages
+LEADING_YEAR_PATTERN = re.compile(r"(?:19|20)\d{2}(?: |$)")
 
 
-def check_first_row(df: pd.DataFrame) -> pd.DataFrame:
-    """
-    This function checks in the first row of the dataframe whether the first 4 characters of the cell either start with '19' or '20'
-    and do not contain ":". If yes, then it adds an empty column before it.
+def split_first_column(df: pd.DataFrame) -> pd.DataFrame:
     """
-    # Convert empty cells to NaN
-    df = convert_empty_to_nan(df)
-
-    # Get the first row of the dataframe
-    first_row = df.iloc[0]
+    This function parses the first column of a dataframe with FIRST_COLUMN_PATTERN in one vectorized pass
+    into the fixed columns 'Gesamt Platz', 'Platz AK', 'Startnummer', 'Name', 'Vorname1', 'Vorname2', 'Jahrgang'
+    and 'Geschlecht', which holds the rest of the cell until update_column8_gender writes the gender.
+    The other columns follow from index 8 on. If a row has no year of birth in the first column,
+    it is taken from the start of the second column.
 
-    # Iterate over each cell in the first row
-    for i, value in enumerate(first_row):
-        # Convert the cell value to a string
-        str_value = str(value)
-
-        # Check if the first 4 characters of the cell start with '19' or '20' and are digits
-        # and the cell index is greater than 4
-        if (
-            i < len(first_row) - 1
-            and ("19" in str_value[:2] or "20" in str_value[:2])
-            and str_value[2:4].isdigit()
-            and i > 4
-        ):
-            # If yes, insert an empty column at the current index
-            df.insert(i, "empty column", "")
-
-    # Convert empty cells to NaN again
-    df = convert_empty_to_nan(df)
+    Parameters:
+    df (pd.DataFrame): The table with the combined name cells in the first column
 
-    # Return the modified dataframe
-    return df
+    Returns:
+    df (pd.DataFrame): The table with the fixed columns in front of the other columns
+    """
+    parts = df.iloc[:, 0].astype(str).str.extract(FIRST_COLUMN_PATTERN)
+    values = parts.to_numpy(dtype=object)
+    others = df.iloc[:, 1:].to_numpy(dtype=object)
+
+    # Take the missing years of birth from the start of the second column and remove them there,
+    # the last column is the year of competition
+    missing = parts["Jahrgang"].isna().to_numpy()
+    if others.shape[1] > 1 and missing.any():
+        second = df.iloc[:, 1].astype(str)
+        moved = missing & second.str.match(LEADING_YEAR_PATTERN).to_numpy()
+        values[moved, 6] = second.str[:4].to_numpy()[moved]
+        others[moved, 0] = second.str[5:].to_numpy()[moved]
+
+    # Build the table once from the values and fill any NaN values with an empty string
+    values = np.hstack([values, others])
+    values[pd.isna(values)] = ""
+    names = COLUMN_NAMES[:6] + ["Jahrgang", "Geschlecht"] + list(df.columns[1:])
+    return pd.DataFrame(values, index=df.index, columns=names)
 
 
 def rename_columns(df: pd.DataFrame) -> pd.DataFrame:
@@ -173,29 +128,24 @@ def rename_columns(df: pd.DataFrame) -> pd.DataFrame:
 
 def convert_empty_to_nan(df: pd.DataFrame) -> pd.DataFrame:
     """
-    This function converts all empty or 'NaN' fields to nan in a DataFrame.
+    This function converts all empty, whitespace-only, 'NaN', 'None' or missing fields to nan in a DataFrame.
+    All values are converted to strings and the empty fields are written as the string 'nan',
+    which is the value the later stages of the cleaning chain check for.
+    All cells are checked in one vectorized pass, so the function only has to be called once per page.
     """
-    # Convert the entire DataFrame to string
-    df = df.astype(str)
-
-    # Rename the columns
-    df = rename_columns(df)
+    # Convert the entire DataFrame to string, missing values become 'nan'
+    df = rename_columns(df.astype(str))
 
-    # Get the list of column names
-    column_names = df.columns
+    # A DataFrame without rows only has empty columns
+    if df.empty:
+        return df.astype(float)
 
-    # Loop through all columns
-    for column_name in column_names:
-        # Replace all empty strings with NaN
-        df[column_name] = df[column_name].replace(r"^\s*$", np.nan, regex=True)
-        # Replace all occurrences of 'NaN', 'None' and np.nan with NaN
-        df[column_name] = df[column_name].replace(["NaN", "None", np.nan], np.nan)
-        # If a column only contains empty strings, replace them with NaN
-        if count_characters_in_column(df, column_name) == 0:
-            df[column_name] = np.nan
+    # Find the empty, whitespace-only, 'NaN' and 'None' fields in all columns at once
+    values = df.to_numpy()
+    empty = (np.char.strip(values.astype(str)) == "") | np.isin(values, ["NaN", "None"])
 
-    # Return the modified DataFrame
-    return df
+    # Replace them with 'nan'
+    return pd.DataFrame(np.where(empty, "nan", values), index=df.index, columns=df.columns)
 
 
 def replace_strings(df: pd.DataFrame) -> pd.DataFrame:
@@ -229,13 +179,8 @@ def clean_columns(df: pd.DataFrame) -> pd.DataFrame:
     If all values in column 8 start with "19" or "20" and the value in column 7 is 'NaN' or 'nan',
     it writes the first 4 characters from column 8 into column 7 and removes those characters from column 8.
     It also removes column 7 and/or 10 if they are empty.
+    The dataframe must already be converted with convert_empty_to_nan.
     """
-    # Convert empty cells to NaN
-    df = convert_empty_to_nan(df)
-
-    # Replace all NaN with None
-    df = df.replace(np.nan, None)
-
     # Check if all values in column 8 start with "19" or "20"
     if df.iloc[:, 7].astype(str).str[:4].str.contains("19|20").all():
         # If the value in column 7 is 'NaN' or 'nan', then write the value from column 8 into column 7
@@ -243,6 +188,8 @@ def clean_columns(df: pd.DataFrame) -> pd.DataFrame:
             df.iloc[:, 6] = df.iloc[:, 7].str[:4]
             # Remove the first 4 characters from column 8
             df.iloc[:, 7] = df.iloc[:, 7].str[4:]
+            # Column 8 may be empty now, convert it like all other empty cells
+            df.iloc[:, 7] = convert_empty_to_nan(df.iloc[:, [7]]).iloc[:, 0].to_numpy()
 
     # Remove column 7 and/or 10 if they are empty
     if df.iloc[:, 9].eq("").all():
@@ -250,73 +197,26 @@ def clean_columns(df: pd.DataFrame) -> pd.DataFrame:
     if df.iloc[:, 6].eq("").all():
         df = df.drop(columns=[df.columns[6]])
 
-    # Convert empty cells to NaN again
-    df = convert_empty_to_nan(df)
-
     # Return the modified DataFrame
     return df
 
 
-def count_characters_in_column(df: pd.DataFrame, column_name: str) -> int:
-    """
-    This function counts the total number of characters in a specified column of a DataFrame.
-    """
-    # Convert the specified column to string
-    df[column_name] = df[column_name].astype(str)
-
-    # Count the total number of characters in the specified column
-    character_counts = df[column_name].str.len().sum()
-
-    # Return the total number of characters
-    return character_counts
-
-
-def update_jahrgang_aus_2012(df: pd.DataFrame) -> pd.DataFrame:
-    """
-    This function updates the 'Jahrgang' column in the input DataFrame based on the values in an Excel file.
-    The Excel file contains 'Startnummer' and 'Jahrgang' columns.
-    If the 'Startnummer' in the DataFrame matches with the 'Startnummer' in the Excel file and the 'Jahr' in the DataFrame is '2012',
-    the 'Jahrgang' in the DataFrame is updated with the 'Jahrgang' from the Excel file.
-    """
-    # Define the path to the Excel file
-    table_jahrgang_path = os.path.join(
-        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "raw", "2012_Name_Jahrgang.xlsx"
-    )
-
-    # Read the Excel file into a DataFrame
-    table_jahrgang_df = pd.read_excel(table_jahrgang_path, engine="openpyxl")
-
-    # Create a dictionary from the Excel DataFrame for quick access to the 'Jahrgang' values based on 'Startnummer'
-    dic_jahrgang = {str(row["Startnummer"]): row["Jahrgang"] for _, row in table_jahrgang_df.iterrows()}
-
-    # Update 'Jahrgang' in the input DataFrame if 'Startnummer' matches in dic_jahrgang and 'Jahr' is '2012'
-    for index, row in df.iterrows():
-        key = row["Startnummer"]
-        if key in dic_jahrgang and df.at[index, "Jahr"] == "2012":
-            df.at[index, "Jahrgang"] = dic_jahrgang[key]
-
-    # Return the updated DataFrame
-    return df
-
-
 def update_column8_gender(df: pd.DataFrame) -> pd.DataFrame:
     """
     This function updates the 8th column (index 7) of the DataFrame with gender information.
-    If the 3rd column (index 2) contains 'M' or 'm', it writes 'm' into the 8th column.
-    If the 3rd column (index 2) contains 'W' or 'w', it writes 'w' into the 8th column.
+    If the 2nd column (index 1) contains 'M' or 'm', it writes 'm' into the 8th column.
+    Otherwise, if the 2nd column (index 1) contains 'W' or 'w', it writes 'w' into the 8th column.
     """
     # Reset the DataFrame index
     df = df.reset_index(drop=True)
 
-    # Iterate over each row in the DataFrame
-    for index, row in df.iterrows():
-        # Convert the value in the 3rd column to lowercase and check if it contains 'm' or 'w'
-        if "m" in str(row.iloc[1]).lower():
-            # If it contains 'm', write 'm' into the 8th column
-            df.iloc[index, 7] = "m"
-        elif "w" in str(row.iloc[1]).lower():
-            # If it contains 'w', write 'w' into the 8th column
-            df.iloc[index, 7] = "w"
+    # Convert the values in the 2nd column to lowercase and check all rows for 'm' or 'w' at once
+    age_class = df.iloc[:, 1].astype(str).str.lower()
+    is_m = age_class.str.contains("m", regex=False)
+    is_w = age_class.str.contains("w", regex=False)
+
+    # Write 'm' or 'w' into the 8th column, the other rows keep their value
+    df.iloc[:, 7] = np.select([is_m, is_w], ["m", "w"], default=df.iloc[:, 7].to_numpy(dtype=object))
 
     # Return the updated DataFrame
     return df
@@ -351,78 +251,79 @@ def get_first_x_characters(df: pd.DataFrame, x: int, column_name: str, column_in
     return df
 
 
-def get_one_dataframe(dic: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+# Column names of the combined dataframe
+COLUMN_NAMES = [
+    "Gesamt Platz",
+    "Platz AK",
+    "Startnummer",
+    "Name",
+    "Vorname1",
+    "Vorname2",
+    "Jahrgang",
+    "Geschlecht",
+    "Zeit",
+    "Jahr",
+]
+
+
+def aligned_column_values(df: pd.DataFrame) -> List[np.ndarray]:
     """
-    This function combines multiple dataframes into one and returns the combined dataframe.
+    This function selects the values of a processed dataframe for the columns of the combined dataframe:
+    the first 9 columns and the last column. Missing columns are filled with empty strings,
+    a dataframe with less than 10 columns has no year column, so its last column is empty as well.
 
     Parameters:
-    dic (Dict[str, pd.DataFrame]): A dictionary of dataframes
+    df (pd.DataFrame): A processed dataframe
 
     Returns:
-    pd.DataFrame: The combined dataframe
+    List[np.ndarray]: The values of each column in COLUMN_NAMES
     """
+    number_of_columns = len(COLUMN_NAMES)
+    number_of_df_columns = len(df.columns)
+    df_values = df.to_numpy(dtype=object)
+    empty = np.full(len(df), "", dtype=object)
 
-    def validiere_und_transformiere_zeit(time_string: str) -> str:
-        """
-        This function validates and transforms a time string.
-
-        Parameters:
-        time_string (str): The time string
-
-        Returns:
-        str: The validated and transformed time string
-        """
-        regex_mm_ss = r"^\d{2}:\d{2}$"
-        regex_hh_mm_ss = r"^\d{1,2}:\d{2}:\d{2}$"
-
-        if re.match(regex_mm_ss, time_string):
-            return "00:" + time_string
-        elif re.match(regex_hh_mm_ss, time_string):
-            return time_string
-        else:
-            return "00:00:00"
-
-    # Initialize an empty dictionary to store the dataframes
-    dataframes = {}
-
-    # Initialize an empty dataframe
-    one_df = pd.DataFrame()
-
-    # Define the column names
-    column_name = [
-        "Gesamt Platz",
-        "Platz AK",
-        "Startnummer",
-        "Name",
-        "Vorname1",
-        "Vorname2",
-        "Jahrgang",
-        "Geschlecht",
-        "Zeit",
-        "Jahr",
-    ]
-    number_of_columns = len(column_name)
+    columns = [df_values[:, i] if i < number_of_df_columns else empty for i in range(number_of_columns - 1)]
+    columns.append(df_values[:, -1] if number_of_df_columns >= number_of_columns else empty)
+    return columns
 
-    j = 0
-    # Iterate over the dataframes in the dictionary
-    for key, df in dic.items():
-        # If the number of columns is less than the required number, add empty columns
-        if number_of_columns > len(df.columns):
-            for i in range(number_of_columns - len(df.columns)):
-                df.insert(len(df.columns), f"Spalte {i+1}", "")
 
-        # Select the first 7 columns and the last column
-        df = pd.concat([df.iloc[:, : number_of_columns - 1], df.iloc[:, -1:]], axis=1)
+def align_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    This function brings a processed dataframe into the columns of the combined dataframe.
 
-        # Rename the columns
-        df.columns = column_name
+    Parameters:
+    df (pd.DataFrame): A processed dataframe
 
-        # Add the dataframe to the combined dataframe
-        one_df = pd.concat([one_df, df], ignore_index=True)
-        dataframes[f"df{j+1}"] = df
-        j += 1
+    Returns:
+    pd.DataFrame: The dataframe with the columns in COLUMN_NAMES
+    """
+    return pd.DataFrame(dict(zip(COLUMN_NAMES, aligned_column_values(df))), index=df.index)
 
-    one_df = update_jahrgang_aus_2012(one_df)
+
+def convert_column_types(
+    one_df: pd.DataFrame, quality: Optional[QualityReport] = None, sources: Optional[np.ndarray] = None
+) -> pd.DataFrame:
+    """
+    This function adds the values of the supplementary tables, e.g. the Jahrgang values of 2012,
+    and converts the columns of the combined dataframe into the data types of schema.RESULTS_SCHEMA.
+    It works row by row, so it can be applied to the whole combined dataframe or to each page separately.
+
+    Parameters:
+    one_df (pd.DataFrame): A dataframe with the columns in COLUMN_NAMES
+    quality (Optional[QualityReport]): If given, the rows are validated first and the failed rows are quarantined
+        in the report instead of raising an error during the conversion
+    sources (Optional[np.ndarray]): The PDF file of each row for the quality report
+
+    Returns:
+    pd.DataFrame: The dataframe with converted data types
+    """
+
+    one_df = supplements.apply_supplements(one_df)
+
+    # Keep only the rows that can be converted and pass the checks of the quality report
+    if quality is not None:
+        one_df = quality.check(one_df, sources).reset_index(drop=True)
 
     # Define data types of the columns in dataframe.
 
@@ -438,62 +339,93 @@ def get_one_dataframe(dic: Dict[str, pd.DataFrame]) -> pd.DataFrame:
     one_df["Jahrgang"] = one_df["Jahrgang"].astype(int)
     one_df["Geschlecht"] = one_df["Geschlecht"].astype(str)
 
-    one_df["Zeit"] = one_df["Zeit"].astype(str)
-    one_df["Zeit"] = one_df["Zeit"].str.replace("[", "").str.replace("]", "").str.replace("'", "")
-    one_df["Zeit"] = one_df["Zeit"].apply(validiere_und_transformiere_zeit)
-    one_df["Zeit"] = pd.to_datetime(one_df["Zeit"], format="%H:%M:%S").dt.time
+    # Convert the times into durations, times that cannot be parsed become NaT
+    one_df["Zeit"] = parse_race_times(one_df["Zeit"])
 
     one_df["Jahr"] = one_df["Jahr"].astype(int)
 
-    # Save the combined dataframe to an Excel file
-    one_df.to_excel("one_def_1.xlsx")
-
-    return one_df
+    # Store the columns in the compact data types of the schema
+    return apply_schema(one_df)
 
 
-def check_time_format(time_string) -> bool:
+def combine_dataframes(dataframes: Iterable[pd.DataFrame]) -> pd.DataFrame:
     """
-    This function checks if a given time string is in a valid format.
-    Valid formats are 'HH:MM:SS' or 'MM:SS', where HH is 00-23, MM is 00-59, and SS is 00-59.
+    This function brings the processed dataframes into the columns of the combined dataframe
+    and concatenates them with a single copy of all rows.
 
     Parameters:
-    time_string (str): The time string to check
+    dataframes (Iterable[pd.DataFrame]): The processed dataframes
 
     Returns:
-    bool: True if the time string is in a valid format, False otherwise
+    pd.DataFrame: The combined dataframe with the columns in COLUMN_NAMES, before the data type conversion
     """
-    # Define the regular expression pattern for the time format
-    pattern = r"^(?:\d|1\d|2[0-3]):[0-5]\d:[0-5]\d$|^[0-5]\d:[0-5]\d$"
+    # Collect the values of each column of all dataframes
+    values: List[List[np.ndarray]] = [[] for _ in COLUMN_NAMES]
+    for df in dataframes:
+        for column_values, page_values in zip(values, aligned_column_values(df)):
+            column_values.append(page_values)
+
+    if not values[0]:
+        return pd.DataFrame(columns=COLUMN_NAMES)
 
-    # Use the re.match function to check if the time string matches the pattern
-    return bool(re.match(pattern, time_string))
+    # Concatenate each column once and build the combined dataframe from the columns
+    return pd.DataFrame({name: np.concatenate(column_values) for name, column_values in zip(COLUMN_NAMES, values)})
 
 
-def find_time_formats_in_string(input_string) -> list[str]:
+def get_one_dataframe(
+    dic: Dict[str, pd.DataFrame], output_file: Optional[str] = OUTPUT_FILE, quality: Optional[QualityReport] = None
+) -> pd.DataFrame:
     """
-    This function finds all time formats in a given string.
-    The time formats can be 'HH:MM:SS' or 'MM:SS', where HH is 00-23, MM is 00-59, and SS is 00-59.
+    This function combines multiple dataframes into one and returns the combined dataframe.
 
     Parameters:
-    input_string (str): The string to search for time formats
+    dic (Dict[str, pd.DataFrame]): A dictionary of dataframes
+    output_file (Optional[str]): The Excel file or the directory of the Parquet dataset the combined dataframe
+        is saved to, None to not save it
+    quality (Optional[QualityReport]): If given, all rows are validated at once and the failed rows are quarantined
 
     Returns:
-    matches (List[str]): A list of all time formats found in the string
+    pd.DataFrame: The combined dataframe
     """
-    # Define the regular expression pattern for the time format
-    pattern = r"(\d{1,2}:\d{2}(?::\d{2})?)"
+    # Bring every dataframe into the columns of the combined dataframe and combine them in one step
+    one_df = combine_dataframes(dic.values())
 
-    # Use the re.findall function to find all occurrences of the pattern in the string
-    matches = re.findall(pattern, input_string)
+    # The PDF file of each row, from the pages tagged by iter_dataframes and clean_tables_parallel,
+    # and the lines of the text engine that could not be parsed
+    sources = None
+    if quality is not None:
+        sources = np.repeat([df.attrs.get("pdf", "") for df in dic.values()], [len(df) for df in dic.values()])
+        for df in dic.values():
+            quality.add_unparsed_lines(df.attrs.get("pdf", ""), df.attrs.get("unparsed_lines", []))
 
-    # Return the list of all time formats found in the string
-    return matches
+    # Define data types of the columns in dataframe
+    one_df = convert_column_types(one_df, quality, sources)
+
+    # Save the combined dataframe to an Excel file or a Parquet dataset
+    if output_file is not None:
+        save_results(one_df, output_file)
+
+    return one_df
+
+
+def save_results(df: pd.DataFrame, output_file: str = OUTPUT_FILE) -> None:
+    """
+    This function saves the combined dataframe to an Excel file or, for paths not ending in .xlsx,
+    to a Parquet dataset partitioned by year.
+
+    Parameters:
+    df (pd.DataFrame): The combined dataframe
+    output_file (str): The Excel file or the directory of the Parquet dataset
+    """
+    with open_sink(output_file) as sink:
+        sink.write(df)
 
 
 def get_time_format_in_column(df: pd.DataFrame, column_index: int) -> pd.DataFrame:
     """
     This function checks a column of a DataFrame for values in a time format.
     The time formats can be 'HH:MM:SS' or 'MM:SS', where HH is 00-23, MM is 00-59, and SS is 00-59.
+    Each value is replaced by the first time found in it including tenths of a second, or NaN if it contains no time.
 
     Parameters:
     df (pd.DataFrame): The DataFrame to check
@@ -502,22 +434,44 @@ def get_time_format_in_column(df: pd.DataFrame, column_index: int) -> pd.DataFra
     Returns:
     df (pd.DataFrame): The DataFrame with the checked column
     """
-    # Convert the column to string
-    df.iloc[:, column_index] = df.iloc[:, column_index].astype(str)
-
-    # Iterate over the rows of the DataFrame
-    for index, row in df.iterrows():
-        # Check if the value in the column contains a time format
-        row.iloc[column_index] = find_time_formats_in_string(row.iloc[column_index])
+    # Extract the first time format of each value of the column in one pass
+    df.iloc[:, column_index] = df.iloc[:, column_index].astype(str).str.extract(RACE_TIME_PATTERN, expand=False)
 
     # Return the DataFrame with the checked column
     return df
 
 
+# Regular expressions of the kinds of cells looked for by classify_columns: a time 'H:MM:SS' or 'MM:SS' and a year
+LAYOUT_PATTERNS: Dict[str, str] = {"time": r"\d{1,2}:\d{2}:\d{2}|\d{2}:\d{2}", "year": r"\d{4}"}
+
+
+def classify_columns(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    This function checks all cells of a page at once for a time and a year.
+    The cells are stacked into one column, so each regular expression runs once over the whole page
+    instead of once per column. Only string cells can match.
+
+    Parameters:
+    df (pd.DataFrame): The page or some of its columns
+
+    Returns:
+    Dict[str, np.ndarray]: For 'time' and 'year', whether any cell of each column contains a time or a year
+    """
+    rows, columns = df.shape
+    cells = pd.Series(df.to_numpy(dtype=object).ravel(order="F"), dtype=object)
+    return {
+        kind: cells.str.contains(pattern, na=False).to_numpy(dtype=bool).reshape(columns, rows).any(axis=1)
+        for kind, pattern in LAYOUT_PATTERNS.items()
+    }
+
+
 def define_time_and_year_columns(df: pd.DataFrame) -> pd.DataFrame:
     """
     This function checks a DataFrame for columns containing time and year values.
     If found, it moves these values to specific columns and removes all other columns.
+    The columns are classified once with classify_columns and the column mapping is chosen once per page:
+    the last column from index 8 with a time becomes 'Zeit' at index 8, then the last column from index 8
+    with a year becomes 'Jahr' at index 9.
 
     Parameters:
     df (pd.DataFrame): The DataFrame to check
@@ -525,139 +479,583 @@ def define_time_and_year_columns(df: pd.DataFrame) -> pd.DataFrame:
     Returns:
     df (pd.DataFrame): The DataFrame with the checked columns
     """
+    # Classify the columns from index 8 on, kinds[...][k] belongs to the column at index 8 + k
+    kinds = classify_columns(df.iloc[:, 8:])
+    sources = list(range(df.shape[1]))
+    names = list(df.columns)
+
+    # The time column is copied to index 8
+    time_columns = [8 + k for k in np.flatnonzero(kinds["time"])]
+    if time_columns:
+        sources[8] = time_columns[-1]
+        names[8] = "Zeit"
+
+    # The year column is copied to index 9, index 8 now holds the values of the time column
+    year_columns = [k for k in range(8, len(sources)) if kinds["year"][sources[k] - 8]]
+    if year_columns:
+        sources[9] = sources[year_columns[-1]]
+        names[9] = "Jahr"
+
+    # Keep the first 10 columns
+    result = df.iloc[:, sources[:10]]
+    result.columns = names[:10]
 
-    # Function to check if a value contains a time format
-    def contains_time(val):
-        if isinstance(val, list):
-            # Überprüfen Sie, ob die Liste mindestens ein Element enthält
-            if len(val) > 0:
-                # Wenn 'my_list' eine Liste ist, konvertieren Sie das erste Element in einen String
-                val = str(val[0])
-        if isinstance(val, str):
-            return re.search(r"(\d{1,2}:\d{2}:\d{2})|(\d{2}:\d{2})", val) is not None
-        return False
+    # Return the DataFrame with the checked columns
+    return result
+
+
+def tabula_uses_persistent_jvm() -> bool:
+    """
+    This function checks whether tabula can run inside one persistent JVM session (via JPype).
+    Without JPype, tabula falls back to its subprocess mode, which starts a new JVM for every PDF.
 
-    # Function to check if a value contains a year
-    def contains_year(val):
-        if isinstance(val, str):
-            return re.search(r"\d{4}", val) is not None
+    Returns:
+    bool: True if JPype is available, False otherwise
+    """
+    try:
+        import jpype  # noqa: F401
+    except ImportError:
         return False
+    return True
 
-    # Check each column from index 8 for a time formatt
-    for col in df.columns[8:]:
-        b_time = False
-        if df[col].apply(contains_time).any():
-            df.iloc[:, 8] = df[col]
-            b_time = True
-            # Spalte index 8 den Namen Zeit geben
-            df = df.rename(columns={df.columns[8]: "Zeit"})
-
-    # Check each column from index 8 for a year
-    for col in df.columns[8:]:
-        b_year = False
-        if df[col].apply(contains_year).any():
-            df.iloc[:, 9] = df[col]
-            b_year = True
-            # Spalte index 9 den Namen Jahr geben
-            df = df.rename(columns={df.columns[9]: "Jahr"})
-
-    # Remove all columns from index 10
-    df = df.iloc[:, :10]
 
-    # Return the DataFrame with the checked columns
+def read_pdf_tables(pdf_path: str, use_cache: bool = True) -> List[pd.DataFrame]:
+    """
+    This function reads the raw tables of a PDF file with tabula.
+    The tables are cached by the content hash of the file and the tabula settings,
+    so an unchanged PDF is only parsed once.
+
+    Parameters:
+    pdf_path (str): The path to the PDF file
+    use_cache (bool): Whether the tables are loaded from and stored in the cache
+
+    Returns:
+    List[pd.DataFrame]: The raw tables of the PDF file
+    """
+    import tabula
+
+    if not use_cache:
+        return tabula.read_pdf(pdf_path, force_subprocess=False, **TABULA_SETTINGS)
+
+    # Look up the tables in the cache
+    key = table_cache.cache_key(pdf_path, {"tabula": tabula.__version__, **TABULA_SETTINGS})
+    tables = table_cache.load_tables(key)
+    if tables is None:
+        # Read the tables from the PDF file, reusing the JVM of the previous call
+        tables = tabula.read_pdf(pdf_path, force_subprocess=False, **TABULA_SETTINGS)
+        table_cache.store_tables(key, tables)
+
+    return tables
+
+
+def extract_pdf(pdf_path: str, year: str, use_cache: bool = True) -> Tuple[List[pd.DataFrame], float]:
+    """
+    This function reads the raw tables of one PDF file and inserts the year of competition into each table.
+
+    Parameters:
+    pdf_path (str): The path to the PDF file
+    year (str): The year of competition, the numeric prefix of the filename
+    use_cache (bool): Whether the tables are loaded from and stored in the cache
+
+    Returns:
+    Tuple[List[pd.DataFrame], float]: The raw tables and the extraction time in seconds
+    """
+    start = time.perf_counter()
+    # Read the tables from the PDF file or the cache
+    tables = read_pdf_tables(pdf_path, use_cache)
+    seconds = time.perf_counter() - start
+
+    # Insert the year of competition into each table
+    for df_table in tables:
+        df_table.insert(len(df_table.columns), "Jahr", year)
+
+    return tables, seconds
+
+
+def use_header_row(df: pd.DataFrame, page_index: int) -> pd.DataFrame:
+    """
+    This function uses the first row of a raw table as column names and removes the header rows.
+
+    Parameters:
+    df (pd.DataFrame): The raw table
+    page_index (int): The index of the page in its PDF file, the first page has two header rows
+
+    Returns:
+    df (pd.DataFrame): The table without the header rows
+    """
+    df.columns = df.iloc[0]
+    return df[2:] if page_index == 0 else df[1:]
+
+
+def get_time_formats_in_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    This function extracts the time formats from every column from the 9th column on, except the last column.
+
+    Parameters:
+    df (pd.DataFrame): The DataFrame to check
+
+    Returns:
+    df (pd.DataFrame): The DataFrame with the checked columns
+    """
+    # Loop over each column beginn in 9.column in the dataframe
+    for k in range(8, df.shape[1] - 1):
+        # Extract the time format from the column
+        df = get_time_format_in_column(df, k)
+    return df
+
+
+def cleaning_stages(page_index: int) -> List[Tuple[str, Callable[[pd.DataFrame], pd.DataFrame]]]:
+    """
+    This function returns the stages of the cleaning chain for one page of a PDF file.
+
+    Parameters:
+    page_index (int): The index of the page in its PDF file, the first page has two header rows
+
+    Returns:
+    List[Tuple[str, Callable[[pd.DataFrame], pd.DataFrame]]]: The name and the function of each stage
+    """
+    return [
+        ("delete_first_row", delete_first_row),
+        ("replace_special_names", replace_special_names),
+        ("use_header_row", functools.partial(use_header_row, page_index=page_index)),
+        ("replace_strings", replace_strings),
+        ("split_first_column", split_first_column),
+        ("convert_empty_to_nan", convert_empty_to_nan),
+        ("rename_columns", rename_columns),
+        ("clean_columns", clean_columns),
+        ("get_first_x_characters", lambda df: get_first_x_characters(df, 4, "", 6)),
+        ("update_column8_gender", update_column8_gender),
+        ("get_time_formats_in_columns", get_time_formats_in_columns),
+        ("define_time_and_year_columns", define_time_and_year_columns),
+    ]
+
+
+def clean_table(
+    df: pd.DataFrame, page_index: int, profiler: Optional[StageProfiler] = None, pdf: str = ""
+) -> pd.DataFrame:
+    """
+    This function runs the cleaning chain on one raw table (one page of a PDF file).
+
+    Parameters:
+    df (pd.DataFrame): The raw table with the year of competition in the last column
+    page_index (int): The index of the page in its PDF file, the first page has two header rows
+    profiler (Optional[StageProfiler]): If given, the time, rows and memory of each stage are recorded
+    pdf (str): The filename of the PDF file, used for the records of the profiler
+
+    Returns:
+    df (pd.DataFrame): The processed dataframe
+    """
+    # Without a profiler the stages run without any measurement
+    if profiler is None:
+        for _, stage in cleaning_stages(page_index):
+            df = stage(df)
+        return df
+
+    for name, stage in cleaning_stages(page_index):
+        df = profiler.run_stage(pdf, page_index, name, stage, df)
     return df
 
 
-def get_dataframes() -> Dict[str, pd.DataFrame]:
+def clean_table_profiled(
+    df: pd.DataFrame, page_index: int, pdf: str, trace_memory: bool = False
+) -> Tuple[pd.DataFrame, List[Dict]]:
+    """
+    This function runs the cleaning chain on one raw table with its own profiler, e.g. in a worker process,
+    and returns the records of the profiler with the processed dataframe.
+
+    Parameters:
+    df (pd.DataFrame): The raw table with the year of competition in the last column
+    page_index (int): The index of the page in its PDF file
+    pdf (str): The filename of the PDF file
+    trace_memory (bool): Whether the memory of each stage is measured, see StageProfiler
+
+    Returns:
+    Tuple[pd.DataFrame, List[Dict]]: The processed dataframe and the records of the profiler
+    """
+    profiler = StageProfiler(trace_memory)
+    df = clean_table(df, page_index, profiler, pdf)
+    return df, profiler.records
+
+
+def clean_tables_parallel(
+    pdf_dir: str,
+    filenames_prefix: Dict[str, str],
+    workers: int,
+    timings: Optional[Dict[str, float]] = None,
+    use_cache: bool = True,
+    engine: str = "tabula",
+    profiler: Optional[StageProfiler] = None,
+) -> List[pd.DataFrame]:
+    """
+    This function extracts and cleans the tables of the PDF files in a pool of worker processes.
+    Every PDF file is extracted in its own task and every page is cleaned in its own task,
+    so the pages of one file are cleaned while the next files are still extracted.
+    The results are collected in the order of the files and pages, as in the sequential processing.
+
+    Parameters:
+    pdf_dir (str): The directory containing the PDF files
+    filenames_prefix (Dict[str, str]): A dictionary of PDF filenames and their numeric prefixes (the year)
+    workers (int): The number of worker processes
+    timings (Optional[Dict[str, float]]): If given, the extraction time in seconds is stored per filename
+    use_cache (bool): Whether unchanged PDF files are loaded from the table cache
+    engine (str): The extraction engine, one of ENGINES
+    profiler (Optional[StageProfiler]): If given, the records of the workers are added to it
+
+    Returns:
+    List[pd.DataFrame]: The processed dataframes in the order of the files and pages
+    """
+    # Start the workers with spawn, a forked copy of a process with a running JVM cannot use tabula.
+    # Every task returns the name corrections it made with its result, they are added to the counts of this process
+    corrector = corrections.default_corrector()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        # Start the extraction of all PDF files
+        extract = text_engine.extract_pdf if engine == "text" else extract_pdf
+        extractions = {
+            key: executor.submit(corrections.run_counted, extract, os.path.join(pdf_dir, key), value, use_cache)
+            for key, value in filenames_prefix.items()
+        }
+
+        # Start the cleaning of the pages of each file as soon as the file is extracted,
+        # the pages of the text engine need no cleaning
+        cleanings: List[Union[Future, pd.DataFrame]] = []
+        sources: List[str] = []
+        for key, extraction in extractions.items():
+            (tables, seconds), counts = extraction.result()
+            corrector.add_counts(counts)
+            if timings is not None:
+                timings[key] = seconds
+            if profiler is not None:
+                profiler.record(key, -1, "extract_pdf", seconds, 0, sum(len(df) for df in tables))
+            if engine == "text":
+                cleanings.extend(tables)
+            elif profiler is not None:
+                cleanings.extend(
+                    executor.submit(corrections.run_counted, clean_table_profiled, df, i, key, profiler.trace_memory)
+                    for i, df in enumerate(tables)
+                )
+            else:
+                cleanings.extend(
+                    executor.submit(corrections.run_counted, clean_table, df, i) for i, df in enumerate(tables)
+                )
+            sources.extend(key for _ in tables)
+
+        # Collect the processed dataframes in submission order
+        results = []
+        for cleaning, key in zip(cleanings, sources):
+            if isinstance(cleaning, Future):
+                result, counts = cleaning.result()
+                corrector.add_counts(counts)
+            else:
+                result = cleaning
+            if isinstance(result, tuple):
+                # A page cleaned with its own profiler
+                result, records = result
+                profiler.extend(records)
+            # Tag the page with its PDF file for the quality report
+            result.attrs["pdf"] = key
+            results.append(result)
+        return results
+
+
+def iter_dataframes(
+    filenames_prefix: Optional[Dict[str, str]] = None,
+    timings: Optional[Dict[str, float]] = None,
+    use_cache: bool = True,
+    pdf_dir: Optional[str] = None,
+    engine: str = "tabula",
+    profiler: Optional[StageProfiler] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    This function reads the PDF files one after another and yields the processed dataframe of each page.
+    Only the raw tables of the current PDF file and the current processed page are kept in memory.
+
+    Parameters:
+    filenames_prefix (Optional[Dict[str, str]]): The PDF files to process with their numeric prefixes,
+        all PDF files in pdf_dir if None
+    timings (Optional[Dict[str, float]]): If given, the extraction time in seconds is stored per filename
+    use_cache (bool): Whether unchanged PDF files are loaded from the table cache
+    pdf_dir (Optional[str]): The directory containing the PDF files, data/raw if None
+    engine (str): The extraction engine, one of ENGINES
+    profiler (Optional[StageProfiler]): If given, the time, rows and memory of each stage are recorded
+
+    Yields:
+    pd.DataFrame: The processed dataframe of each page
+    """
+    if pdf_dir is None:
+        pdf_dir = get_pdf_dir()
+    if filenames_prefix is None:
+        filenames_prefix = filenames_and_prefix_from_dir(pdf_dir)
+
+    # Loop over each PDF file
+    for key, value in filenames_prefix.items():
+        extract = text_engine.extract_pdf if engine == "text" else extract_pdf
+        tables, seconds = extract(os.path.join(pdf_dir, key), value, use_cache)
+        if timings is not None:
+            timings[key] = seconds
+        if profiler is not None:
+            profiler.record(key, -1, "extract_pdf", seconds, 0, sum(len(df) for df in tables))
+
+        if engine == "text":
+            # The text engine returns pages that need no cleaning
+            for df in tables:
+                df.attrs["pdf"] = key
+                yield df
+            continue
+
+        # Process the pages one by one and release each raw table once it is processed,
+        # each page is tagged with its PDF file for the quality report
+        for i in range(len(tables)):
+            df, tables[i] = tables[i], None
+            df = clean_table(df, i, profiler, key)
+            df.attrs["pdf"] = key
+            yield df
+
+
+def stream_results(
+    sink,
+    filenames_prefix: Optional[Dict[str, str]] = None,
+    timings: Optional[Dict[str, float]] = None,
+    use_cache: bool = True,
+    pdf_dir: Optional[str] = None,
+    engine: str = "tabula",
+    profiler: Optional[StageProfiler] = None,
+    quality: Optional[QualityReport] = None,
+) -> int:
+    """
+    This function processes the PDF files page by page and writes the rows of each page into a sink,
+    e.g. an ExcelSink. The combined dataframe is never built in memory.
+
+    Parameters:
+    sink: An object with a write(df) method that receives the rows of each page in the combined columns
+    filenames_prefix (Optional[Dict[str, str]]): The PDF files to process with their numeric prefixes,
+        all PDF files in pdf_dir if None
+    timings (Optional[Dict[str, float]]): If given, the extraction time in seconds is stored per filename
+    use_cache (bool): Whether unchanged PDF files are loaded from the table cache
+    pdf_dir (Optional[str]): The directory containing the PDF files, data/raw if None
+    engine (str): The extraction engine, one of ENGINES
+    profiler (Optional[StageProfiler]): If given, the time, rows and memory of each stage are recorded
+    quality (Optional[QualityReport]): If given, the rows of each page are validated and the failed rows quarantined
+
+    Returns:
+    int: The number of written rows
+    """
+    rows = 0
+    for df in iter_dataframes(filenames_prefix, timings, use_cache, pdf_dir, engine, profiler):
+        # Bring the page into the columns and data types of the combined dataframe
+        sources = np.full(len(df), df.attrs.get("pdf", ""), dtype=object)
+        if quality is not None:
+            quality.add_unparsed_lines(df.attrs.get("pdf", ""), df.attrs.get("unparsed_lines", []))
+        df = convert_column_types(align_columns(df), quality, sources)
+        sink.write(df)
+        rows += len(df)
+    return rows
+
+
+def get_dataframes(
+    timings: Optional[Dict[str, float]] = None,
+    use_cache: bool = True,
+    filenames_prefix: Optional[Dict[str, str]] = None,
+    workers: int = 1,
+    pdf_dir: Optional[str] = None,
+    engine: str = "tabula",
+    profiler: Optional[StageProfiler] = None,
+) -> Dict[str, pd.DataFrame]:
     """
     This function reads PDF files from a directory, extracts tables from them, processes the tables,
     and stores them in a dictionary.
 
+    Parameters:
+    timings (Optional[Dict[str, float]]): If given, the extraction time in seconds is stored per filename
+    use_cache (bool): Whether unchanged PDF files are loaded from the table cache
+    filenames_prefix (Optional[Dict[str, str]]): The PDF files to process with their numeric prefixes,
+        all PDF files in data/raw if None
+    workers (int): The number of worker processes, the files are processed sequentially if 1
+    pdf_dir (Optional[str]): The directory containing the PDF files, data/raw if None
+    engine (str): The extraction engine, one of ENGINES
+    profiler (Optional[StageProfiler]): If given, the time, rows and memory of each stage are recorded
+
     Returns:
     dataframes (Dict[str, pd.DataFrame]): A dictionary of processed dataframes
     """
-    # Get the path to the currently executing file
-    current_directory = os.path.dirname(os.path.abspath(__file__))
-
     # Define the directory where the raw PDF data is stored
-    parent_directory = os.path.dirname(current_directory)
-    pdf_dir: str = parent_directory + "/data/raw"
+    if pdf_dir is None:
+        pdf_dir = get_pdf_dir()
 
     # Create a dictionary of PDF files with a numeric prefix
-    filenames_prefix = filenames_and_prefix_from_dir(pdf_dir)
+    if filenames_prefix is None:
+        filenames_prefix = filenames_and_prefix_from_dir(pdf_dir)
 
-    # Initialize a list to store the tables read from the PDFs
-    result_table = []
-    all_dfs = []
-
-    # Loop over each PDF file
-    for key, value in filenames_prefix.items():
-        # Read the tables from the current PDF file
-        test_table = tabula.read_pdf(pdf_dir + "/" + key, pages="all")
-        # Insert the year of competition into each table
-        for df_testtable in test_table:
-            df_testtable.insert(len(df_testtable.columns), "Jahr", value)
-        # Add the tables to the result list
-        result_table.append(test_table)
+    if workers > 1:
+        # Extract and clean the files and pages in parallel
+        all_dfs = clean_tables_parallel(pdf_dir, filenames_prefix, workers, timings, use_cache, engine, profiler)
+    else:
+        # Read the PDF files one after another in one tabula session and preprocess each table
+        all_dfs = list(iter_dataframes(filenames_prefix, timings, use_cache, pdf_dir, engine, profiler))
 
     # Initialize a dictionary to store the processed dataframes
-    dic_dataframes = {}
-    j = 0
-
-    # Loop over each table in the result list
-    for table in result_table:
-        for i, df in enumerate(table):
-            # Preprocess the dataframe
-            df = delete_first_row(df)
-            df = replace_special_names(df)
-            df.columns = df.iloc[0]
-            df = df[2:] if i == 0 else df[1:]
-            split_df = convert_empty_to_nan(df)
-            split_df = replace_strings(df)
-            split_df = split_first_column(split_df)
-            split_df = split_df.astype(str)
-            split_df = check_first_row(split_df)
-            split_df = rename_columns(split_df)
-            split_df = clean_columns(split_df)
-            split_df = get_first_x_characters(split_df, 4, "", 6)
-            split_df = update_column8_gender(split_df)
-
-            # Loop over each column beginn in 9.column in the dataframe
-            for k in range(8, split_df.shape[1] - 1):
-                # Extract the time format from the column
-                split_df = get_time_format_in_column(split_df, k)
-
-            # Define the time and year columns
-            split_df = define_time_and_year_columns(split_df)
-
-            # Add the processed dataframe to the dictionary
-            dic_dataframes[f"split_df{j+1}"] = split_df
-            j += 1
-            if j == 3:
-                pass
-
-            # Add the processed dataframe to the list
-            all_dfs.append(split_df)
+    dic_dataframes = {f"split_df{j+1}": split_df for j, split_df in enumerate(all_dfs)}
 
     # Return the dictionary of processed dataframes
     return dic_dataframes
 
 
-def main() -> pd.DataFrame:
+def print_extraction_timings(timings: Dict[str, float], engine: str = "tabula") -> None:
+    """
+    This function prints the extraction time of each PDF file and the total extraction time.
+
+    Parameters:
+    timings (Dict[str, float]): A dictionary of PDF filenames and their extraction time in seconds
+    engine (str): The extraction engine, one of ENGINES, only tabula starts a JVM
+    """
+    if engine == "tabula" and not tabula_uses_persistent_jvm():
+        print("JPype is not installed, tabula starts a new JVM for every PDF file.")
+    for filename, seconds in timings.items():
+        print(f"{filename}: {seconds:.2f} s")
+    print(f"Extraction of {len(timings)} PDF files: {sum(timings.values()):.2f} s")
+
+
+def main_streaming(
+    use_cache: bool = True,
+    output_file: str = OUTPUT_FILE,
+    engine: str = "tabula",
+    profiler: Optional[StageProfiler] = None,
+    quality: Optional[QualityReport] = None,
+) -> int:
+    """
+    This function processes the PDF files page by page and streams the rows into the Excel file
+    or the Parquet dataset, so the memory use is bounded by one PDF file and one page instead of the whole archive.
+
+    Parameters:
+    use_cache (bool): Whether unchanged PDF files are loaded from the table cache
+    output_file (str): The Excel file or the directory of the Parquet dataset the rows are written to
+    engine (str): The extraction engine, one of ENGINES
+    profiler (Optional[StageProfiler]): If given, the time, rows and memory of each stage are recorded
+    quality (Optional[QualityReport]): If given, the rows are validated and the failed rows are quarantined in it
+
+    Returns:
+    int: The number of written rows
+    """
+    timings: Dict[str, float] = {}
+    with open_sink(output_file) as sink:
+        rows = stream_results(
+            sink, timings=timings, use_cache=use_cache, engine=engine, profiler=profiler, quality=quality
+        )
+    print_extraction_timings(timings, engine)
+    return rows
+
+
+def main_incremental(
+    use_cache: bool = True,
+    output_file: str = OUTPUT_FILE,
+    workers: int = 1,
+    engine: str = "tabula",
+    profiler: Optional[StageProfiler] = None,
+    quality: Optional[QualityReport] = None,
+) -> pd.DataFrame:
+    """
+    This function only processes the PDF files whose year is not yet in the saved combined dataframe
+    and appends their rows to it. Without a saved combined dataframe, all PDF files are processed.
+
+    Parameters:
+    use_cache (bool): Whether unchanged PDF files are loaded from the table cache
+    output_file (str): The Excel file or the directory of the Parquet dataset of the combined dataframe
+    workers (int): The number of worker processes used to extract and clean the PDF files
+    engine (str): The extraction engine, one of ENGINES
+    profiler (Optional[StageProfiler]): If given, the time, rows and memory of each stage are recorded
+    quality (Optional[QualityReport]): If given, the rows are validated and the failed rows are quarantined in it
+
+    Returns:
+    pd.DataFrame: The combined dataframe
+    """
+    if not os.path.exists(output_file):
+        return main(use_cache, output_file, workers, engine, profiler, quality=quality)
+
+    # Load the saved dataframe and get the years it already contains
+    saved_df = load_results(output_file)
+    saved_years = set(saved_df["Jahr"].astype(str))
+
+    # Select the PDF files of the years that are missing
+    filenames_prefix = {
+        filename: prefix
+        for filename, prefix in filenames_and_prefix_from_dir(get_pdf_dir()).items()
+        if prefix not in saved_years
+    }
+    if not filenames_prefix:
+        print("No new PDF files, the combined dataframe is up to date.")
+        return saved_df
+
+    # Process only the new PDF files
+    timings: Dict[str, float] = {}
+    dic_df = get_dataframes(timings, use_cache, filenames_prefix, workers, engine=engine, profiler=profiler)
+    print_extraction_timings(timings, engine)
+    new_df = get_one_dataframe(dic_df, None, quality)
+
+    # Append the new rows, sorted by year in the same order as a full rebuild
+    onedf_all = apply_schema(pd.concat([saved_df, new_df], ignore_index=True))
+    onedf_all = onedf_all.sort_values("Jahr", kind="stable", ignore_index=True)
+    save_results(onedf_all, output_file)
+
+    return onedf_all
+
+
+def main(
+    use_cache: bool = True,
+    output_file: str = OUTPUT_FILE,
+    workers: int = 1,
+    engine: str = "tabula",
+    profiler: Optional[StageProfiler] = None,
+    pdf_dir: Optional[str] = None,
+    quality: Optional[QualityReport] = None,
+) -> pd.DataFrame:
     """
     This function retrieves multiple dataframes, combines them into one, and returns the combined dataframe.
 
+    Parameters:
+    use_cache (bool): Whether unchanged PDF files are loaded from the table cache
+    output_file (str): The Excel file or the directory of the Parquet dataset the combined dataframe is saved to,
+        None to not save it
+    workers (int): The number of worker processes used to extract and clean the PDF files
+    engine (str): The extraction engine, one of ENGINES
+    profiler (Optional[StageProfiler]): If given, the time, rows and memory of each stage are recorded
+    pdf_dir (Optional[str]): The directory containing the PDF files, data/raw if None
+    quality (Optional[QualityReport]): If given, the rows are validated and the failed rows are quarantined in it
+
     Returns:
     pd.DataFrame: The combined dataframe
     """
-    # Retrieve the dataframes
-    dic_df = get_dataframes()
+    # Retrieve the dataframes and report how long the extraction of each PDF took
+    timings: Dict[str, float] = {}
+    dic_df = get_dataframes(timings, use_cache, workers=workers, pdf_dir=pdf_dir, engine=engine, profiler=profiler)
+    print_extraction_timings(timings, engine)
 
     # Combine the dataframes into one
-    onedf_all = get_one_dataframe(dic_df)
+    start = time.perf_counter()
+    onedf_all = get_one_dataframe(dic_df, None, quality)
+    if profiler is not None:
+        rows_in = sum(len(df) for df in dic_df.values())
+        profiler.record("all", -1, "get_one_dataframe", time.perf_counter() - start, rows_in, len(onedf_all))
+
+    # Save the combined dataframe
+    if output_file is not None:
+        start = time.perf_counter()
+        save_results(onedf_all, output_file)
+        if profiler is not None:
+            profiler.record("all", -1, "save_results", time.perf_counter() - start, len(onedf_all), len(onedf_all))
 
     return onedf_all
 
 
+def parse_arguments() -> argparse.Namespace:
+    """
+    This function parses the command line arguments, the same as of 'cli.py ingest'.
+
+    Returns:
+    argparse.Namespace: The parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="Extract the HACO-Lauf result lists into one table.")
+    cli.add_ingest_arguments(parser)
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    main()
+    cli.ingest(parse_arguments())
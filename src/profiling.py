@@ -0,0 +1,191 @@
+import json
+import os
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+import pandas as pd
+
+import corrections
+
+
+class StageProfiler:
+    """
+    This class records the wall time, the rows before and after and the change of the allocated memory
+    of every stage of the cleaning chain, for every page of every PDF file.
+    The wall time is measured without tracemalloc, which slows down every allocation and would distort
+    the ranking of the stages. The memory is only measured if trace_memory is set: each stage then runs
+    a second time on a copy of the page with tracemalloc, before the timed run. Without a profiler the cleaning
+    chain runs without any measurement.
+    """
+
+    def __init__(self, trace_memory: bool = False) -> None:
+        """
+        This function creates the profiler.
+
+        Parameters:
+        trace_memory (bool): Whether the memory of each stage is measured in a separate run with tracemalloc
+        """
+        self.trace_memory = trace_memory
+        self.records: List[Dict[str, Any]] = []
+
+    def run_stage(
+        self, pdf: str, page: int, stage: str, func: Callable[[pd.DataFrame], pd.DataFrame], df: pd.DataFrame
+    ) -> pd.DataFrame:
+        """
+        This function runs one stage on a page and records its measurements.
+        The memory change is the memory allocated by the stage that is still allocated at its end,
+        it is 0 unless trace_memory is set.
+
+        Parameters:
+        pdf (str): The filename of the PDF file
+        page (int): The index of the page in the PDF file
+        stage (str): The name of the stage
+        func (Callable[[pd.DataFrame], pd.DataFrame]): The stage
+        df (pd.DataFrame): The page before the stage
+
+        Returns:
+        pd.DataFrame: The page after the stage
+        """
+        rows_in = len(df)
+        memory_delta = self.measure_memory(func, df) if self.trace_memory else 0
+
+        # Time the stage without tracemalloc
+        start = time.perf_counter()
+        df = func(df)
+        seconds = time.perf_counter() - start
+
+        self.record(pdf, page, stage, seconds, rows_in, len(df), memory_delta)
+        return df
+
+    @staticmethod
+    def measure_memory(func: Callable[[pd.DataFrame], pd.DataFrame], df: pd.DataFrame) -> int:
+        """
+        This function runs a stage on a copy of a page with tracemalloc and returns the change of the allocated
+        memory. The stages may change the page in place, so the copy is made before the tracing starts.
+        The counts of the name corrections are restored after the run, so only the real run of the stage counts.
+
+        Parameters:
+        func (Callable[[pd.DataFrame], pd.DataFrame]): The stage
+        df (pd.DataFrame): The page before the stage
+
+        Returns:
+        int: The memory allocated by the stage that is still allocated at its end in bytes
+        """
+        page = df.copy()
+        corrector = corrections.default_corrector()
+        counts_before = corrector.counts.copy()
+
+        # Trace the allocations only during the stage, unless tracemalloc is already used by the caller
+        started_tracemalloc = not tracemalloc.is_tracing()
+        if started_tracemalloc:
+            tracemalloc.start()
+        memory_before, _ = tracemalloc.get_traced_memory()
+        try:
+            result = func(page)
+            memory_after, _ = tracemalloc.get_traced_memory()
+        finally:
+            if started_tracemalloc:
+                tracemalloc.stop()
+            corrector.counts.clear()
+            corrector.counts.update(counts_before)
+        del result
+        return memory_after - memory_before
+
+    def record(
+        self, pdf: str, page: int, stage: str, seconds: float, rows_in: int, rows_out: int, memory_delta: int = 0
+    ) -> None:
+        """
+        This function adds a measurement, e.g. of a step that is not a stage of the cleaning chain.
+
+        Parameters:
+        pdf (str): The filename of the PDF file
+        page (int): The index of the page in the PDF file, -1 for a measurement of the whole file
+        stage (str): The name of the stage
+        seconds (float): The wall time in seconds
+        rows_in (int): The number of rows before the stage
+        rows_out (int): The number of rows after the stage
+        memory_delta (int): The change of the allocated memory in bytes
+        """
+        self.records.append(
+            {
+                "pdf": pdf,
+                "page": page,
+                "stage": stage,
+                "seconds": seconds,
+                "rows_in": rows_in,
+                "rows_out": rows_out,
+                "memory_delta": memory_delta,
+            }
+        )
+
+    def extend(self, records: List[Dict[str, Any]]) -> None:
+        """
+        This function adds the measurements of another profiler, e.g. of a worker process.
+
+        Parameters:
+        records (List[Dict[str, Any]]): The measurements
+        """
+        self.records.extend(records)
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        This function returns all measurements as a dataframe with one row per stage and page.
+
+        Returns:
+        pd.DataFrame: The measurements
+        """
+        return pd.DataFrame(
+            self.records, columns=["pdf", "page", "stage", "seconds", "rows_in", "rows_out", "memory_delta"]
+        )
+
+    def summary(self) -> pd.DataFrame:
+        """
+        This function sums the measurements of each stage over all pages, sorted by the total time.
+
+        Returns:
+        pd.DataFrame: The calls, total and mean time, rows and memory change of each stage
+        """
+        summary = (
+            self.to_frame()
+            .groupby("stage", sort=False)
+            .agg(
+                calls=("seconds", "size"),
+                seconds=("seconds", "sum"),
+                rows_in=("rows_in", "sum"),
+                rows_out=("rows_out", "sum"),
+                memory_delta=("memory_delta", "sum"),
+            )
+        )
+        summary.insert(2, "ms_per_call", summary["seconds"] / summary["calls"] * 1000)
+        summary["share"] = summary["seconds"] / summary["seconds"].sum()
+        return summary.sort_values("seconds", ascending=False)
+
+    def report(self) -> Dict[str, Any]:
+        """
+        This function returns the structured report: the summary per stage, the totals per PDF file
+        and all measurements.
+
+        Returns:
+        Dict[str, Any]: The report, it can be written as JSON
+        """
+        records = self.to_frame()
+        # The pages are numbered from 0, the measurements of the whole file have the page -1
+        per_pdf = records.groupby("pdf", sort=False).agg(seconds=("seconds", "sum"), pages=("page", "max"))
+        per_pdf["pages"] += 1
+        return {
+            "stages": self.summary().reset_index().to_dict(orient="records"),
+            "pdfs": per_pdf.reset_index().to_dict(orient="records"),
+            "records": self.records,
+        }
+
+    def write_json(self, path: str) -> None:
+        """
+        This function writes the report to a JSON file.
+
+        Parameters:
+        path (str): The path to the JSON file
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.report(), file, indent=2, default=float)
@@ -0,0 +1,95 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+
+# Regular expression for a race time in a cell, e.g. '37:09', '1:05:56' or '58:23,3' with tenths of a second
+RACE_TIME_PATTERN: str = r"(\d{1,2}:\d{2}(?::\d{2})?(?:,\d{1,3})?)"
+
+# Regular expression for a complete race time with the hours, minutes, seconds and fraction of a second as groups.
+# Without hours the minutes must have two digits, like in the result lists
+_PARSE_PATTERN: str = r"^(?:(?:(?P<h>\d{1,2}):(?P<hm>[0-5]\d))|(?P<m>[0-5]\d)):(?P<s>[0-5]\d)(?:[,.](?P<f>\d{1,3}))?$"
+
+
+def parse_race_times(series: pd.Series) -> pd.Series:
+    """
+    This function converts race times like 'MM:SS', 'H:MM:SS' or 'MM:SS,t' into durations in one pass.
+    The fraction of a second is kept. Values that are not a valid race time become NaT instead of 00:00:00,
+    so they can be found with isna().
+
+    Parameters:
+    series (pd.Series): The race times as strings
+
+    Returns:
+    pd.Series: The race times with the data type timedelta64[ns]
+    """
+    # Split all values into their parts at once, values without a match get NaN in all parts
+    parts = series.astype(str).str.strip().str.extract(_PARSE_PATTERN)
+
+    # The minutes are either in the group after the hours or in the group without hours
+    hours = pd.to_numeric(parts["h"]).fillna(0)
+    minutes = pd.to_numeric(parts["hm"].fillna(parts["m"]))
+    seconds = pd.to_numeric(parts["s"])
+
+    # ',3' are 300 milliseconds and ',35' are 350 milliseconds
+    milliseconds = pd.to_numeric(parts["f"].str.ljust(3, "0")).fillna(0)
+
+    total = ((hours * 60 + minutes) * 60 + seconds) * 1000 + milliseconds
+    return pd.Series(pd.to_timedelta(total, unit="ms"), index=series.index, name=series.name)
+
+
+def format_race_times(series: pd.Series) -> pd.Series:
+    """
+    This function converts durations into race times like 'HH:MM:SS' or 'HH:MM:SS,t' in one pass,
+    the reverse of parse_race_times. Missing durations become empty strings.
+
+    Parameters:
+    series (pd.Series): The race times with the data type timedelta64[ns]
+
+    Returns:
+    pd.Series: The race times as strings
+    """
+    milliseconds = series.to_numpy(dtype="timedelta64[ms]").astype(np.int64)
+    missing = series.isna().to_numpy()
+    milliseconds[missing] = 0
+
+    hours, rest = np.divmod(milliseconds, 3_600_000)
+    minutes, rest = np.divmod(rest, 60_000)
+    seconds, fraction = np.divmod(rest, 1000)
+
+    text = (
+        pd.Series(hours, index=series.index).astype(str).str.zfill(2)
+        + ":"
+        + pd.Series(minutes, index=series.index).astype(str).str.zfill(2)
+        + ":"
+        + pd.Series(seconds, index=series.index).astype(str).str.zfill(2)
+    )
+
+    # Only times with a fraction of a second get the fraction, without trailing zeros
+    has_fraction = fraction != 0
+    if has_fraction.any():
+        fraction_text = "," + pd.Series(fraction, index=series.index).astype(str).str.zfill(3).str.rstrip("0")
+        text = text.where(~has_fraction, text + fraction_text)
+
+    return text.where(~missing, "").rename(series.name)
+
+
+def format_race_time(value: datetime.timedelta) -> str:
+    """
+    This function converts a single duration into a race time like 'HH:MM:SS' or 'HH:MM:SS,t',
+    in the same format as format_race_times.
+
+    Parameters:
+    value (datetime.timedelta): The race time
+
+    Returns:
+    str: The race time as string
+    """
+    hours, rest = divmod(round(value.total_seconds() * 1000), 3_600_000)
+    minutes, rest = divmod(rest, 60_000)
+    seconds, fraction = divmod(rest, 1000)
+
+    text = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+    if fraction:
+        text += "," + f"{fraction:03d}".rstrip("0")
+    return text
@@ -0,0 +1,270 @@
+import argparse
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+import cli
+
+# Key of a ranking: the year of competition, the gender and the age class, '*' stands for all
+RankingKey = Tuple[int, str, str]
+ALL: str = "*"
+
+
+def age_classes(df: pd.DataFrame) -> pd.Series:
+    """
+    This function recomputes the age class of each runner from the year of birth and the year of competition,
+    e.g. 'MJ_U18', 'WHK' or 'M35', so the classes are the same in all years, whatever the result list printed.
+    The youth classes go up to 22 years, the main class from 23 to 29 years and the senior classes
+    have five years each up to 'M80'/'W80'.
+
+    Parameters:
+    df (pd.DataFrame): The combined dataframe
+
+    Returns:
+    pd.Series: The age class of each row
+    """
+    age = df["Jahr"].astype(int).to_numpy() - df["Jahrgang"].astype(int).to_numpy()
+    prefix = np.where(df["Geschlecht"].astype(str).to_numpy() == "w", "W", "M")
+
+    senior = np.char.add(prefix, (np.clip(age, 30, 80) // 5 * 5).astype(str))
+    youth = np.char.add(np.char.add(prefix, "J_U"), np.select([age < 16, age < 18, age < 20], ["16", "18", "20"], "23"))
+    classes = np.select([age < 23, age < 30], [youth, np.char.add(prefix, "HK")], senior)
+    return pd.Series(classes, index=df.index, name="Altersklasse", dtype="category")
+
+
+class RankingIndex:
+    """
+    This class precomputes the sorted race times of every year, of every gender in a year and of every age class
+    of a gender in a year. The rank and the percentile of a time are binary searches in these arrays
+    and the best runners are the first positions, so a query does not scan the combined dataframe.
+    Rows without a valid time are not ranked.
+    """
+
+    def __init__(self, df: pd.DataFrame) -> None:
+        """
+        This function sorts the times of all rankings.
+
+        Parameters:
+        df (pd.DataFrame): The combined dataframe, e.g. the output of get_one_dataframe or load_results
+        """
+        self.df = df.reset_index(drop=True)
+        self.df["Altersklasse"] = age_classes(self.df)
+
+        # The row of each bib number in each year
+        self.bibs: Dict[Tuple[int, int], int] = dict(
+            zip(zip(self.df["Jahr"].astype(int), self.df["Startnummer"].astype(int)), self.df.index)
+        )
+
+        # The times in nanoseconds and the rows, both sorted by time within each ranking
+        self.times: Dict[RankingKey, np.ndarray] = {}
+        self.rows: Dict[RankingKey, np.ndarray] = {}
+
+        valid = self.df[self.df["Zeit"].notna()]
+        nanoseconds = valid["Zeit"].to_numpy().astype(np.int64)
+        years = valid["Jahr"].astype(int).to_numpy()
+        genders = valid["Geschlecht"].astype(str).to_numpy()
+        classes = valid["Altersklasse"].astype(str).to_numpy()
+        positions = valid.index.to_numpy()
+
+        # Sort once by time, every ranking keeps this order, so each group is already sorted.
+        # The stable sort keeps the order of the result list for equal times
+        order = np.argsort(nanoseconds, kind="stable")
+        groupings = {
+            "year": (years,),
+            "gender": (years, genders),
+            "class": (years, genders, classes),
+        }
+        for columns in groupings.values():
+            keys = pd.MultiIndex.from_arrays([column[order] for column in columns])
+            for key, group in pd.Series(np.arange(len(order))).groupby(keys, sort=False).indices.items():
+                key = key if isinstance(key, tuple) else (key,)
+                ranking_key = tuple(key) + (ALL,) * (3 - len(key))
+                ranking_key = (int(ranking_key[0]), ranking_key[1], ranking_key[2])
+                self.times[ranking_key] = nanoseconds[order[group]]
+                self.rows[ranking_key] = positions[order[group]]
+
+    @staticmethod
+    def key(year: int, gender: Optional[str] = None, age_class: Optional[str] = None) -> RankingKey:
+        """
+        This function returns the key of a ranking. An age class needs the gender,
+        it is taken from the first letter of the class if it is not given.
+
+        Parameters:
+        year (int): The year of competition
+        gender (Optional[str]): 'm' or 'w', None for all runners of the year
+        age_class (Optional[str]): The age class, e.g. 'M35', None for all runners of the gender
+
+        Returns:
+        RankingKey: The key of the ranking
+        """
+        if age_class is not None and gender is None:
+            gender = "w" if age_class.startswith("W") else "m"
+        return (int(year), gender or ALL, age_class or ALL)
+
+    def ranking_times(self, year: int, gender: Optional[str] = None, age_class: Optional[str] = None) -> np.ndarray:
+        """
+        This function returns the sorted times of a ranking in nanoseconds.
+
+        Parameters:
+        year (int): The year of competition
+        gender (Optional[str]): 'm' or 'w', None for all runners of the year
+        age_class (Optional[str]): The age class, None for all runners of the gender
+
+        Returns:
+        np.ndarray: The sorted times, empty if nobody finished in the ranking
+        """
+        return self.times.get(self.key(year, gender, age_class), np.empty(0, dtype=np.int64))
+
+    def rank(
+        self, time: pd.Timedelta, year: int, gender: Optional[str] = None, age_class: Optional[str] = None
+    ) -> Optional[int]:
+        """
+        This function returns the place a time would have in a ranking: one more than the number of faster times.
+        Equal times share the place. A missing time (NaT), e.g. of a runner who did not finish, has no place.
+
+        Parameters:
+        time (pd.Timedelta): The race time
+        year (int): The year of competition
+        gender (Optional[str]): 'm' or 'w', None for all runners of the year
+        age_class (Optional[str]): The age class, None for all runners of the gender
+
+        Returns:
+        Optional[int]: The place, None for a missing time
+        """
+        # NaT is the smallest int64 and would be placed before every time
+        if pd.isna(time):
+            return None
+        times = self.ranking_times(year, gender, age_class)
+        return int(np.searchsorted(times, pd.Timedelta(time).value, side="left")) + 1
+
+    def percentile(
+        self, time: pd.Timedelta, year: int, gender: Optional[str] = None, age_class: Optional[str] = None
+    ) -> float:
+        """
+        This function returns the share of the finishers of a ranking that were slower than a time, in percent.
+
+        Parameters:
+        time (pd.Timedelta): The race time
+        year (int): The year of competition
+        gender (Optional[str]): 'm' or 'w', None for all runners of the year
+        age_class (Optional[str]): The age class, None for all runners of the gender
+
+        Returns:
+        float: The percentile between 0 and 100, NaN for a missing time or if nobody finished in the ranking
+        """
+        times = self.ranking_times(year, gender, age_class)
+        if len(times) == 0 or pd.isna(time):
+            return float("nan")
+        slower = len(times) - np.searchsorted(times, pd.Timedelta(time).value, side="right")
+        return 100 * slower / len(times)
+
+    def top(self, k: int, year: int, gender: Optional[str] = None, age_class: Optional[str] = None) -> pd.DataFrame:
+        """
+        This function returns the k fastest runners of a ranking with their place in the ranking.
+
+        Parameters:
+        k (int): The number of runners
+        year (int): The year of competition
+        gender (Optional[str]): 'm' or 'w', None for all runners of the year
+        age_class (Optional[str]): The age class, None for all runners of the gender
+
+        Returns:
+        pd.DataFrame: The rows of the runners, sorted by time
+        """
+        key = self.key(year, gender, age_class)
+        rows = self.rows.get(key, np.empty(0, dtype=np.int64))[:k]
+        times = self.times.get(key, np.empty(0, dtype=np.int64))
+        top = self.df.iloc[rows].copy()
+        top.insert(0, "Rang", np.searchsorted(times, times[: len(rows)], side="left") + 1)
+        return top
+
+    def find_runner(self, year: int, bib: int) -> pd.Series:
+        """
+        This function returns the row of a runner by the bib number.
+
+        Parameters:
+        year (int): The year of competition
+        bib (int): The bib number, 'Startnummer'
+
+        Returns:
+        pd.Series: The row of the runner
+
+        Raises:
+        KeyError: If no runner of the year has the bib number
+        """
+        row = self.bibs.get((int(year), int(bib)))
+        if row is None:
+            raise KeyError(f"No runner with the bib number {bib} in {year}")
+        return self.df.loc[row]
+
+    def placements(self, year: int, bib: int) -> pd.DataFrame:
+        """
+        This function returns the rank and the percentile of a runner in the year, the gender and the age class.
+        A runner without a valid time has no rank and no percentile.
+
+        Parameters:
+        year (int): The year of competition
+        bib (int): The bib number, 'Startnummer'
+
+        Returns:
+        pd.DataFrame: One row per ranking with the size of the ranking, the rank and the percentile
+        """
+        runner = self.find_runner(year, bib)
+        rankings = {
+            "Jahr": (None, None),
+            "Geschlecht": (runner["Geschlecht"], None),
+            "Altersklasse": (runner["Geschlecht"], runner["Altersklasse"]),
+        }
+        rows = []
+        for name, (gender, age_class) in rankings.items():
+            rows.append(
+                {
+                    "Wertung": name if gender is None else f"{name} {age_class or gender}",
+                    "Teilnehmer": len(self.ranking_times(year, gender, age_class)),
+                    "Rang": self.rank(runner["Zeit"], year, gender, age_class),
+                    "Perzentil": self.percentile(runner["Zeit"], year, gender, age_class),
+                }
+            )
+        return pd.DataFrame(rows)
+
+    def improvements(self, runner_ids: pd.Series) -> pd.DataFrame:
+        """
+        This function returns the times of every runner who finished in more than one year
+        with the change to the previous year. A negative change is an improvement.
+
+        Parameters:
+        runner_ids (pd.Series): The runner_id of each row of the combined dataframe, e.g. from runner_index
+
+        Returns:
+        pd.DataFrame: The runner_id, name, year, time and change to the previous year, sorted by runner and year
+        """
+        history = pd.DataFrame(
+            {
+                "runner_id": runner_ids.to_numpy(),
+                "Name": self.df["Name"].astype(str).to_numpy(),
+                "Vorname1": self.df["Vorname1"].astype(str).to_numpy(),
+                "Jahr": self.df["Jahr"].astype(int).to_numpy(),
+                "Zeit": self.df["Zeit"].to_numpy(),
+            }
+        )
+        history = history[history["runner_id"].duplicated(keep=False) & history["Zeit"].notna()]
+        history = history.sort_values(["runner_id", "Jahr"], ignore_index=True)
+        history["Veränderung"] = history.groupby("runner_id")["Zeit"].diff()
+        return history
+
+
+def parse_arguments() -> argparse.Namespace:
+    """
+    This function parses the command line arguments, the same as of 'cli.py query'.
+
+    Returns:
+    argparse.Namespace: The parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="Query the rankings of the combined results.")
+    cli.add_query_arguments(parser)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    cli.query(parse_arguments())
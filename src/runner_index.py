@@ -0,0 +1,387 @@
+import difflib
+import os
+import unicodedata
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+# File of the runner index, data/processed/runner_index.csv in the project directory
+RUNNER_INDEX_FILE: str = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "processed", "runner_index.csv"
+)
+
+# The columns of the combined dataframe that identify a runner
+PERSON_COLUMNS: List[str] = ["Name", "Vorname1", "Vorname2", "Jahrgang", "Geschlecht"]
+
+# The columns of the index file: one row per spelling of a runner, all spellings of a runner share the runner_id
+INDEX_COLUMNS: List[str] = ["runner_id"] + PERSON_COLUMNS + ["Jahre"]
+
+# Minimum similarity of 'surname first name' of two spellings with the same year of birth and gender,
+# e.g. 'weiker martin' and 'weiler martin' have a similarity of 0.92
+MIN_SIMILARITY: float = 0.85
+
+# Codes of the Kölner Phonetik that do not depend on the neighbouring letters
+_PHONETIC_CODES: Dict[str, str] = {
+    **dict.fromkeys("AEIJOUY", "0"),
+    "B": "1",
+    **dict.fromkeys("FVW", "3"),
+    **dict.fromkeys("GKQ", "4"),
+    "L": "5",
+    **dict.fromkeys("MN", "6"),
+    "R": "7",
+    **dict.fromkeys("SZ", "8"),
+}
+
+
+def normalize_name(name: str) -> str:
+    """
+    This function converts a name into lower case letters without umlauts and accents,
+    e.g. 'Müller-Lüdenscheidt' into 'mueller-luedenscheidt', so different spellings can be compared.
+
+    Parameters:
+    name (str): The name
+
+    Returns:
+    str: The normalized name
+    """
+    name = str(name).strip().lower()
+    for umlaut, replacement in (("ä", "ae"), ("ö", "oe"), ("ü", "ue"), ("ß", "ss")):
+        name = name.replace(umlaut, replacement)
+    # Remove the accents of other letters, e.g. 'é' becomes 'e'
+    return "".join(char for char in unicodedata.normalize("NFKD", name) if not unicodedata.combining(char))
+
+
+def cologne_phonetic(name: str) -> str:
+    """
+    This function calculates the Kölner Phonetik of a name, a phonetic code for German names.
+    Names that sound alike get the same code, e.g. 'Meier', 'Maier' and 'Mayer' all get '67'.
+
+    Parameters:
+    name (str): The name
+
+    Returns:
+    str: The phonetic code, an empty string for a name without letters
+    """
+    letters = [char for char in normalize_name(name).upper() if "A" <= char <= "Z"]
+    codes = []
+    for i, char in enumerate(letters):
+        before = letters[i - 1] if i > 0 else ""
+        after = letters[i + 1] if i + 1 < len(letters) else ""
+        if char == "H":
+            code = ""
+        elif char == "P":
+            code = "3" if after == "H" else "1"
+        elif char in "DT":
+            code = "8" if after in ("C", "S", "Z") else "2"
+        elif char == "C":
+            if i == 0:
+                code = "4" if after in ("A", "H", "K", "L", "O", "Q", "R", "U", "X") else "8"
+            else:
+                code = "4" if after in ("A", "H", "K", "O", "Q", "U", "X") and before not in ("S", "Z") else "8"
+        elif char == "X":
+            code = "8" if before in ("C", "K", "Q") else "48"
+        else:
+            code = _PHONETIC_CODES[char]
+        codes.append(code)
+
+    # Collapse repeated codes, then remove the vowels except at the beginning
+    collapsed = ""
+    for code in "".join(codes):
+        if not collapsed or collapsed[-1] != code:
+            collapsed += code
+    return collapsed[:1] + collapsed[1:].replace("0", "")
+
+
+class RunnerIndex:
+    """
+    This class assigns persistent runner IDs to the rows of the combined dataframe, so the same person
+    can be followed across years even if the name is spelled differently.
+
+    Each spelling of a runner is stored with the runner_id. A new spelling is compared only with the spellings
+    in the same blocks: the year of birth with the phonetic code of the surname, and the year of birth with the
+    phonetic code of the first name and the first letter of the surname. The second block finds misspelled
+    surnames like 'Weiker' for 'Weiler'.
+    Since a block only holds a few spellings, the matching grows linearly with the archive instead of
+    comparing all pairs.
+    Different people can have the same spelling, e.g. a father and a son with the same name and year of birth.
+    A runner only finishes once per year, so a spelling that appears twice in a year belongs to two runners.
+    """
+
+    def __init__(self, entries: Optional[pd.DataFrame] = None) -> None:
+        """
+        This function creates the index from saved entries or an empty index.
+
+        Parameters:
+        entries (Optional[pd.DataFrame]): The entries with the columns INDEX_COLUMNS, e.g. read from the index file
+        """
+        # The spellings as tuples of PERSON_COLUMNS, with their runner_id and the years they were seen
+        self.spellings: List[Tuple] = []
+        self.runner_ids: List[int] = []
+        self.years: List[Set[str]] = []
+
+        # The normalized 'surname first name' of each spelling, compared with the new spellings
+        self.full_names: List[str] = []
+
+        # Lookup of the exact spellings and of the blocks, both point to positions in the lists above.
+        # A spelling has several positions if it belongs to several runners
+        self.exact: Dict[Tuple, List[int]] = {}
+        self.blocks: Dict[Tuple[int, str, str], List[int]] = {}
+
+        # The years each runner took part in, a runner can only finish once per year
+        self.runner_years: Dict[int, Set[str]] = {}
+        self.next_id = 1
+
+        if entries is not None:
+            for row in entries.itertuples(index=False):
+                years = set(str(row.Jahre).split(";")) if str(row.Jahre) else set()
+                spelling = (str(row.Name), str(row.Vorname1), str(row.Vorname2), int(row.Jahrgang), str(row.Geschlecht))
+                self._add(spelling, int(row.runner_id), years)
+
+    @classmethod
+    def load(cls, path: str = RUNNER_INDEX_FILE) -> "RunnerIndex":
+        """
+        This function reads the index from its CSV file, an empty index if the file does not exist.
+
+        Parameters:
+        path (str): The path to the CSV file
+
+        Returns:
+        RunnerIndex: The index
+        """
+        if not os.path.exists(path):
+            return cls()
+        entries = pd.read_csv(path, dtype=str, keep_default_na=False, encoding="utf-8")
+        return cls(entries)
+
+    def save(self, path: str = RUNNER_INDEX_FILE) -> None:
+        """
+        This function writes the index to its CSV file.
+
+        Parameters:
+        path (str): The path to the CSV file
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.to_frame().to_csv(path, index=False, encoding="utf-8")
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        This function returns the entries of the index, one row per spelling of a runner, in the order they were
+        added. The order is kept in the file, because the runners of the same spelling are told apart by it.
+
+        Returns:
+        pd.DataFrame: The entries with the columns INDEX_COLUMNS
+        """
+        entries = pd.DataFrame(self.spellings, columns=PERSON_COLUMNS)
+        entries.insert(0, "runner_id", pd.Series(self.runner_ids, dtype="int64"))
+        entries["Jahre"] = [";".join(sorted(years)) for years in self.years]
+        return entries
+
+    @property
+    def indexed_years(self) -> Set[str]:
+        """
+        This function returns the years of competition that are already in the index.
+
+        Returns:
+        Set[str]: The years
+        """
+        return set().union(*self.years) if self.years else set()
+
+    @staticmethod
+    def _block_keys(spelling: Tuple) -> List[Tuple[int, str, str]]:
+        """
+        This function returns the blocks of a spelling: the year of birth with the phonetic code of the surname
+        and the year of birth with the phonetic code of the first name and the first letter of the surname.
+
+        Parameters:
+        spelling (Tuple): The values of PERSON_COLUMNS
+
+        Returns:
+        List[Tuple[int, str, str]]: The keys of the blocks
+        """
+        name, first_name, _, jahrgang, _ = spelling
+        initial = normalize_name(name)[:1]
+        return [(jahrgang, "Name", cologne_phonetic(name)), (jahrgang, initial, cologne_phonetic(first_name))]
+
+    def _add(self, spelling: Tuple, runner_id: int, years: Set[str]) -> int:
+        """
+        This function adds a spelling of a runner to the lists and the lookups.
+
+        Parameters:
+        spelling (Tuple): The values of PERSON_COLUMNS
+        runner_id (int): The runner_id
+        years (Set[str]): The years the spelling was seen
+
+        Returns:
+        int: The position of the spelling
+        """
+        position = len(self.spellings)
+        self.spellings.append(spelling)
+        self.runner_ids.append(runner_id)
+        self.years.append(set(years))
+        self.full_names.append(normalize_name(f"{spelling[0]} {spelling[1]}"))
+        self.exact.setdefault(spelling, []).append(position)
+        for key in self._block_keys(spelling):
+            self.blocks.setdefault(key, []).append(position)
+        self.runner_years.setdefault(runner_id, set()).update(years)
+        self.next_id = max(self.next_id, runner_id + 1)
+        return position
+
+    def _find_runner(self, spelling: Tuple, year: str) -> Optional[int]:
+        """
+        This function searches the blocks of a new spelling for the most similar spelling of the same gender
+        whose runner did not yet finish in the same year.
+
+        Parameters:
+        spelling (Tuple): The values of PERSON_COLUMNS
+        year (str): The year of competition of the row
+
+        Returns:
+        Optional[int]: The runner_id of the most similar spelling or None if no spelling is similar enough
+        """
+        candidates = {position for key in self._block_keys(spelling) for position in self.blocks.get(key, [])}
+
+        # The new name is the second sequence, the matcher caches its character positions for all comparisons
+        matcher = difflib.SequenceMatcher(None, autojunk=False)
+        matcher.set_seq2(normalize_name(f"{spelling[0]} {spelling[1]}"))
+
+        best_id, best_similarity = None, MIN_SIMILARITY
+        for position in sorted(candidates):
+            runner_id = self.runner_ids[position]
+            if self.spellings[position][4] != spelling[4] or year in self.runner_years[runner_id]:
+                continue
+            # The upper bounds of the similarity are much faster and skip most candidates
+            matcher.set_seq1(self.full_names[position])
+            if matcher.real_quick_ratio() < best_similarity or matcher.quick_ratio() < best_similarity:
+                continue
+            similarity = matcher.ratio()
+            if similarity >= best_similarity:
+                best_id, best_similarity = runner_id, similarity
+        return best_id
+
+    def _positions_in_year(self, spelling: Tuple, year: str) -> List[int]:
+        """
+        This function returns the positions of a spelling that were seen in a year, one per runner.
+
+        Parameters:
+        spelling (Tuple): The values of PERSON_COLUMNS
+        year (str): The year of competition
+
+        Returns:
+        List[int]: The positions in the order they were added
+        """
+        return [position for position in self.exact.get(spelling, []) if year in self.years[position]]
+
+    def assign(self, df: pd.DataFrame) -> pd.Series:
+        """
+        This function returns the runner_id of each row of the combined dataframe and adds unknown runners
+        and spellings to the index. Known spellings are found by an exact lookup, only new spellings are
+        compared with the spellings in their blocks. The years are processed in order, so the IDs do not depend
+        on the order of the rows. If a spelling appears several times in a year, every row is another runner.
+
+        Parameters:
+        df (pd.DataFrame): The combined dataframe or the rows of new years
+
+        Returns:
+        pd.Series: The runner_id of each row, with the index of df
+        """
+        persons = df[PERSON_COLUMNS + ["Jahr"]].astype(
+            {"Name": str, "Vorname1": str, "Vorname2": str, "Jahrgang": "int64", "Geschlecht": str, "Jahr": str}
+        )
+        spellings = list(persons[PERSON_COLUMNS].itertuples(index=False, name=None))
+        years = persons["Jahr"].tolist()
+        runner_ids = np.zeros(len(spellings), dtype="int64")
+
+        # How often each spelling appeared in each year so far, the n-th row of a spelling is the n-th runner
+        occurrences: Dict[Tuple[str, Tuple], int] = {}
+        for row in sorted(range(len(spellings)), key=years.__getitem__):
+            year, spelling = years[row], spellings[row]
+            occurrence = occurrences.get((year, spelling), 0)
+            occurrences[(year, spelling)] = occurrence + 1
+
+            # A row that was already assigned keeps its runner_id, e.g. if the same rows are assigned again
+            in_year = self._positions_in_year(spelling, year)
+            if occurrence < len(in_year):
+                runner_ids[row] = self.runner_ids[in_year[occurrence]]
+                continue
+
+            # A known spelling of a runner who did not finish in the year yet keeps its runner_id, otherwise it is
+            # a different person with the same name, who is searched in the blocks or gets a new runner_id
+            known = [
+                position
+                for position in self.exact.get(spelling, [])
+                if year not in self.runner_years[self.runner_ids[position]]
+            ]
+            if known:
+                position = known[0]
+                runner_id = self.runner_ids[position]
+            else:
+                runner_id = self._find_runner(spelling, year) or self.next_id
+                position = self._add(spelling, runner_id, set())
+            self.years[position].add(year)
+            self.runner_years[runner_id].add(year)
+            runner_ids[row] = runner_id
+        return pd.Series(runner_ids, index=df.index, name="runner_id")
+
+    def update(self, df: pd.DataFrame) -> pd.Series:
+        """
+        This function adds the years of the combined dataframe that are not yet in the index,
+        e.g. after a new result list was added, and returns the runner_id of each row of these years.
+
+        Parameters:
+        df (pd.DataFrame): The combined dataframe
+
+        Returns:
+        pd.Series: The runner_id of each row of the new years
+        """
+        new_rows = df[~df["Jahr"].astype(str).isin(self.indexed_years)]
+        return self.assign(new_rows)
+
+    def lookup(self, df: pd.DataFrame) -> pd.Series:
+        """
+        This function returns the runner_id of each row of the combined dataframe without changing the index.
+        A spelling of several runners is resolved by the year like in assign: the n-th row of the spelling in a year
+        gets the n-th runner seen with it in the year. Rows with a spelling that is not in the index get 0,
+        as well as the rows of a spelling of several runners in a year that is not in the index.
+
+        Parameters:
+        df (pd.DataFrame): The combined dataframe
+
+        Returns:
+        pd.Series: The runner_id of each row, with the index of df
+        """
+        keys = df[PERSON_COLUMNS + ["Jahr"]].astype(
+            {"Name": str, "Vorname1": str, "Vorname2": str, "Jahrgang": "int64", "Geschlecht": str, "Jahr": str}
+        )
+        runner_ids = np.zeros(len(keys), dtype="int64")
+        occurrences: Dict[Tuple[str, Tuple], int] = {}
+        for row, (*values, year) in enumerate(keys.itertuples(index=False, name=None)):
+            spelling = tuple(values)
+            positions = self.exact.get(spelling, [])
+            if len(positions) == 1:
+                runner_ids[row] = self.runner_ids[positions[0]]
+            elif positions:
+                occurrence = occurrences.get((year, spelling), 0)
+                occurrences[(year, spelling)] = occurrence + 1
+                in_year = self._positions_in_year(spelling, year)
+                if occurrence < len(in_year):
+                    runner_ids[row] = self.runner_ids[in_year[occurrence]]
+        return pd.Series(runner_ids, index=df.index, name="runner_id")
+
+
+def update_runner_index(df: pd.DataFrame, path: str = RUNNER_INDEX_FILE) -> RunnerIndex:
+    """
+    This function loads the runner index, adds the years of the combined dataframe that are not yet
+    in the index and saves it again.
+
+    Parameters:
+    df (pd.DataFrame): The combined dataframe
+    path (str): The path to the CSV file of the index
+
+    Returns:
+    RunnerIndex: The updated index
+    """
+    index = RunnerIndex.load(path)
+    index.update(df)
+    index.save(path)
+    return index
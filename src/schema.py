@@ -0,0 +1,92 @@
+from typing import Dict
+
+import pandas as pd
+
+# The data types of the columns of the combined dataframe.
+# Columns with few distinct values are categorical, so every value is stored once and the rows only keep a code.
+# The integer types are as small as possible without limiting the size of a race.
+RESULTS_SCHEMA: Dict[str, str] = {
+    # Overall place, int32 because large races have more than 32767 finishers
+    "Gesamt Platz": "int32",
+    # Place in the age class, e.g. '3.M35', categorical because it repeats in every year
+    "Platz AK": "category",
+    # Bib number, int32 for the same reason as the overall place
+    "Startnummer": "int32",
+    # Names, categorical because the same runners take part year after year
+    "Name": "category",
+    "Vorname1": "category",
+    # The second first name is 'nan' for most runners
+    "Vorname2": "category",
+    # Year of birth, int16 holds all years
+    "Jahrgang": "int16",
+    # Gender, 'm' or 'w'
+    "Geschlecht": "category",
+    # Race time as duration, the fraction of a second is kept and missing times are NaT
+    "Zeit": "timedelta64[ns]",
+    # Year of competition
+    "Jahr": "category",
+}
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    This function converts the columns of a combined dataframe into the data types of RESULTS_SCHEMA.
+    It is also used after dataframes were concatenated, because categorical columns with different categories
+    are concatenated as object columns.
+
+    Parameters:
+    df (pd.DataFrame): The combined dataframe
+
+    Returns:
+    pd.DataFrame: The combined dataframe with the data types of RESULTS_SCHEMA
+    """
+    # Categorical columns are converted back to their values first, so the categories are determined again
+    df = without_schema(df)
+    return df.astype({column: dtype for column, dtype in RESULTS_SCHEMA.items() if column in df.columns})
+
+
+def without_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    This function converts a combined dataframe back into the data types it had before RESULTS_SCHEMA was used:
+    strings as objects and integers as int64. It is the reference for memory_report.
+
+    Parameters:
+    df (pd.DataFrame): The combined dataframe
+
+    Returns:
+    pd.DataFrame: The combined dataframe with object and int64 columns
+    """
+    columns = {}
+    for column in df.columns:
+        values = df[column]
+        if values.dtype == "category":
+            values = values.astype(values.cat.categories.dtype)
+        if pd.api.types.is_integer_dtype(values):
+            values = values.astype("int64")
+        columns[column] = values
+    return pd.DataFrame(columns, index=df.index)
+
+
+def memory_report(before: pd.DataFrame, after: pd.DataFrame) -> pd.DataFrame:
+    """
+    This function compares the memory usage of the columns of a dataframe before and after a conversion.
+    The memory of strings is included, like with memory_usage(deep=True).
+
+    Parameters:
+    before (pd.DataFrame): The dataframe before the conversion
+    after (pd.DataFrame): The dataframe after the conversion
+
+    Returns:
+    pd.DataFrame: The data types and the bytes of each column before and after, with a row for the total
+    """
+    report = pd.DataFrame(
+        {
+            "dtype before": before.dtypes.astype(str),
+            "bytes before": before.memory_usage(deep=True, index=False),
+            "dtype after": after.dtypes.astype(str),
+            "bytes after": after.memory_usage(deep=True, index=False),
+        }
+    )
+    report.loc["total"] = ["", report["bytes before"].sum(), "", report["bytes after"].sum()]
+    report["ratio"] = (report["bytes after"] / report["bytes before"]).round(3)
+    return report
@@ -0,0 +1,625 @@
+import asyncio
+import collections
+import itertools
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+import main
+from race_times import format_race_times
+from schema import apply_schema
+from validation import QualityReport
+from watch import process_year
+
+# The service only listens on the local machine
+HOST: str = "127.0.0.1"
+PORT: int = 8765
+
+# The directory the results of the jobs are saved in, data/processed in the project directory.
+# The output files of the jobs are relative to it, a job cannot write anywhere else
+OUTPUT_DIR: str = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "processed")
+
+# The maximum number of waiting jobs, further jobs are rejected until a job was started
+MAX_QUEUED_JOBS: int = 8
+
+# The maximum number of finished jobs whose state and rows are kept, the oldest finished job is removed first
+MAX_FINISHED_JOBS: int = 16
+
+# The reasons of the HTTP status codes used by the service
+HTTP_REASONS: Dict[int, str] = {
+    200: "OK",
+    202: "Accepted",
+    400: "Bad Request",
+    404: "Not Found",
+    415: "Unsupported Media Type",
+    503: "Service Unavailable",
+}
+
+
+class IngestService:
+    """
+    This class runs ingest jobs in an asyncio event loop. A job extracts and cleans PDF files, combines their rows
+    and optionally saves them. The extraction and cleaning of every PDF file runs in a process pool
+    and the combination and the saving run in threads, so the event loop stays free to accept jobs and to answer
+    status requests, and the files of several jobs are processed at the same time.
+    The jobs wait in a bounded queue: submit waits while the queue is full, the HTTP endpoint rejects the job instead.
+    Only the last finished jobs are kept with their rows, so a long running service does not keep every result.
+    The results are only saved in the output directory, the output file of a job is a path relative to it.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        concurrent_jobs: int = 2,
+        max_queued_jobs: int = MAX_QUEUED_JOBS,
+        engine: str = "tabula",
+        use_cache: bool = True,
+        max_finished_jobs: int = MAX_FINISHED_JOBS,
+        output_dir: str = OUTPUT_DIR,
+    ) -> None:
+        """
+        This function creates the service, the jobs are started with start().
+
+        Parameters:
+        workers (int): The number of worker processes for the extraction and cleaning
+        concurrent_jobs (int): The number of jobs that are processed at the same time
+        max_queued_jobs (int): The maximum number of waiting jobs
+        engine (str): The extraction engine, one of main.ENGINES
+        use_cache (bool): Whether unchanged PDF files are loaded from the table cache
+        max_finished_jobs (int): The maximum number of finished jobs whose state and rows are kept
+        output_dir (str): The directory the results of the jobs are saved in
+        """
+        self.workers = workers
+        self.output_dir = output_dir
+        self.concurrent_jobs = concurrent_jobs
+        self.engine = engine
+        self.use_cache = use_cache
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queued_jobs)
+
+        # The state of every job, the combined rows and the quality reports of the finished jobs
+        self.jobs: Dict[int, Dict[str, Any]] = {}
+        self.results: Dict[int, pd.DataFrame] = {}
+        self.reports: Dict[int, QualityReport] = {}
+        self._job_ids = itertools.count(1)
+
+        # The ids of the finished jobs in the order they finished
+        self.max_finished_jobs = max_finished_jobs
+        self._finished: Deque[int] = collections.deque()
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._tasks: List[asyncio.Task] = []
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self, host: str = HOST, port: Optional[int] = PORT) -> None:
+        """
+        This function starts the worker processes, the job tasks and, if a port is given, the HTTP endpoint.
+
+        Parameters:
+        host (str): The address the HTTP endpoint listens on
+        port (Optional[int]): The port of the HTTP endpoint, 0 for a free port, None for no HTTP endpoint
+        """
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        self._tasks = [asyncio.create_task(self._run_jobs()) for _ in range(self.concurrent_jobs)]
+        if port is not None:
+            self._server = await asyncio.start_server(self._handle_connection, host, port)
+
+    @property
+    def port(self) -> Optional[int]:
+        """
+        This function returns the port of the HTTP endpoint, e.g. after starting it with port 0.
+
+        Returns:
+        Optional[int]: The port or None without HTTP endpoint
+        """
+        return self._server.sockets[0].getsockname()[1] if self._server is not None else None
+
+    async def stop(self) -> None:
+        """
+        This function stops the HTTP endpoint and the job tasks and waits for the worker processes.
+        Jobs that are still waiting in the queue are not processed.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._executor is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+
+    def _new_job(self, filenames_prefix: Dict[str, str], pdf_dir: str, output_file: Optional[str]) -> Dict[str, Any]:
+        """
+        This function creates the state of a new job.
+
+        Parameters:
+        filenames_prefix (Dict[str, str]): The PDF files with their years
+        pdf_dir (str): The directory containing the PDF files
+        output_file (Optional[str]): The Excel file or the directory of the Parquet dataset, None to not save
+
+        Returns:
+        Dict[str, Any]: The state of the job
+        """
+        job_id = next(self._job_ids)
+        job = {
+            "id": job_id,
+            "state": "queued",
+            "pdf_dir": pdf_dir,
+            "files": filenames_prefix,
+            "output_file": output_file,
+            "rows": None,
+            "quarantined": None,
+            "error": None,
+            "submitted": time.time(),
+            "seconds": None,
+        }
+        self.jobs[job_id] = job
+        return job
+
+    def output_path(self, output_file: str) -> str:
+        """
+        This function returns the path of the output file of a job in the output directory.
+
+        Parameters:
+        output_file (str): The Excel file or the directory of the Parquet dataset relative to the output directory
+
+        Returns:
+        str: The path of the output file
+
+        Raises:
+        ValueError: If the path is not inside the output directory, e.g. an absolute path or a path with '..'
+        """
+        output_dir = os.path.realpath(self.output_dir)
+        path = os.path.realpath(os.path.join(output_dir, output_file))
+        if path == output_dir or os.path.commonpath([path, output_dir]) != output_dir:
+            raise ValueError(f"The output file {output_file!r} is not inside the output directory {self.output_dir}")
+        return path
+
+    def _job_arguments(
+        self, pdf_dir: Optional[str], filenames: Optional[List[str]], output_file: Optional[str]
+    ) -> Tuple[Dict[str, str], str, Optional[str]]:
+        """
+        This function checks the arguments of a job, they may come from the JSON body of a request,
+        and selects the PDF files of the job.
+
+        Parameters:
+        pdf_dir (Optional[str]): The directory containing the PDF files, data/raw if None
+        filenames (Optional[List[str]]): The PDF files to process, all PDF files with a year as prefix if None
+        output_file (Optional[str]): The Excel file or the directory of the Parquet dataset relative to the output
+            directory, None to not save
+
+        Returns:
+        Tuple[Dict[str, str], str, Optional[str]]: The PDF files with their years, the directory and the path
+            of the output
+
+        Raises:
+        TypeError: If an argument has the wrong type
+        ValueError: If a PDF file has no year as prefix or does not exist or the output is not in the output directory
+        OSError: If the directory of the PDF files cannot be read
+        """
+        if pdf_dir is not None and not isinstance(pdf_dir, str):
+            raise TypeError(f"pdf_dir must be a string, not {type(pdf_dir).__name__}")
+        if filenames is not None and (
+            not isinstance(filenames, list) or not all(isinstance(filename, str) for filename in filenames)
+        ):
+            raise TypeError("files must be a list of strings")
+        if output_file is not None and not isinstance(output_file, str):
+            raise TypeError(f"output_file must be a string, not {type(output_file).__name__}")
+        if output_file is not None:
+            output_file = self.output_path(output_file)
+
+        pdf_dir = pdf_dir or main.get_pdf_dir()
+        filenames_prefix = main.filenames_and_prefix_from_dir(pdf_dir)
+        if filenames is not None:
+            unknown = [filename for filename in filenames if filename not in filenames_prefix]
+            if unknown:
+                raise ValueError(f"No PDF files with a year as prefix in {pdf_dir}: {', '.join(unknown)}")
+            filenames_prefix = {filename: filenames_prefix[filename] for filename in filenames}
+        return filenames_prefix, pdf_dir, output_file
+
+    async def submit(
+        self, pdf_dir: Optional[str] = None, filenames: Optional[List[str]] = None, output_file: Optional[str] = None
+    ) -> int:
+        """
+        This function adds a job to the queue and waits while the queue is full.
+
+        Parameters:
+        pdf_dir (Optional[str]): The directory containing the PDF files, data/raw if None
+        filenames (Optional[List[str]]): The PDF files to process, all PDF files with a year as prefix if None
+        output_file (Optional[str]): The Excel file or the directory of the Parquet dataset relative to the output
+            directory, None to not save
+
+        Returns:
+        int: The id of the job
+        """
+        job = self._new_job(*self._job_arguments(pdf_dir, filenames, output_file))
+        await self.queue.put(job["id"])
+        return job["id"]
+
+    def submit_nowait(
+        self, pdf_dir: Optional[str] = None, filenames: Optional[List[str]] = None, output_file: Optional[str] = None
+    ) -> int:
+        """
+        This function adds a job to the queue if it is not full.
+
+        Parameters:
+        pdf_dir (Optional[str]): The directory containing the PDF files, data/raw if None
+        filenames (Optional[List[str]]): The PDF files to process, all PDF files with a year as prefix if None
+        output_file (Optional[str]): The Excel file or the directory of the Parquet dataset relative to the output
+            directory, None to not save
+
+        Returns:
+        int: The id of the job
+
+        Raises:
+        asyncio.QueueFull: If the queue is full
+        """
+        arguments = self._job_arguments(pdf_dir, filenames, output_file)
+        if self.queue.full():
+            raise asyncio.QueueFull
+        job = self._new_job(*arguments)
+        self.queue.put_nowait(job["id"])
+        return job["id"]
+
+    async def wait(self, job_id: int, poll_seconds: float = 0.05) -> Dict[str, Any]:
+        """
+        This function waits until a job is done or failed.
+
+        Parameters:
+        job_id (int): The id of the job
+        poll_seconds (float): The seconds between two checks of the state
+
+        Returns:
+        Dict[str, Any]: The state of the job
+        """
+        # Keep the state, the job may be removed from the finished jobs while waiting
+        job = self.jobs[job_id]
+        while job["state"] not in ("done", "failed"):
+            await asyncio.sleep(poll_seconds)
+        return job
+
+    async def _run_jobs(self) -> None:
+        """
+        This function takes the jobs from the queue and processes them one after another.
+        """
+        while True:
+            job_id = await self.queue.get()
+            try:
+                await self._run_job(self.jobs[job_id])
+            finally:
+                self.queue.task_done()
+
+    async def _run_job(self, job: Dict[str, Any]) -> None:
+        """
+        This function processes a job: every year in a worker process, then the combination and the saving
+        in a thread.
+
+        Parameters:
+        job (Dict[str, Any]): The state of the job
+        """
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            # Extract and clean the files of every year at the same time in the process pool
+            job["state"] = "extracting"
+            years: Dict[str, List[str]] = {}
+            for filename, year in job["files"].items():
+                years.setdefault(year, []).append(filename)
+            processed = await asyncio.gather(
+                *(
+                    loop.run_in_executor(
+                        self._executor, process_year, job["pdf_dir"], filenames, year, self.use_cache, self.engine
+                    )
+                    for year, filenames in years.items()
+                )
+            )
+
+            # The rows that failed the validation are left out, the reports of the years are merged
+            quality = QualityReport()
+            for _, year_quality in processed:
+                quality.merge(year_quality)
+
+            # Combine the years in a thread, the event loop keeps answering requests
+            job["state"] = "combining"
+            df = await loop.run_in_executor(None, combine_years, [frame for frame, _ in processed])
+
+            if job["output_file"] is not None:
+                job["state"] = "saving"
+                await loop.run_in_executor(None, main.save_results, df, job["output_file"])
+
+            self.results[job["id"]] = df
+            self.reports[job["id"]] = quality
+            job["rows"] = len(df)
+            job["quarantined"] = int(quality.summary()["quarantined"].sum())
+            job["state"] = "done"
+        except Exception as error:
+            job["error"] = f"{type(error).__name__}: {error}"
+            job["state"] = "failed"
+        finally:
+            job["seconds"] = time.perf_counter() - start
+            self._finish(job["id"])
+
+    def _finish(self, job_id: int) -> None:
+        """
+        This function adds a job to the finished jobs and removes the oldest finished jobs with their rows
+        if there are more than max_finished_jobs.
+
+        Parameters:
+        job_id (int): The id of the finished job
+        """
+        self._finished.append(job_id)
+        while len(self._finished) > self.max_finished_jobs:
+            oldest = self._finished.popleft()
+            self.jobs.pop(oldest, None)
+            self.results.pop(oldest, None)
+            self.reports.pop(oldest, None)
+
+    def status(self) -> Dict[str, Any]:
+        """
+        This function returns the state of the service and of all jobs.
+
+        Returns:
+        Dict[str, Any]: The number of waiting jobs, the maximum and the state of every job
+        """
+        return {"queued": self.queue.qsize(), "max_queued": self.queue.maxsize, "jobs": list(self.jobs.values())}
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        This function answers one HTTP request:
+        GET /status, GET /jobs/<id>, GET /results/<id>, GET /quarantine/<id> and POST /jobs with a JSON body like
+        {"pdf_dir": ..., "files": [...], "output_file": ...}, all keys are optional.
+        The body of POST /jobs must have the Content-Type application/json, so a web page in a browser
+        cannot submit jobs with a simple cross-site request.
+
+        Parameters:
+        reader (asyncio.StreamReader): The stream of the request
+        writer (asyncio.StreamWriter): The stream of the response
+        """
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode("latin-1").strip()
+                if not line:
+                    break
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            # A request without a valid length of the body is answered without reading the body
+            content_length = headers.get("content-length", "0")
+            if len(request_line) < 2:
+                status, payload = 400, {"error": "Invalid request line"}
+            elif not content_length.isdigit():
+                status, payload = 400, {"error": f"Invalid Content-Length {content_length!r}"}
+            else:
+                body = await reader.readexactly(int(content_length))
+                status, payload = self._route(*request_line[:2], body, headers.get("content-type", ""))
+            data = json.dumps(payload, default=str).encode("utf-8")
+            writer.write(
+                f"HTTP/1.0 {status} {HTTP_REASONS[status]}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(data)}\r\n\r\n".encode("latin-1") + data
+            )
+            await writer.drain()
+        finally:
+            writer.close()
+
+    def _route(self, method: str, path: str, body: bytes, content_type: str = "") -> Tuple[int, Any]:
+        """
+        This function answers a request of the HTTP endpoint.
+
+        Parameters:
+        method (str): The HTTP method
+        path (str): The path of the request
+        body (bytes): The body of the request
+        content_type (str): The Content-Type header of the request
+
+        Returns:
+        Tuple[int, Any]: The HTTP status code and the JSON payload
+        """
+        parts = path.strip("/").split("/")
+        if method == "GET" and parts == ["status"]:
+            return 200, self.status()
+        if method == "POST" and parts == ["jobs"]:
+            if content_type.split(";")[0].strip().lower() != "application/json":
+                return 415, {"error": f"Expected the Content-Type application/json, got {content_type!r}"}
+            try:
+                arguments = json.loads(body or b"{}")
+                if not isinstance(arguments, dict):
+                    raise TypeError(f"Expected a JSON object, got {type(arguments).__name__}")
+                job_id = self.submit_nowait(
+                    arguments.get("pdf_dir"), arguments.get("files"), arguments.get("output_file")
+                )
+            except asyncio.QueueFull:
+                return 503, {"error": "The queue is full, try again later"}
+            except (ValueError, TypeError, OSError) as error:
+                return 400, {"error": f"{type(error).__name__}: {error}"}
+            return 202, self.jobs[job_id]
+        if method == "GET" and len(parts) == 2 and parts[0] in ("jobs", "results", "quarantine") and parts[1].isdigit():
+            job_id = int(parts[1])
+            if job_id not in self.jobs:
+                return 404, {"error": f"No job {job_id}"}
+            if parts[0] == "jobs":
+                return 200, self.jobs[job_id]
+            if job_id not in self.results:
+                return 404, {"error": f"Job {job_id} has no results, it is {self.jobs[job_id]['state']}"}
+            if parts[0] == "quarantine":
+                return 200, self.reports[job_id].quarantine().to_dict(orient="records")
+            return 200, results_to_records(self.results[job_id])
+        return 404, {"error": f"Unknown request {method} {path}"}
+
+
+def combine_years(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    This function combines the rows of several years in the order of the years like a full run.
+
+    Parameters:
+    frames (List[pd.DataFrame]): The combined dataframe of each year
+
+    Returns:
+    pd.DataFrame: The combined dataframe
+    """
+    if not frames:
+        return main.get_one_dataframe({}, None)
+    return apply_schema(pd.concat(frames, ignore_index=True))
+
+
+def results_to_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """
+    This function converts a combined dataframe into JSON records, the times as strings like in the Excel file.
+
+    Parameters:
+    df (pd.DataFrame): The combined dataframe
+
+    Returns:
+    List[Dict[str, Any]]: One dictionary per row
+    """
+    df = df.copy()
+    df["Zeit"] = format_race_times(df["Zeit"])
+    return json.loads(df.to_json(orient="records", force_ascii=False))
+
+
+class ServiceClient:
+    """
+    This class sends requests to the HTTP endpoint of a running IngestService, e.g. to drive it from a script.
+    """
+
+    def __init__(self, host: str = HOST, port: int = PORT) -> None:
+        """
+        This function creates the client.
+
+        Parameters:
+        host (str): The address of the service
+        port (int): The port of the service
+        """
+        self.host = host
+        self.port = port
+
+    async def request(self, method: str, path: str, payload: Optional[Dict[str, Any]] = None) -> Tuple[int, Any]:
+        """
+        This function sends one request and reads the JSON response.
+
+        Parameters:
+        method (str): The HTTP method
+        path (str): The path, e.g. '/status'
+        payload (Optional[Dict[str, Any]]): The JSON body of the request
+
+        Returns:
+        Tuple[int, Any]: The HTTP status code and the JSON payload of the response
+        """
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        headers = f"Host: {self.host}\r\nContent-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        writer.write(f"{method} {path} HTTP/1.0\r\n{headers}\r\n".encode("latin-1") + body)
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        await writer.wait_closed()
+
+        head, _, data = response.partition(b"\r\n\r\n")
+        return int(head.split()[1]), json.loads(data)
+
+    async def submit(
+        self, pdf_dir: Optional[str] = None, files: Optional[List[str]] = None, output_file: Optional[str] = None
+    ) -> Tuple[int, Any]:
+        """
+        This function submits a job.
+
+        Parameters:
+        pdf_dir (Optional[str]): The directory containing the PDF files, data/raw of the service if None
+        files (Optional[List[str]]): The PDF files to process, all if None
+        output_file (Optional[str]): The Excel file or the directory of the Parquet dataset relative to the output
+            directory of the service, None to not save
+
+        Returns:
+        Tuple[int, Any]: 202 and the state of the job, 503 if the queue is full or 400 for invalid arguments
+        """
+        payload = {"pdf_dir": pdf_dir, "files": files, "output_file": output_file}
+        return await self.request("POST", "/jobs", {key: value for key, value in payload.items() if value is not None})
+
+    async def status(self) -> Dict[str, Any]:
+        """
+        This function returns the state of the service and of all jobs.
+
+        Returns:
+        Dict[str, Any]: The state
+        """
+        return (await self.request("GET", "/status"))[1]
+
+    async def wait(self, job_id: int, poll_seconds: float = 0.1) -> Dict[str, Any]:
+        """
+        This function waits until a job is done or failed.
+
+        Parameters:
+        job_id (int): The id of the job
+        poll_seconds (float): The seconds between two requests
+
+        Returns:
+        Dict[str, Any]: The state of the job
+        """
+        while True:
+            job = (await self.request("GET", f"/jobs/{job_id}"))[1]
+            if job["state"] in ("done", "failed"):
+                return job
+            await asyncio.sleep(poll_seconds)
+
+    async def results(self, job_id: int) -> pd.DataFrame:
+        """
+        This function returns the combined rows of a finished job.
+
+        Parameters:
+        job_id (int): The id of the job
+
+        Returns:
+        pd.DataFrame: The rows with the times as strings
+        """
+        status, records = await self.request("GET", f"/results/{job_id}")
+        if status != 200:
+            raise KeyError(records["error"])
+        return pd.DataFrame(records)
+
+    async def quarantine(self, job_id: int) -> pd.DataFrame:
+        """
+        This function returns the rows of a finished job that failed the validation.
+
+        Parameters:
+        job_id (int): The id of the job
+
+        Returns:
+        pd.DataFrame: The rows as extracted, with the PDF file and the names of the failed checks
+        """
+        status, records = await self.request("GET", f"/quarantine/{job_id}")
+        if status != 200:
+            raise KeyError(records["error"])
+        return pd.DataFrame(records)
+
+
+async def serve(
+    host: str = HOST,
+    port: int = PORT,
+    workers: int = 2,
+    max_queued_jobs: int = MAX_QUEUED_JOBS,
+    engine: str = "tabula",
+    output_dir: str = OUTPUT_DIR,
+) -> None:
+    """
+    This function runs the service until it is interrupted.
+
+    Parameters:
+    host (str): The address the HTTP endpoint listens on
+    port (int): The port of the HTTP endpoint
+    workers (int): The number of worker processes
+    max_queued_jobs (int): The maximum number of waiting jobs
+    engine (str): The extraction engine, one of main.ENGINES
+    output_dir (str): The directory the results of the jobs are saved in
+    """
+    service = IngestService(workers=workers, max_queued_jobs=max_queued_jobs, engine=engine, output_dir=output_dir)
+    await service.start(host, port)
+    print(f"Ingest service listening on http://{host}:{service.port}, press Ctrl+C to stop.")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await service.stop()
@@ -0,0 +1,314 @@
+import datetime
+import os
+import shutil
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from helpers import OUTPUT_FILE
+from race_times import format_race_time, parse_race_times
+from schema import RESULTS_SCHEMA, apply_schema
+
+
+class ExcelSink:
+    """
+    This class writes the rows of the combined dataframe page by page into an Excel file.
+    It uses the write-only mode of openpyxl, which streams the rows into the file
+    instead of keeping the whole workbook in memory.
+    The file has the same layout as DataFrame.to_excel: a header row and the row number in the first column.
+    The workbook is saved into a temporary file and replaces the previous file only when the sink is closed
+    without an error, so a failed run keeps the previous output.
+    """
+
+    def __init__(self, output_file: str) -> None:
+        """
+        This function creates the sink.
+
+        Parameters:
+        output_file (str): The Excel file the rows are written to
+        """
+        import openpyxl
+
+        self.output_file = output_file
+        self.rows = 0
+        self._columns: Optional[List[str]] = None
+        self._workbook = openpyxl.Workbook(write_only=True)
+        self._worksheet = self._workbook.create_sheet("Sheet1")
+
+    def write(self, df: pd.DataFrame) -> None:
+        """
+        This function appends the rows of a dataframe to the Excel file.
+        All dataframes must have the same columns.
+
+        Parameters:
+        df (pd.DataFrame): The rows to append
+        """
+        # Write the header row before the first rows
+        if self._columns is None:
+            self._columns = list(df.columns)
+            self._worksheet.append([None, *self._columns])
+        elif list(df.columns) != self._columns:
+            raise ValueError(f"Expected the columns {self._columns}, got {list(df.columns)}")
+
+        # Append the rows with a running row number as index
+        for values in df.itertuples(index=False, name=None):
+            self._worksheet.append([self.rows, *(excel_value(value) for value in values)])
+            self.rows += 1
+
+    def close(self) -> None:
+        """
+        This function saves the Excel file. It is written into a temporary file first,
+        which replaces the previous file once it is complete.
+        """
+        tmp_file = f"{self.output_file}.{os.getpid()}.tmp"
+        try:
+            self._workbook.save(tmp_file)
+            os.replace(tmp_file, self.output_file)
+        finally:
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+
+    def abort(self) -> None:
+        """
+        This function drops the rows written so far, the previous Excel file is kept.
+        """
+        # Finish the temporary file openpyxl streams the rows into and remove it
+        if not self._worksheet.closed:
+            self._worksheet.close()
+            self._worksheet._writer.cleanup()
+
+    def __enter__(self) -> "ExcelSink":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        # Only save the workbook if all pages were written
+        if exc_info[0] is not None:
+            self.abort()
+        else:
+            self.close()
+
+
+class DataFrameSink:
+    """
+    This class collects the rows written to it and combines them into one dataframe when it is closed.
+    """
+
+    def __init__(self) -> None:
+        """
+        This function creates the sink.
+        """
+        self.rows = 0
+        self.df = pd.DataFrame()
+        self._dataframes: List[pd.DataFrame] = []
+
+    def write(self, df: pd.DataFrame) -> None:
+        """
+        This function collects the rows of a dataframe.
+
+        Parameters:
+        df (pd.DataFrame): The rows to collect
+        """
+        self._dataframes.append(df)
+        self.rows += len(df)
+
+    def close(self) -> None:
+        """
+        This function combines the collected rows into the dataframe df.
+        """
+        if self._dataframes:
+            self.df = pd.concat(self._dataframes, ignore_index=True)
+        self._dataframes = []
+
+    def __enter__(self) -> "DataFrameSink":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class ParquetSink:
+    """
+    This class writes the rows of the combined dataframe page by page into a Parquet dataset
+    that is partitioned by a column, by default the year of competition.
+    Every year gets its own directory 'Jahr=<year>' with one Parquet file, so a single year or a few columns
+    can be loaded without reading the whole dataset, e.g. with load_results(output_dir, years=[2023]).
+    The dataset is written into a temporary directory and replaces the previous dataset when the sink is closed
+    without an error, so a failed run keeps the previous dataset. It needs the optional dependency pyarrow.
+    """
+
+    def __init__(self, output_dir: str, partition_column: str = "Jahr") -> None:
+        """
+        This function creates the sink.
+
+        Parameters:
+        output_dir (str): The directory of the dataset
+        partition_column (str): The column the rows are partitioned by
+        """
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as error:
+            raise ImportError(
+                "Writing Parquet files requires pyarrow, install it with 'pip install pyarrow'"
+            ) from error
+
+        self.output_dir = output_dir
+        self.partition_column = partition_column
+        self.rows = 0
+        self._schema = None
+        self._writers: Dict[Any, Any] = {}
+
+        # Start with an empty temporary directory, a previous interrupted run may have left one
+        self._tmp_dir = f"{output_dir.rstrip(os.sep)}.{os.getpid()}.tmp"
+        shutil.rmtree(self._tmp_dir, ignore_errors=True)
+        os.makedirs(self._tmp_dir)
+
+    def write(self, df: pd.DataFrame) -> None:
+        """
+        This function appends the rows of a dataframe to the Parquet files of their partitions.
+        All dataframes must have the same columns, the data types of the first dataframe are used for all rows.
+
+        Parameters:
+        df (pd.DataFrame): The rows to append
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        for value, part in df.groupby(self.partition_column, sort=False, observed=True):
+            # The partition column is stored in the directory name and not in the file
+            table = pa.Table.from_pandas(part.drop(columns=self.partition_column), preserve_index=False)
+            if self._schema is None:
+                self._schema = table.schema
+            else:
+                table = table.cast(self._schema)
+
+            # Open one file per partition and append the rows of every page to it as a new row group
+            if value not in self._writers:
+                partition_dir = os.path.join(self._tmp_dir, f"{self.partition_column}={value}")
+                os.makedirs(partition_dir)
+                self._writers[value] = pq.ParquetWriter(os.path.join(partition_dir, "part-0.parquet"), self._schema)
+            self._writers[value].write_table(table)
+        self.rows += len(df)
+
+    def close(self) -> None:
+        """
+        This function closes the Parquet files and replaces the previous dataset with the new one.
+        The previous dataset is renamed before the new one is renamed into its place, so there is always
+        a complete dataset on disk, and it is only deleted afterwards.
+        """
+        for writer in self._writers.values():
+            writer.close()
+        self._writers = {}
+
+        old_dir = f"{self.output_dir.rstrip(os.sep)}.{os.getpid()}.old"
+        shutil.rmtree(old_dir, ignore_errors=True)
+        if os.path.exists(self.output_dir):
+            os.replace(self.output_dir, old_dir)
+        os.replace(self._tmp_dir, self.output_dir)
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+    def abort(self) -> None:
+        """
+        This function drops the rows written so far, the previous dataset is kept.
+        """
+        for writer in self._writers.values():
+            writer.close()
+        self._writers = {}
+        shutil.rmtree(self._tmp_dir, ignore_errors=True)
+
+    def __enter__(self) -> "ParquetSink":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        # Only replace the dataset if all pages were written
+        if exc_info[0] is not None:
+            self.abort()
+        else:
+            self.close()
+
+
+def is_excel_file(path: str) -> bool:
+    """
+    This function checks if an output path is an Excel file or a Parquet dataset.
+
+    Parameters:
+    path (str): The output path
+
+    Returns:
+    bool: True for a path ending in .xlsx, False otherwise
+    """
+    return path.lower().endswith(".xlsx")
+
+
+def open_sink(path: str) -> Union[ExcelSink, ParquetSink]:
+    """
+    This function creates the sink for an output path.
+    Paths ending in .xlsx are written as Excel file, all other paths as Parquet dataset partitioned by year.
+
+    Parameters:
+    path (str): The output path
+
+    Returns:
+    Union[ExcelSink, ParquetSink]: The sink
+    """
+    return ExcelSink(path) if is_excel_file(path) else ParquetSink(path)
+
+
+def load_results(
+    output_file: str = OUTPUT_FILE, columns: Optional[List[str]] = None, years: Optional[Iterable[int]] = None
+) -> pd.DataFrame:
+    """
+    This function loads a combined dataframe saved by main.save_results.
+    From a Parquet dataset only the selected columns and the files of the selected years are read.
+    It only needs this module and schema, so the queries of the saved results start without the pipeline.
+
+    Parameters:
+    output_file (str): The Excel file or the directory of the Parquet dataset
+    columns (Optional[List[str]]): The columns to load, all columns if None
+    years (Optional[Iterable[int]]): The years to load, all years if None
+
+    Returns:
+    pd.DataFrame: The combined dataframe
+    """
+    if is_excel_file(output_file):
+        # Keep strings like 'nan' in the name columns as they were saved
+        df = pd.read_excel(output_file, index_col=0, engine="openpyxl", keep_default_na=False)
+
+        # The times are read as strings, convert them back to durations
+        df["Zeit"] = parse_race_times(df["Zeit"])
+        df = apply_schema(df)
+
+        if years is not None:
+            df = df[df["Jahr"].isin([int(year) for year in years])].reset_index(drop=True)
+        return df if columns is None else df[columns]
+
+    # The year is stored in the directory names, it is read as categorical column
+    filters = None if years is None else [("Jahr", "in", [int(year) for year in years])]
+    read_columns = None if columns is None else [column for column in RESULTS_SCHEMA if column in columns]
+    df = apply_schema(pd.read_parquet(output_file, columns=read_columns, filters=filters))
+    return df if columns is None else df[columns]
+
+
+def excel_value(value: Any) -> Any:
+    """
+    This function converts a value of a dataframe into a value openpyxl can write,
+    in the same way as save_results does.
+
+    Parameters:
+    value (Any): The value
+
+    Returns:
+    Any: The value for the Excel cell
+    """
+    if isinstance(value, np.generic):
+        value = value.item()
+    # Missing values are written as empty cells
+    if pd.isna(value):
+        return None
+    # Race times are written as text like 'HH:MM:SS,t', in the same way as save_results does
+    if isinstance(value, datetime.timedelta):
+        return format_race_time(value)
+    if isinstance(value, (str, bool, int, float, datetime.date)):
+        return value
+    # Other types, e.g. time objects, are written as text
+    return str(value)
@@ -0,0 +1,229 @@
+import csv
+import functools
+import hashlib
+import os
+import pickle
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+import table_cache
+from schema import RESULTS_SCHEMA
+
+# The project directory, the files of the supplements are relative to it
+PROJECT_DIR: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# File with the supplementary tables, one row per table with the columns 'year', 'file' and 'columns'.
+# A table has the column 'Startnummer' and the columns it supplies, separated by ';' in 'columns'
+SUPPLEMENTS_FILE: str = os.path.join(PROJECT_DIR, "references", "supplements.csv")
+
+# Directory of the converted tables, data/interim/supplements in the project directory
+CACHE_DIR: str = os.path.join(PROJECT_DIR, "data", "interim", "supplements")
+
+# A supplementary table: the year of competition, the file and the columns it supplies
+Supplement = Tuple[str, str, List[str]]
+
+
+def read_supplements(path: str = SUPPLEMENTS_FILE) -> List[Supplement]:
+    """
+    This function reads the list of the supplementary tables.
+
+    Parameters:
+    path (str): The CSV file with the columns 'year', 'file' and 'columns'
+
+    Returns:
+    List[Supplement]: The year, the path and the columns of each table
+    """
+    if not os.path.exists(path):
+        return []
+    with open(path, newline="", encoding="utf-8") as file:
+        return [
+            (row["year"], os.path.join(PROJECT_DIR, row["file"]), row["columns"].split(";"))
+            for row in csv.DictReader(file)
+        ]
+
+
+def read_table(path: str, columns: List[str]) -> pd.DataFrame:
+    """
+    This function reads a supplementary table from an Excel or CSV file and converts the columns
+    into the data types of schema.RESULTS_SCHEMA. Rows without a bib number or without a value are left out.
+
+    Parameters:
+    path (str): The Excel or CSV file
+    columns (List[str]): The columns the table supplies
+
+    Returns:
+    pd.DataFrame: The values indexed by 'Startnummer'
+    """
+    if path.lower().endswith(".xlsx"):
+        df = pd.read_excel(path, engine="openpyxl", usecols=["Startnummer", *columns])
+    else:
+        df = pd.read_csv(path, usecols=["Startnummer", *columns])
+
+    df = df.dropna()
+    df["Startnummer"] = df["Startnummer"].astype("int64")
+    for column in columns:
+        # Integer columns keep their type, all other columns are strings like before the schema is applied
+        dtype = RESULTS_SCHEMA.get(column, "object")
+        df[column] = df[column].astype("int64" if dtype.startswith("int") else str)
+
+    # The last row of a bib number wins, like in a dictionary
+    return df.drop_duplicates("Startnummer", keep="last").set_index("Startnummer").sort_index()
+
+
+def cache_file_name(path: str, columns: List[str]) -> str:
+    """
+    This function returns the name of the cache file of a supplementary table,
+    the content hash of the file and a hash of the columns.
+
+    Parameters:
+    path (str): The Excel or CSV file
+    columns (List[str]): The columns the table supplies
+
+    Returns:
+    str: The file name in the cache directory
+    """
+    columns_hash = hashlib.sha256(";".join(columns).encode("utf-8")).hexdigest()[:16]
+    return f"{table_cache.file_hash(path)}-{columns_hash}.pkl"
+
+
+def load_table(
+    path: str, columns: List[str], cache_dir: str = CACHE_DIR, cache_name: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    This function returns a supplementary table from the cache. The table is only read from the Excel or CSV file
+    when the file or the columns changed, the cache key is the content hash of the file and the columns.
+
+    Parameters:
+    path (str): The Excel or CSV file
+    columns (List[str]): The columns the table supplies
+    cache_dir (str): The directory of the converted tables
+    cache_name (Optional[str]): The name of the cache file if it is already known, see cache_file_name
+
+    Returns:
+    pd.DataFrame: The values indexed by 'Startnummer'
+    """
+    cache_file = os.path.join(cache_dir, cache_name or cache_file_name(path, columns))
+    try:
+        with open(cache_file, "rb") as file:
+            return pickle.load(file)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        pass
+
+    table = read_table(path, columns)
+
+    # Write into a temporary file first, so an interrupted run never leaves a broken entry
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+    with open(tmp_file, "wb") as file:
+        pickle.dump(table, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_file, cache_file)
+    return table
+
+
+def prune_cache(keep: List[str], cache_dir: str = CACHE_DIR) -> List[str]:
+    """
+    This function removes the converted tables that are not in use anymore,
+    e.g. of a changed file or of a table that was removed from references/supplements.csv.
+
+    Parameters:
+    keep (List[str]): The names of the cache files in use
+    cache_dir (str): The directory of the converted tables
+
+    Returns:
+    List[str]: The names of the removed cache files
+    """
+    if not os.path.isdir(cache_dir):
+        return []
+
+    removed = []
+    for filename in os.listdir(cache_dir):
+        if filename.endswith(".pkl") and filename not in keep:
+            try:
+                os.remove(os.path.join(cache_dir, filename))
+            except FileNotFoundError:
+                # The file was already removed by another process
+                continue
+            removed.append(filename)
+    return removed
+
+
+def load_supplements(supplements: List[Supplement], cache_dir: str = CACHE_DIR) -> Dict[str, List[pd.DataFrame]]:
+    """
+    This function loads the supplementary tables and groups them by year. Missing files are skipped.
+    The converted tables of other files or columns are removed from the cache directory.
+
+    Parameters:
+    supplements (List[Supplement]): The year, the path and the columns of each table
+    cache_dir (str): The directory of the converted tables
+
+    Returns:
+    Dict[str, List[pd.DataFrame]]: The lookup tables of each year, indexed by 'Startnummer'
+    """
+    lookups: Dict[str, List[pd.DataFrame]] = {}
+    in_use = []
+    for year, path, columns in supplements:
+        if os.path.exists(path):
+            in_use.append(cache_file_name(path, columns))
+            lookups.setdefault(year, []).append(load_table(path, columns, cache_dir, in_use[-1]))
+    prune_cache(in_use, cache_dir)
+    return lookups
+
+
+@functools.lru_cache(maxsize=None)
+def default_supplements() -> Dict[str, List[pd.DataFrame]]:
+    """
+    This function returns the lookup tables of references/supplements.csv, they are only loaded once per process.
+
+    Returns:
+    Dict[str, List[pd.DataFrame]]: The lookup tables of each year, indexed by 'Startnummer'
+    """
+    return load_supplements(read_supplements())
+
+
+def apply_supplements(df: pd.DataFrame, lookups: Optional[Dict[str, List[pd.DataFrame]]] = None) -> pd.DataFrame:
+    """
+    This function replaces values of the combined dataframe with the values of the supplementary tables.
+    For each year with a table, the rows of the year are joined with the table by their 'Startnummer' at once.
+    Rows whose bib number is not in the table keep their values. If several tables of a year supply a value,
+    the first table in references/supplements.csv wins. A column that is not in the dataframe yet, e.g. 'Verein',
+    is added to all rows, so the pages of every year have the same columns. Rows without a value get NaN.
+
+    Parameters:
+    df (pd.DataFrame): The combined dataframe before the data types are converted, with the columns 'Jahr'
+        and 'Startnummer'
+    lookups (Optional[Dict[str, List[pd.DataFrame]]]): The lookup tables of each year, default_supplements if None
+
+    Returns:
+    pd.DataFrame: The combined dataframe with the supplied values
+    """
+    lookups = default_supplements() if lookups is None else lookups
+    if not lookups:
+        return df
+
+    # Add the columns the dataframe does not have yet
+    for column in dict.fromkeys(column for tables in lookups.values() for table in tables for column in table.columns):
+        if column not in df.columns:
+            df[column] = pd.Series(np.nan, index=df.index, dtype=object)
+    if df.empty:
+        return df
+
+    years = df["Jahr"].astype(str).to_numpy()
+    for year, tables in lookups.items():
+        rows = np.flatnonzero(years == year)
+        if len(rows) == 0:
+            continue
+
+        # The bib numbers of the year, bib numbers that are not an integer are not found
+        bibs = pd.to_numeric(df["Startnummer"].iloc[rows], errors="coerce").to_numpy()
+
+        # The tables are applied in reverse order, so the values of the first table are written last
+        for table in reversed(tables):
+            # Look up the positions of all bib numbers in the table with one search
+            positions = table.index.get_indexer(bibs)
+            found = positions >= 0
+            for column in table.columns:
+                values = table[column].to_numpy(dtype=object)[positions[found]]
+                df.iloc[rows[found], df.columns.get_loc(column)] = values
+    return df
@@ -0,0 +1,391 @@
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# The layouts of the result lists in data/raw: 2012 with pace and times with tenths of a second,
+# 2023 with the number of laps and times in whole seconds
+LAYOUTS = ("2012", "2023")
+
+# Rows per page of the result lists
+ROWS_PER_PAGE: Dict[str, int] = {"2012": 48, "2023": 27}
+
+# The headers of the tables as tabula reads them
+TABLE_COLUMNS: Dict[str, List[str]] = {
+    "2012": ["Zieleinlaufliste 10km Stadtlauf", "Unnamed: 0", "Unnamed: 1", "Unnamed: 2"],
+    "2023": [
+        "Zieleinlaufliste 10km Stadtlauf",
+        "Unnamed: 0",
+        "Unnamed: 1",
+        "Unnamed: 2",
+        "Unnamed: 3",
+        "Unnamed: 4",
+    ],
+}
+HEADER_ROWS: Dict[str, List[Optional[str]]] = {
+    "2012": ["Ge AKPl Star Name Jah m/w AK", "Verein", "Zeit", "Pace"],
+    "2023": ["GesPl AKPl Startnr. Name", "Jahrg. m/w AK", "Verein", None, "Zeit", "Runden"],
+}
+
+# fmt: off
+LAST_NAMES = [
+    "Müller", "Schmitt", "Schneider", "Fischer", "Weber", "Meyer", "Wagner", "Becker", "Schulz", "Hoffmann",
+    "Klein", "Wolf", "Schröder", "Neumann", "Schwarz", "Zimmermann", "Braun", "Krüger", "Hofmann", "Hartmann",
+    "Lange", "Schmid", "Werner", "Krause", "Meier", "Lehmann", "Schmidt", "Köhler", "Herrmann", "König",
+    "Walter", "Mayer", "Huber", "Kaiser", "Fuchs", "Peters", "Lang", "Scholz", "Möller", "Weiß", "Jung", "Hahn",
+    "Schubert", "Vogel", "Friedrich", "Keller", "Günther", "Frank", "Berger", "Winkler", "Roth", "Beck",
+    "Lorenz", "Baumann", "Franke", "Albrecht", "Schuster", "Simon", "Ludwig", "Böhm", "Winter", "Kraus",
+    "Martin", "Schumacher", "Krämer", "Vogt", "Stein", "Jäger", "Otto", "Sommer", "Groß", "Seidel", "Heinrich",
+    "Brandt", "Haas", "Schreiber", "Graf", "Schulte", "Dietrich", "Ziegler", "Kuhn", "Kühn", "Pohl", "Engel",
+    "Horn", "Busch", "Bergmann", "Thomas", "Voigt", "Sauer", "Arnold", "Wolff", "Pfeiffer", "Nickels-Barth",
+]
+MALE_FIRST_NAMES = [
+    "Andreas", "Michael", "Thomas", "Stefan", "Christian", "Markus", "Frank", "Peter", "Klaus", "Jürgen",
+    "Patrick", "Martin", "Uwe", "Philipp", "Jakob", "Justin", "Björn", "Marc", "Timo", "Sebastian", "Jörg",
+    "Ralf", "Werner", "Jochen", "Daniel", "André", "Reinhard", "Lukas", "Jonas", "Felix",
+]
+FEMALE_FIRST_NAMES = [
+    "Sabine", "Andrea", "Martina", "Petra", "Susanne", "Heike", "Nicole", "Stefanie", "Anna", "Julia",
+    "Michelle", "Luisa", "Lara", "Jana", "Felicia", "Irene", "Ulrike", "Tanja", "Elke", "Marion", "Gresa",
+]
+CLUBS = [
+    "LAZ Saarbrücken", "LTF Marpingen", "LC Schmelz", "LTF Theeltal", "Lauftreff CDU Saar", "TV Lebach",
+    "LG Reimsbach-Oppen", "Spiridon Hochwald", "SG Noswendel-Wadern", "TV Bexbach 1886",
+]
+# fmt: on
+
+
+def age_classes(gender: np.ndarray, age: np.ndarray, layout: str) -> np.ndarray:
+    """
+    This function determines the age class of each runner, e.g. 'M35', 'W' or 'MJ_U23'.
+    The main class is 'MHK'/'WHK' in the layout of 2012 and 'M'/'W' in the layout of 2023.
+
+    Parameters:
+    gender (np.ndarray): The gender of each runner, 'm' or 'w'
+    age (np.ndarray): The age of each runner in the year of competition
+    layout (str): The layout, one of LAYOUTS
+
+    Returns:
+    np.ndarray: The age class of each runner
+    """
+    prefix = np.where(gender == "m", "M", "W")
+    senior = np.char.add(prefix, (np.minimum(age, 80) // 5 * 5).astype(str))
+    youth = np.char.add(np.char.add(prefix, "J_U"), np.select([age < 16, age < 18, age < 20], ["16", "18", "20"], "23"))
+    main_class = np.char.add(prefix, "HK") if layout == "2012" else prefix
+    return np.select([age < 23, age < 30], [youth, main_class], senior)
+
+
+def class_descriptions(gender: np.ndarray, age_class: np.ndarray, layout: str) -> np.ndarray:
+    """
+    This function creates the gender and age class text of each runner, e.g. 'm Senioren M35' (2012)
+    or 'Männern Senioren M35' (2023). In 2012 the text of the women's classes is cut after 'Seniorinnen'.
+
+    Parameters:
+    gender (np.ndarray): The gender of each runner, 'm' or 'w'
+    age_class (np.ndarray): The age class of each runner
+    layout (str): The layout, one of LAYOUTS
+
+    Returns:
+    np.ndarray: The text of each runner
+    """
+    male = gender == "m"
+    is_youth = np.char.find(age_class, "J_U") >= 0
+    is_main = np.isin(age_class, ["M", "W", "MHK", "WHK"])
+    youth = np.char.add(
+        np.where(male, "männliche Jugend ", "weibliche Jugend "), np.char.rpartition(age_class, "_")[:, 2]
+    )
+    if layout == "2012":
+        senior = np.where(male, np.char.add("Senioren ", age_class), "Seniorinnen")
+        text = np.select(
+            [is_youth, is_main], [np.where(male, "männliche", "weibliche"), np.where(male, "Männer", "Frauen")], senior
+        )
+        return np.char.add(np.char.add(gender, " "), text)
+    senior = np.char.add(np.where(male, "Senioren ", "Seniorinnen "), age_class)
+    text = np.select([is_youth, is_main], [youth, np.where(male, "Männer", "Frauen")], senior)
+    return np.char.add(np.where(male, "Männern ", "Frauen "), text)
+
+
+def format_times(milliseconds: np.ndarray, tenths: bool) -> np.ndarray:
+    """
+    This function formats race times like the result lists: 'M:SS' below one hour and 'H:MM:SS' above,
+    with the tenths of a second after a comma if tenths is True. The minutes only get a leading zero after the hours,
+    so a pace like '3:24,8' is never taken for a race time.
+
+    Parameters:
+    milliseconds (np.ndarray): The race times in milliseconds
+    tenths (bool): Whether the tenths of a second are written
+
+    Returns:
+    np.ndarray: The race times as strings
+    """
+    hours, rest = np.divmod(milliseconds, 3_600_000)
+    minutes, rest = np.divmod(rest, 60_000)
+    seconds, fraction = np.divmod(rest, 1000)
+    seconds_text = ":" + pd.Series(seconds).astype(str).str.zfill(2)
+    text = (pd.Series(minutes).astype(str) + seconds_text).where(
+        hours == 0, pd.Series(hours).astype(str) + ":" + pd.Series(minutes).astype(str).str.zfill(2) + seconds_text
+    )
+    if tenths:
+        text = text + "," + pd.Series(fraction // 100).astype(str)
+    return text.to_numpy(dtype=object)
+
+
+def generate_results(finishers: int, year: int = 2023, layout: str = "2023", seed: int = 0) -> pd.DataFrame:
+    """
+    This function generates a random result list with the given number of finishers.
+    The same seed always gives the same result list.
+
+    Parameters:
+    finishers (int): The number of finishers
+    year (int): The year of competition
+    layout (str): The layout, one of LAYOUTS, it decides the names of the age classes and the precision of the times
+    seed (int): The seed of the random number generator
+
+    Returns:
+    pd.DataFrame: The expected output of the pipeline with the columns of schema.RESULTS_SCHEMA
+        and the additional columns 'Verein', 'Zeit_text' and 'Klasse' used for the layouts, sorted by the overall place.
+        For the year 2012 the pipeline takes the birth years from data/raw/2012_Name_Jahrgang.xlsx instead
+    """
+    rng = np.random.default_rng(seed)
+
+    # Runners with gender, age and names. In the layout of 2023 about one in thirty runners has a second first name,
+    # the list of 2012 has none
+    gender = np.where(rng.random(finishers) < 0.7, "m", "w")
+    age = rng.integers(14, 82, finishers)
+    last_names = np.array(LAST_NAMES, dtype=object)[rng.integers(0, len(LAST_NAMES), finishers)]
+    male_first = np.array(MALE_FIRST_NAMES, dtype=object)[rng.integers(0, len(MALE_FIRST_NAMES), (2, finishers))]
+    female_first = np.array(FEMALE_FIRST_NAMES, dtype=object)[rng.integers(0, len(FEMALE_FIRST_NAMES), (2, finishers))]
+    first_names = np.where(gender == "m", male_first, female_first)
+    share_second_first_names = 1 / 30 if layout == "2023" else 0
+    second_first_names = np.where(rng.random(finishers) < share_second_first_names, first_names[1], "nan")
+
+    # Increasing times between 33 minutes and 1:25 hours, in tenths of a second for the layout of 2012
+    times = np.sort(rng.uniform(33 * 60_000, 85 * 60_000, finishers)).astype(np.int64)
+    times = times // 100 * 100 if layout == "2012" else times // 1000 * 1000
+
+    # The place in the age class is the rank of the runner within the class
+    age_class = age_classes(gender, age, layout)
+    class_place = pd.Series(age_class).groupby(age_class).cumcount().to_numpy() + 1
+
+    results = pd.DataFrame(
+        {
+            "Gesamt Platz": np.arange(1, finishers + 1),
+            "Platz AK": np.char.add(np.char.add(class_place.astype(str), "."), age_class),
+            "Startnummer": rng.permutation(finishers) + 1,
+            "Name": last_names,
+            "Vorname1": first_names[0],
+            "Vorname2": second_first_names,
+            "Jahrgang": year - age,
+            "Geschlecht": gender,
+            "Zeit": pd.to_timedelta(times, unit="ms"),
+            "Jahr": year,
+            "Verein": np.where(
+                rng.random(finishers) < 0.6, np.array(CLUBS)[rng.integers(0, len(CLUBS), finishers)], ""
+            ),
+            "Zeit_text": format_times(times, layout == "2012"),
+        }
+    )
+    results["Klasse"] = class_descriptions(gender, age_class, layout)
+    return results
+
+
+def runner_cells(results: pd.DataFrame) -> pd.Series:
+    """
+    This function creates the 'Platz AK Startnummer Name, Vorname' part of each row.
+
+    Parameters:
+    results (pd.DataFrame): A result list of generate_results
+
+    Returns:
+    pd.Series: The text of each row
+    """
+    first_names = results["Vorname1"].where(
+        results["Vorname2"] == "nan", results["Vorname1"] + " " + results["Vorname2"]
+    )
+    return (
+        results["Gesamt Platz"].astype(str)
+        + ". "
+        # The lists write the youth classes with a blank, e.g. '1.MJ U23', the pipeline with '_'
+        + results["Platz AK"].str.replace("_", " ")
+        + " "
+        + results["Startnummer"].astype(str)
+        + " "
+        + results["Name"]
+        + ", "
+        + first_names
+    )
+
+
+def to_raw_tables(results: pd.DataFrame, layout: str = "2023") -> List[pd.DataFrame]:
+    """
+    This function splits a result list into pages with the columns and header rows that tabula reads
+    from the result lists in data/raw, i.e. the input of main.clean_table before the year is inserted.
+    Unlike the real list of 2012 the birth year is written with all four digits, so the output can be checked.
+
+    Parameters:
+    results (pd.DataFrame): A result list of generate_results
+    layout (str): The layout, one of LAYOUTS
+
+    Returns:
+    List[pd.DataFrame]: The raw table of each page
+    """
+    runners = runner_cells(results)
+    verein = results["Verein"].replace("", np.nan)
+    if layout == "2012":
+        rows = pd.DataFrame(
+            {
+                0: runners + " " + results["Jahrgang"].astype(str) + " " + results["Klasse"],
+                1: verein,
+                2: results["Zeit_text"],
+                # The pace per kilometer of the 10 km run
+                3: format_times(
+                    (results["Zeit"].dt.total_seconds() * 100).astype(np.int64).to_numpy() // 100 * 100, True
+                ),
+            }
+        )
+    else:
+        rows = pd.DataFrame(
+            {
+                0: runners,
+                1: results["Jahrgang"].astype(str) + " " + results["Klasse"],
+                2: verein,
+                3: np.nan,
+                4: results["Zeit_text"],
+                5: "3",
+            }
+        )
+
+    tables = []
+    rows_per_page = ROWS_PER_PAGE[layout]
+    for start in range(0, len(rows), rows_per_page):
+        # Every page starts with the header row, the first page also with the name of the race
+        header = [HEADER_ROWS[layout]] + ([["10km Stadtlauf"] + [None] * (len(rows.columns) - 1)] if start == 0 else [])
+        page = pd.concat(
+            [pd.DataFrame(header, columns=rows.columns), rows.iloc[start : start + rows_per_page]], ignore_index=True
+        )
+        page.columns = TABLE_COLUMNS[layout]
+        tables.append(page.astype(object).where(page.notna(), np.nan))
+    return tables
+
+
+def to_text_lines(results: pd.DataFrame, layout: str = "2023") -> List[List[str]]:
+    """
+    This function splits a result list into pages of lines like the text layer of the result lists in data/raw,
+    i.e. the input of text_engine.parse_page.
+
+    Parameters:
+    results (pd.DataFrame): A result list of generate_results
+    layout (str): The layout, one of LAYOUTS
+
+    Returns:
+    List[List[str]]: The lines of each page
+    """
+    pace = format_times((results["Zeit"].dt.total_seconds() * 100).astype(np.int64).to_numpy() // 100 * 100, True)
+    verein = results["Verein"].where(results["Verein"] == "", " " + results["Verein"])
+    lines = (
+        runner_cells(results)
+        + " "
+        + results["Jahrgang"].astype(str)
+        + " "
+        + results["Klasse"]
+        + verein
+        + " "
+        + results["Zeit_text"]
+        + " "
+        + (pd.Series(pace, index=results.index) if layout == "2012" else "3")
+    ).tolist()
+
+    header = (
+        "Ge AKPl Star Name Jah m/w AK Verein Zeit Pace"
+        if layout == "2012"
+        else "GesPl AKPl Startnr. Name Jahrg. m/w AK Verein Zeit Runden"
+    )
+    rows_per_page = ROWS_PER_PAGE[layout]
+    pages = []
+    for number, start in enumerate(range(0, len(lines), rows_per_page)):
+        title = ["10km Stadtlauf"] if start == 0 else []
+        footer = [f"Anzahl Teilnehmer: {len(lines)}"] if start + rows_per_page >= len(lines) else []
+        pages.append(
+            [
+                header,
+                *title,
+                *lines[start : start + rows_per_page],
+                *footer,
+                "Zieleinlaufliste 10km Stadtlauf",
+                str(number + 1),
+            ]
+        )
+    return pages
+
+
+def write_pdf(path: str, pages: List[List[str]]) -> None:
+    """
+    This function writes lines of text into a minimal PDF file with one page per list of lines,
+    in the font Helvetica with 8 points. It needs no PDF library.
+
+    Parameters:
+    path (str): The path to the PDF file
+    pages (List[List[str]]): The lines of each page
+    """
+
+    def escape(line: str) -> bytes:
+        # The standard fonts use the Windows code page 1252, which contains the German umlauts
+        text = line.encode("cp1252", errors="replace")
+        return text.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+    # Objects 1 to 3 are the catalog, the page tree and the font, then each page has a page and a content object
+    objects: List[bytes] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    page_ids = []
+    for lines in pages:
+        content = b"BT /F1 8 Tf 11 TL 30 800 Td " + b" ".join(b"(" + escape(line) + b") '" for line in lines) + b" ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 3 0 R >> >> "
+            f"/Contents {len(objects) + 2} 0 R >>".encode("ascii")
+        )
+        page_ids.append(len(objects))
+        objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(page_ids)} >>".encode(
+        "ascii"
+    )
+
+    # Write the objects and the cross-reference table with the byte offset of each object
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+
+    with open(path, "wb") as file:
+        file.write(output)
+
+
+def write_archive(directory: str, finishers: int, years: Dict[int, str], seed: int = 0) -> Dict[str, pd.DataFrame]:
+    """
+    This function writes synthetic result lists as PDF files named like the files in data/raw,
+    e.g. '2023_HACO_ErgebnislistenZieleinlaufliste.pdf', so the directory can be used as pdf_dir of main.
+
+    Parameters:
+    directory (str): The directory of the PDF files
+    finishers (int): The number of finishers of each result list
+    years (Dict[int, str]): The years of competition with their layout, e.g. {2012: '2012', 2023: '2023'}
+    seed (int): The seed of the random number generator, every year gets its own seed derived from it
+
+    Returns:
+    Dict[str, pd.DataFrame]: The generated result list of each PDF file
+    """
+    os.makedirs(directory, exist_ok=True)
+    archive = {}
+    for year, layout in years.items():
+        filename = f"{year}_HACO_ErgebnislistenZieleinlaufliste.pdf"
+        archive[filename] = generate_results(finishers, year, layout, seed + year)
+        write_pdf(os.path.join(directory, filename), to_text_lines(archive[filename], layout))
+    return archive
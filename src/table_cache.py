@@ -0,0 +1,160 @@
+import hashlib
+import json
+import os
+import pickle
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+# Directory of the cache, data/interim/tabula_cache in the project directory
+CACHE_DIR: str = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "interim", "tabula_cache"
+)
+
+# Maximum total size of the cache in bytes before the least recently used entries are evicted
+MAX_CACHE_BYTES: int = 256 * 1024 * 1024
+
+
+def file_hash(path: str) -> str:
+    """
+    This function calculates the SHA-256 hash of the content of a file.
+
+    Parameters:
+    path (str): The path to the file
+
+    Returns:
+    str: The hexadecimal hash of the file content
+    """
+    sha = hashlib.sha256()
+    with open(path, "rb") as file:
+        # Read the file in blocks so large PDFs are not loaded into memory at once
+        for block in iter(lambda: file.read(1024 * 1024), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def cache_key(path: str, settings: Dict[str, Any]) -> str:
+    """
+    This function creates the cache key of a PDF file from its content hash and the extraction settings.
+    A changed file or changed settings result in a new key, so stale tables are never returned.
+
+    Parameters:
+    path (str): The path to the PDF file
+    settings (Dict[str, Any]): The settings used for the extraction, e.g. the tabula options
+
+    Returns:
+    str: The cache key
+    """
+    settings_json = json.dumps(settings, sort_keys=True, default=str)
+    settings_hash = hashlib.sha256(settings_json.encode("utf-8")).hexdigest()[:16]
+    return f"{file_hash(path)}-{settings_hash}"
+
+
+def load_tables(key: str, cache_dir: str = CACHE_DIR) -> Optional[List[pd.DataFrame]]:
+    """
+    This function loads the tables of a cache entry.
+
+    Parameters:
+    key (str): The cache key
+    cache_dir (str): The directory of the cache
+
+    Returns:
+    Optional[List[pd.DataFrame]]: The cached tables or None if the key is not in the cache
+    """
+    path = os.path.join(cache_dir, key + ".pkl")
+    try:
+        with open(path, "rb") as file:
+            tables = pickle.load(file)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+
+    # Update the modification time, it is used as last access time for the eviction
+    os.utime(path)
+    return tables
+
+
+def store_tables(
+    key: str, tables: List[pd.DataFrame], cache_dir: str = CACHE_DIR, max_bytes: int = MAX_CACHE_BYTES
+) -> None:
+    """
+    This function stores the tables of a PDF file in the cache and evicts old entries if the cache is too large.
+
+    Parameters:
+    key (str): The cache key
+    tables (List[pd.DataFrame]): The raw tables of the PDF file
+    cache_dir (str): The directory of the cache
+    max_bytes (int): The maximum total size of the cache in bytes
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, key + ".pkl")
+
+    # Write into a temporary file first, so an interrupted run never leaves a broken entry
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as file:
+        pickle.dump(tables, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+    evict(max_bytes, cache_dir)
+
+
+def evict(max_bytes: int = MAX_CACHE_BYTES, cache_dir: str = CACHE_DIR) -> List[str]:
+    """
+    This function removes the least recently used cache entries until the cache is not larger than max_bytes.
+
+    Parameters:
+    max_bytes (int): The maximum total size of the cache in bytes
+    cache_dir (str): The directory of the cache
+
+    Returns:
+    List[str]: The keys of the removed entries
+    """
+    if not os.path.isdir(cache_dir):
+        return []
+
+    # Collect all entries with their last access time and size
+    entries = []
+    for filename in os.listdir(cache_dir):
+        if filename.endswith(".pkl"):
+            try:
+                stat = os.stat(os.path.join(cache_dir, filename))
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, filename))
+
+    total_size = sum(size for _, size, _ in entries)
+    removed = []
+
+    # Remove the oldest entries first
+    for _, size, filename in sorted(entries):
+        if total_size <= max_bytes:
+            break
+        try:
+            os.remove(os.path.join(cache_dir, filename))
+        except FileNotFoundError:
+            # The entry was already removed by another process
+            pass
+        total_size -= size
+        removed.append(filename[: -len(".pkl")])
+
+    return removed
+
+
+def clear_cache(cache_dir: str = CACHE_DIR) -> int:
+    """
+    This function removes all entries from the cache.
+
+    Parameters:
+    cache_dir (str): The directory of the cache
+
+    Returns:
+    int: The number of removed entries
+    """
+    if not os.path.isdir(cache_dir):
+        return 0
+
+    removed = 0
+    for filename in os.listdir(cache_dir):
+        if filename.endswith(".pkl") or filename.endswith(".tmp"):
+            os.remove(os.path.join(cache_dir, filename))
+            removed += filename.endswith(".pkl")
+    return removed
@@ -0,0 +1,127 @@
+import importlib.metadata
+import time
+from typing import List, Tuple
+
+import pandas as pd
+
+import corrections
+import table_cache
+from schema import RESULTS_SCHEMA
+
+# Regular expression for one row of a Zieleinlaufliste in the text layer of the PDF, e.g.
+# '1. 1.M30 454 Schedler, Martin 198 m Senioren M30 LAZ Saarbrücken 34:08,7 3:24,8' (2012, with pace) or
+# '7. 1.MJ U23 221 Trenz, Justin 2002 Männern männliche Jugend U23 42:57 3' (2023, with laps).
+# The club is skipped, the time is the last time before the optional pace or number of laps
+ROW_PATTERN: str = (
+    r"^(?P<platz>\d+\.)\s+"
+    r"(?P<ak>\d+\.[A-Z]+\d*(?: U\d+)?)\s+"
+    r"(?P<startnummer>\d+)\s+"
+    r"(?P<name>[^,]+),\s*"
+    r"(?P<vornamen>(?:\S+\s+)*?)"
+    r"(?P<jahrgang>\d{3,4})\s+"
+    r"(?P<geschlecht>m|w|Männern|Frauen)\s"
+    r".*?(?P<zeit>\d{1,2}:\d{2}(?::\d{2})?(?:,\d)?)"
+    r"(?:\s+(?:\d{1,2}:\d{2}(?:,\d)?|\d+))?\s*$"
+)
+
+# A line that starts with a place and contains a time looks like a row of the result list. If ROW_PATTERN does not
+# match it, e.g. after a change of the layout, the finisher would be lost, so these lines are reported
+LIKELY_ROW_PATTERN: str = r"^\s*\d+\.\s.*\d{1,2}:\d{2}"
+
+# The gender is written as 'm'/'w' (2012) or 'Männern'/'Frauen' (2023)
+GENDERS = {"m": "m", "w": "w", "Männern": "m", "Frauen": "w"}
+
+
+def read_pdf_lines(pdf_path: str, use_cache: bool = True) -> List[List[str]]:
+    """
+    This function reads the lines of the text layer of each page of a PDF file with pypdfium2,
+    the Python binding of the PDF library of Chromium.
+    The lines are cached by the content hash of the file, like the tables of tabula.
+
+    Parameters:
+    pdf_path (str): The path to the PDF file
+    use_cache (bool): Whether the lines are loaded from and stored in the cache
+
+    Returns:
+    List[List[str]]: The lines of each page
+    """
+    import pypdfium2
+
+    key = table_cache.cache_key(pdf_path, {"engine": "text", "pypdfium2": importlib.metadata.version("pypdfium2")})
+    if use_cache:
+        pages = table_cache.load_tables(key)
+        if pages is not None:
+            return pages
+
+    document = pypdfium2.PdfDocument(pdf_path)
+    try:
+        pages = [document[i].get_textpage().get_text_range().splitlines() for i in range(len(document))]
+    finally:
+        document.close()
+
+    if use_cache:
+        table_cache.store_tables(key, pages)
+    return pages
+
+
+def parse_page(lines: List[str], year: str) -> pd.DataFrame:
+    """
+    This function parses the rows of one page into the columns of the combined dataframe.
+    The name corrections are applied to the lines first, so the same rules work for both engines.
+    Lines that are not a row of the result list, e.g. the headers and footers, are skipped. Lines that look like
+    a row but do not match ROW_PATTERN are kept in the attribute 'unparsed_lines' of the page for the quality report.
+
+    Parameters:
+    lines (List[str]): The lines of the text layer of the page
+    year (str): The year of competition
+
+    Returns:
+    pd.DataFrame: The rows of the page with the columns in schema.RESULTS_SCHEMA as strings
+    """
+    lines = corrections.default_corrector().apply(pd.Series(lines, dtype=object))
+
+    # Split all lines into their fields at once and keep only the lines that are rows
+    fields = lines.str.extract(ROW_PATTERN)
+    unparsed = lines[fields["platz"].isna() & lines.str.contains(LIKELY_ROW_PATTERN)]
+    fields = fields.dropna(subset=["platz"]).reset_index(drop=True)
+
+    # The first first name goes to Vorname1 and the other first names to Vorname2, like the tabula engine does
+    first_names = fields["vornamen"].str.strip().str.split(" ", n=1, expand=True).reindex(columns=[0, 1])
+
+    page = pd.DataFrame(
+        {
+            "Gesamt Platz": fields["platz"],
+            "Platz AK": fields["ak"].str.replace(" U", "_U"),
+            "Startnummer": fields["startnummer"],
+            "Name": fields["name"].str.strip(),
+            "Vorname1": first_names[0].fillna("nan"),
+            "Vorname2": first_names[1].fillna("nan"),
+            "Jahrgang": fields["jahrgang"],
+            "Geschlecht": fields["geschlecht"].map(GENDERS),
+            "Zeit": fields["zeit"],
+            "Jahr": year,
+        },
+        columns=list(RESULTS_SCHEMA),
+    )
+    page.attrs["unparsed_lines"] = unparsed.tolist()
+    return page
+
+
+def extract_pdf(pdf_path: str, year: str, use_cache: bool = True) -> Tuple[List[pd.DataFrame], float]:
+    """
+    This function reads one PDF file with the text engine and parses each page.
+    It needs neither Java nor tabula, and the pages need no further cleaning.
+
+    Parameters:
+    pdf_path (str): The path to the PDF file
+    year (str): The year of competition, the numeric prefix of the filename
+    use_cache (bool): Whether the lines are loaded from and stored in the cache
+
+    Returns:
+    Tuple[List[pd.DataFrame], float]: The processed dataframe of each page and the extraction time in seconds
+    """
+    start = time.perf_counter()
+    pages = read_pdf_lines(pdf_path, use_cache)
+    seconds = time.perf_counter() - start
+
+    return [parse_page(lines, year) for lines in pages], seconds
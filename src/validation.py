@@ -0,0 +1,232 @@
+import os
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from helpers import TIME_FORMAT_PATTERN
+
+# The smallest and the largest plausible age of a runner in the year of competition
+PLAUSIBLE_AGES: Tuple[int, int] = (5, 100)
+
+# The checks of validate_rows with a description for the reports
+CHECKS: Dict[str, str] = {
+    "place_integer": "'Gesamt Platz' is not an integer",
+    "bib_integer": "'Startnummer' is not an integer",
+    "birth_year_integer": "'Jahrgang' is not an integer",
+    "time_format": "'Zeit' is not a time 'H:MM:SS' or 'MM:SS', see check_time_format",
+    "birth_year_plausible": f"the age is not between {PLAUSIBLE_AGES[0]} and {PLAUSIBLE_AGES[1]} years",
+    "bib_unique": "the 'Startnummer' appears more than once in the year",
+    "place_monotonic": "'Gesamt Platz' is smaller than a place before it in the year",
+}
+
+# The name of the failed check of a line of a PDF file that looks like a row but could not be parsed
+UNPARSED_LINE: str = "unparsed_line"
+
+
+def integers(values: pd.Series) -> pd.Series:
+    """
+    This function converts the cells of a column into integers without raising for invalid cells.
+
+    Parameters:
+    values (pd.Series): The cells
+
+    Returns:
+    pd.Series: The integers as float, NaN for cells that are not an integer
+    """
+    text = values.astype(str).str.strip()
+    return pd.to_numeric(text.where(text.str.fullmatch(r"\d+")), errors="coerce")
+
+
+def validate_rows(
+    df: pd.DataFrame, bibs_before: Optional[Dict[str, Set[int]]] = None, places_before: Optional[Dict[str, int]] = None
+) -> pd.DataFrame:
+    """
+    This function runs all checks of CHECKS on all rows of a combined dataframe at once.
+    The dataframe has the columns of main.COLUMN_NAMES as strings, before the data types are converted.
+    If the rows are checked page by page, the bib numbers and the largest place of each year on the pages before
+    are passed, so the bib numbers and the places are compared with the whole year and not only within the page.
+
+    Parameters:
+    df (pd.DataFrame): The combined dataframe before main.convert_column_types converts the data types
+    bibs_before (Optional[Dict[str, Set[int]]]): The bib numbers of each year on the pages before
+    places_before (Optional[Dict[str, int]]): The largest place of each year on the pages before
+
+    Returns:
+    pd.DataFrame: One boolean column per check, True where a row failed the check
+    """
+    # The period of the overall place is removed like in main.convert_column_types
+    place = integers(df["Gesamt Platz"].astype(str).str.replace(".", "", regex=False))
+    bib = integers(df["Startnummer"])
+    birth_year = integers(df["Jahrgang"])
+    year = integers(df["Jahr"])
+
+    # The time must have the format of check_time_format, a fraction of a second like ',7' is allowed
+    time = df["Zeit"].astype(str).str.strip().str.replace(r"[,.]\d{1,3}$", "", regex=True)
+    age = year - birth_year
+
+    # A bib number or a place is compared within the year, in the order of the rows
+    years = df["Jahr"].astype(str).to_numpy()
+    largest_place = place.groupby(years).cummax().groupby(years).shift()
+    bibs = pd.DataFrame({"Jahr": years, "Startnummer": bib.to_numpy()}, index=df.index)
+    duplicated = bibs.duplicated(keep=False)
+
+    # and with the rows of the year on the pages before
+    if places_before:
+        largest_before = pd.Series(years, index=df.index).map(places_before)
+        largest_place = pd.concat([largest_place, largest_before], axis=1).max(axis=1)
+    if bibs_before:
+        seen = [value in bibs_before.get(row_year, ()) for row_year, value in zip(years, bib.to_numpy())]
+        duplicated |= np.array(seen, dtype=bool)
+
+    failed = pd.DataFrame(
+        {
+            "place_integer": place.isna(),
+            "bib_integer": bib.isna(),
+            "birth_year_integer": birth_year.isna(),
+            "time_format": ~time.str.match(TIME_FORMAT_PATTERN),
+            "birth_year_plausible": birth_year.notna() & ~age.between(*PLAUSIBLE_AGES),
+            "bib_unique": bib.notna() & duplicated,
+            "place_monotonic": place < largest_place,
+        },
+        index=df.index,
+    )
+    return failed
+
+
+class QualityReport:
+    """
+    This class collects the rows that failed the validation in a quarantine table and counts the rows and failed
+    checks of every PDF file. The ingestion keeps the valid rows, so a bad cell does not abort the whole run.
+    It can check the combined dataframe at once or page by page, e.g. while streaming. It keeps the bib numbers
+    and the largest place of each year it checked, so a bib number on two pages of a year is found as well.
+    The lines of the text engine that look like a row but could not be parsed are counted and quarantined too.
+    """
+
+    def __init__(self) -> None:
+        """
+        This function creates an empty report.
+        """
+        self.records: List[Dict[str, Any]] = []
+        self.quarantined: List[pd.DataFrame] = []
+
+        # The bib numbers and the largest place of each year of the rows checked so far
+        self.bibs: Dict[str, Set[int]] = {}
+        self.places: Dict[str, int] = {}
+
+    def check(self, df: pd.DataFrame, sources: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """
+        This function validates the rows of a combined dataframe, moves the failed rows into the quarantine table
+        and returns the valid rows. If the rows are checked page by page, the bib numbers and the places
+        are compared with the rows of the year on the pages before. A row whose bib number appears again
+        on a later page is quarantined, the row of the earlier page has already passed.
+
+        Parameters:
+        df (pd.DataFrame): The combined dataframe before main.convert_column_types converts the data types
+        sources (Optional[np.ndarray]): The PDF file of each row, '' if None
+
+        Returns:
+        pd.DataFrame: The rows that passed all checks
+        """
+        sources = np.full(len(df), "", dtype=object) if sources is None else np.asarray(sources, dtype=object)
+        failed = validate_rows(df, self.bibs, self.places)
+        invalid = failed.any(axis=1).to_numpy()
+        self._remember(df)
+
+        # Count the rows and the failed checks of each PDF file
+        counts = failed.groupby(sources).sum()
+        rows = pd.Series(1, index=df.index).groupby(sources).sum()
+        quarantined = pd.Series(invalid, index=df.index).groupby(sources).sum()
+        for pdf in rows.index:
+            self.records.append(
+                {"pdf": pdf, "rows": int(rows[pdf]), "quarantined": int(quarantined[pdf]), **counts.loc[pdf].to_dict()}
+            )
+
+        if invalid.any():
+            # Keep the failed rows as they were extracted with the names of the failed checks
+            rejected = df[invalid].astype(str)
+            rejected.insert(0, "pdf", sources[invalid])
+            rejected["failed_checks"] = failed[invalid].apply(lambda row: ", ".join(row.index[row]), axis=1)
+            self.quarantined.append(rejected)
+        return df[~invalid]
+
+    def add_unparsed_lines(self, pdf: str, lines: List[str]) -> None:
+        """
+        This function counts the lines of a PDF file that look like a row but could not be parsed into a row,
+        e.g. by text_engine.parse_page, and adds them to the quarantine table in the column 'line'.
+
+        Parameters:
+        pdf (str): The PDF file
+        lines (List[str]): The lines that could not be parsed
+        """
+        if not lines:
+            return
+        self.records.append({"pdf": pdf, "rows": 0, "quarantined": 0, UNPARSED_LINE: len(lines)})
+        self.quarantined.append(pd.DataFrame({"pdf": pdf, "line": lines, "failed_checks": UNPARSED_LINE}))
+
+    def _remember(self, df: pd.DataFrame) -> None:
+        """
+        This function adds the bib numbers and the places of checked rows to the state of each year.
+
+        Parameters:
+        df (pd.DataFrame): The checked rows
+        """
+        years = df["Jahr"].astype(str)
+        place = integers(df["Gesamt Platz"].astype(str).str.replace(".", "", regex=False))
+        bib = integers(df["Startnummer"])
+        for year, bibs in bib.groupby(years.to_numpy()):
+            self.bibs.setdefault(year, set()).update(int(value) for value in bibs.dropna())
+        for year, largest in place.groupby(years.to_numpy()).max().dropna().items():
+            self.places[year] = max(self.places.get(year, 0), int(largest))
+
+    def merge(self, other: "QualityReport") -> None:
+        """
+        This function adds the counts and the quarantined rows of another report, e.g. of a worker process.
+
+        Parameters:
+        other (QualityReport): The other report
+        """
+        self.records.extend(other.records)
+        self.quarantined.extend(other.quarantined)
+        for year, bibs in other.bibs.items():
+            self.bibs.setdefault(year, set()).update(bibs)
+        for year, largest in other.places.items():
+            self.places[year] = max(self.places.get(year, 0), largest)
+
+    def summary(self) -> pd.DataFrame:
+        """
+        This function returns the quality report with one row per PDF file.
+
+        Returns:
+        pd.DataFrame: The number of rows, of quarantined rows and of the rows that failed each check per PDF file,
+            and the number of lines that could not be parsed into a row
+        """
+        columns = ["pdf", "rows", "quarantined", *CHECKS, UNPARSED_LINE]
+        if not self.records:
+            return pd.DataFrame(columns=columns)
+        report = pd.DataFrame(self.records, columns=columns).fillna(0)
+        report = report.groupby("pdf", as_index=False, sort=False).sum()
+        return report.astype({column: "int64" for column in columns[1:]})
+
+    def quarantine(self) -> pd.DataFrame:
+        """
+        This function returns the rows that failed the validation.
+
+        Returns:
+        pd.DataFrame: The rows as extracted, with the PDF file and the names of the failed checks
+        """
+        if not self.quarantined:
+            return pd.DataFrame(columns=["pdf", "failed_checks"])
+        return pd.concat(self.quarantined, ignore_index=True)
+
+    def write(self, report_file: str, quarantine_file: str) -> None:
+        """
+        This function writes the quality report and the quarantine table to CSV files.
+
+        Parameters:
+        report_file (str): The CSV file of the quality report
+        quarantine_file (str): The CSV file of the quarantined rows
+        """
+        for path, table in ((report_file, self.summary()), (quarantine_file, self.quarantine())):
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            table.to_csv(path, index=False)
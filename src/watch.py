@@ -0,0 +1,322 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+import main
+from schema import apply_schema
+from sinks import is_excel_file
+from validation import QualityReport
+
+# Seconds between two scans of the directory of the PDF files
+POLL_SECONDS: float = 1.0
+
+# A PDF file is only processed once its size and modification time did not change for this time,
+# so a file that is still being copied into the directory is not read half-written
+DEBOUNCE_SECONDS: float = 2.0
+
+# Size and modification time of a file, a changed signature means the file was written again
+Signature = Tuple[int, int]
+
+
+def process_year(
+    pdf_dir: str, filenames: List[str], year: str, use_cache: bool = True, engine: str = "tabula"
+) -> Tuple[pd.DataFrame, QualityReport]:
+    """
+    This function extracts and cleans the PDF files of one year and combines their rows.
+    It runs in a worker process of the watcher. The rows are validated like in 'cli.py ingest',
+    rows that fail the validation are left out and returned in the quality report.
+
+    Parameters:
+    pdf_dir (str): The directory containing the PDF files
+    filenames (List[str]): The PDF files of the year
+    year (str): The year of competition
+    use_cache (bool): Whether unchanged PDF files are loaded from the table cache
+    engine (str): The extraction engine, one of main.ENGINES
+
+    Returns:
+    Tuple[pd.DataFrame, QualityReport]: The valid rows of the year in the columns and data types of the combined
+        dataframe and the quality report of the year
+    """
+    filenames_prefix = {filename: year for filename in filenames}
+    dic_df = main.get_dataframes(None, use_cache, filenames_prefix, pdf_dir=pdf_dir, engine=engine)
+    quality = QualityReport()
+    return main.get_one_dataframe(dic_df, None, quality), quality
+
+
+def replace_year(output_file: str, year: str, df: Optional[pd.DataFrame]) -> None:
+    """
+    This function replaces the rows of one year in the saved combined dataframe, readers never see
+    a half-written file. In a Parquet dataset only the file of the year is written into a hidden temporary file
+    and renamed with os.replace. An Excel file is written completely into a temporary file and renamed.
+
+    Parameters:
+    output_file (str): The Excel file or the directory of the Parquet dataset
+    year (str): The year of competition
+    df (Optional[pd.DataFrame]): The new rows of the year, None to remove the year
+    """
+    if is_excel_file(output_file):
+        # Keep the other years, the rows stay sorted by year like after a full rebuild
+        frames = [] if df is None else [df]
+        if os.path.exists(output_file):
+            saved_df = main.load_results(output_file)
+            frames.insert(0, saved_df[saved_df["Jahr"].astype(str) != str(year)])
+        if not frames:
+            return
+        combined = apply_schema(pd.concat(frames, ignore_index=True))
+        combined = combined.sort_values("Jahr", kind="stable", ignore_index=True)
+
+        directory, name = os.path.split(os.path.abspath(output_file))
+        tmp_file = os.path.join(directory, f".{name}.{os.getpid()}.tmp.xlsx")
+        main.save_results(combined, tmp_file)
+        os.replace(tmp_file, output_file)
+        return
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    partition_dir = os.path.join(output_file, f"Jahr={year}")
+    part_file = os.path.join(partition_dir, "part-0.parquet")
+    if df is None or df.empty:
+        if os.path.exists(part_file):
+            os.remove(part_file)
+            os.rmdir(partition_dir)
+        return
+
+    # The year is stored in the directory name like in sinks.ParquetSink. Files starting with '.' are ignored
+    # by the readers of the dataset, so the temporary file is never read
+    os.makedirs(partition_dir, exist_ok=True)
+    tmp_file = os.path.join(partition_dir, f".part-0.{os.getpid()}.tmp")
+    table = pa.Table.from_pandas(df.drop(columns="Jahr"), preserve_index=False)
+    pq.write_table(table, tmp_file)
+    os.replace(tmp_file, part_file)
+
+
+def saved_years(output_file: str) -> Dict[str, float]:
+    """
+    This function returns the years in the saved combined dataframe with the time they were written.
+    For a Parquet dataset this is the modification time of the file of each year,
+    for an Excel file the modification time of the file.
+
+    Parameters:
+    output_file (str): The Excel file or the directory of the Parquet dataset
+
+    Returns:
+    Dict[str, float]: The modification time of each saved year
+    """
+    if not os.path.exists(output_file):
+        return {}
+    if is_excel_file(output_file):
+        written = os.stat(output_file).st_mtime
+        years = main.load_results(output_file, columns=["Jahr"])["Jahr"].astype(str).unique()
+        return {year: written for year in years}
+
+    years = {}
+    for entry in os.listdir(output_file):
+        part_file = os.path.join(output_file, entry, "part-0.parquet")
+        if entry.startswith("Jahr=") and os.path.exists(part_file):
+            years[entry[len("Jahr=") :]] = os.stat(part_file).st_mtime
+    return years
+
+
+class Watcher:
+    """
+    This class watches the directory of the PDF files and updates the saved combined dataframe
+    whenever a PDF file is added, written again or removed. Only the changed years are extracted and cleaned,
+    in a pool of worker processes, and only their rows are replaced in the output.
+    A year is processed once all its PDF files kept their size and modification time for the debounce time.
+    Rows that fail the validation are left out of the output and kept in the quality report of their year.
+    """
+
+    def __init__(
+        self,
+        pdf_dir: Optional[str] = None,
+        output_file: str = main.OUTPUT_FILE,
+        workers: int = 2,
+        engine: str = "tabula",
+        use_cache: bool = True,
+        debounce_seconds: float = DEBOUNCE_SECONDS,
+        report_file: Optional[str] = None,
+        quarantine_file: Optional[str] = None,
+    ) -> None:
+        """
+        This function creates the watcher. The years that were saved after the last change of their PDF files
+        are up to date and are not processed again.
+
+        Parameters:
+        pdf_dir (Optional[str]): The directory containing the PDF files, data/raw if None
+        output_file (str): The Excel file or the directory of the Parquet dataset that is updated
+        workers (int): The number of worker processes
+        engine (str): The extraction engine, one of main.ENGINES
+        use_cache (bool): Whether unchanged PDF files are loaded from the table cache
+        debounce_seconds (float): How long the PDF files of a year must stay unchanged before they are processed
+        report_file (Optional[str]): The CSV file of the quality report of all processed years, not written if None
+        quarantine_file (Optional[str]): The CSV file of the quarantined rows of all processed years
+        """
+        self.pdf_dir = pdf_dir or main.get_pdf_dir()
+        self.output_file = output_file
+        self.engine = engine
+        self.use_cache = use_cache
+        self.debounce_seconds = debounce_seconds
+        self.report_file = report_file
+        self.quarantine_file = quarantine_file
+        self.executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+        # The signatures of the files of each year with the time they were first seen, and the processed signatures
+        self.seen: Dict[str, Tuple[Dict[str, Signature], float]] = {}
+        self.done: Dict[str, Dict[str, Signature]] = {}
+
+        # The running jobs with their year, signatures and the time the files were first seen
+        self.pending: Dict[Future, Tuple[str, Dict[str, Signature], float]] = {}
+
+        # The quality report of the last processing of each year
+        self.reports: Dict[str, QualityReport] = {}
+
+        # The saved years are up to date if they were written after the last change of their files
+        files = self.scan()
+        for year, written in saved_years(output_file).items():
+            signatures = files.get(year, {})
+            if signatures and all(mtime / 1e9 <= written for _, mtime in signatures.values()):
+                self.done[year] = signatures
+
+    def scan(self) -> Dict[str, Dict[str, Signature]]:
+        """
+        This function returns the size and modification time of the PDF files in the directory, grouped by year.
+
+        Returns:
+        Dict[str, Dict[str, Signature]]: The signature of each PDF file of each year
+        """
+        files: Dict[str, Dict[str, Signature]] = {}
+        for filename, year in main.filenames_and_prefix_from_dir(self.pdf_dir).items():
+            try:
+                stat = os.stat(os.path.join(self.pdf_dir, filename))
+            except FileNotFoundError:
+                # The file was removed between listing the directory and reading its size
+                continue
+            files.setdefault(year, {})[filename] = (stat.st_size, stat.st_mtime_ns)
+        return files
+
+    def poll(self, now: Optional[float] = None) -> List[str]:
+        """
+        This function scans the directory once, starts the jobs of the changed years whose files are stable
+        and saves the results of the finished jobs.
+
+        Parameters:
+        now (Optional[float]): The current time.monotonic(), read if None
+
+        Returns:
+        List[str]: The years that were updated in the output
+        """
+        now = time.monotonic() if now is None else now
+        files = self.scan()
+        running = {year for year, _, _ in self.pending.values()}
+
+        for year in sorted(set(files) | set(self.done)):
+            signatures = files.get(year, {})
+            if self.done.get(year) == signatures or year in running:
+                continue
+
+            # Start the debounce time again whenever the files of the year change
+            previous = self.seen.get(year)
+            if previous is None or previous[0] != signatures:
+                self.seen[year] = (signatures, now)
+                continue
+            if now - previous[1] < self.debounce_seconds:
+                continue
+
+            if not signatures:
+                # All PDF files of the year were removed
+                replace_year(self.output_file, year, None)
+                self.done.pop(year, None)
+                if self.reports.pop(year, None) is not None:
+                    self.write_reports()
+                print(f"{year}: removed")
+                continue
+
+            future = self.executor.submit(
+                process_year, self.pdf_dir, sorted(signatures), year, self.use_cache, self.engine
+            )
+            self.pending[future] = (year, signatures, previous[1])
+
+        return self.collect()
+
+    def collect(self) -> List[str]:
+        """
+        This function saves the rows of the finished jobs into the output.
+        A failed job is reported and retried when its files change again.
+
+        Returns:
+        List[str]: The years that were updated in the output
+        """
+        updated = []
+        for future in [future for future in self.pending if future.done()]:
+            year, signatures, first_seen = self.pending.pop(future)
+            self.done[year] = signatures
+            try:
+                df, quality = future.result()
+            except Exception as error:
+                print(f"{year}: processing failed, {type(error).__name__}: {error}")
+                continue
+            replace_year(self.output_file, year, df)
+            updated.append(year)
+            self.reports[year] = quality
+            quarantined = int(quality.summary()["quarantined"].sum())
+            print(
+                f"{year}: {len(df)} rows saved {time.monotonic() - first_seen:.1f} s after the files changed"
+                + (f", {quarantined} rows failed the validation" if quarantined else "")
+            )
+        if updated:
+            self.write_reports()
+        return updated
+
+    def quality(self) -> QualityReport:
+        """
+        This function combines the quality reports of all processed years.
+
+        Returns:
+        QualityReport: The counts and the quarantined rows of all years
+        """
+        quality = QualityReport()
+        for year in sorted(self.reports):
+            quality.merge(self.reports[year])
+        return quality
+
+    def write_reports(self) -> None:
+        """
+        This function writes the quality report and the quarantined rows of all processed years, if their
+        files are given.
+        """
+        if self.report_file is not None and self.quarantine_file is not None:
+            self.quality().write(self.report_file, self.quarantine_file)
+
+    def run(self, poll_seconds: float = POLL_SECONDS, max_polls: Optional[int] = None) -> None:
+        """
+        This function polls the directory until it is interrupted with Ctrl+C.
+
+        Parameters:
+        poll_seconds (float): The seconds between two scans of the directory
+        max_polls (Optional[int]): Stop after this number of scans, run until interrupted if None
+        """
+        print(f"Watching {self.pdf_dir}, press Ctrl+C to stop.")
+        polls = 0
+        try:
+            while max_polls is None or polls < max_polls:
+                self.poll()
+                polls += 1
+                time.sleep(poll_seconds)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """
+        This function waits for the running jobs, saves their results and stops the worker processes.
+        """
+        for future in list(self.pending):
+            future.exception()
+        self.collect()
+        self.executor.shutdown()
@@ -0,0 +1,102 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+import binstore
+from binstore import BinaryStore, write_binary_store
+from schema import apply_schema
+
+
+def results(year, bibs, names=None):
+    """
+    This function creates rows of the combined dataframe of a year, the second row has no valid time.
+    """
+    names = names or [f"Name{bib}" for bib in bibs]
+    return apply_schema(
+        pd.DataFrame(
+            {
+                "Gesamt Platz": range(1, len(bibs) + 1),
+                "Platz AK": [f"{i}.M35" for i in range(1, len(bibs) + 1)],
+                "Startnummer": bibs,
+                "Name": names,
+                "Vorname1": "Christian",
+                "Vorname2": "nan",
+                "Jahrgang": 1987,
+                "Geschlecht": "m",
+                "Zeit": [pd.Timedelta(minutes=40 + i) if i != 1 else pd.NaT for i in range(len(bibs))],
+                "Jahr": year,
+            }
+        )
+    )
+
+
+def test_append_and_lookup(tmp_path):
+    store = BinaryStore(str(tmp_path / "results.bin"))
+    assert store.append(results(2023, [7, 3, 5])) == 3
+    assert store.append(results(2012, [3, 1], ["Müller", "Weiß"])) == 5
+
+    # The rows are visible in a store opened again
+    store = BinaryStore(str(tmp_path / "results.bin"))
+    assert len(store) == 5
+    assert store.lookup(2023, 3)["Name"] == "Name3"
+    assert store.lookup(2012, 1)["Name"] == "Weiß"
+    assert store.lookup(2012, 7) is None
+    assert store.year(2023)["Startnummer"].tolist() == [7, 3, 5]
+    assert len(store.jahrgang(1987)) == 5 and store.jahrgang(1990).empty
+
+
+def test_the_rows_and_missing_times_round_trip(tmp_path):
+    df = pd.concat([results(2012, [1, 2, 3]), results(2023, [1, 2])], ignore_index=True)
+    store = write_binary_store(apply_schema(df), str(tmp_path / "results.bin"))
+
+    pd.testing.assert_frame_equal(store.to_frame(), apply_schema(df))
+    assert store.to_frame()["Zeit"].isna().tolist() == [False, True, False, False, True]
+    assert store.lookup(2023, 2)["Zeit"] is pd.NaT
+
+
+def test_duplicate_bib_numbers_are_rejected(tmp_path):
+    store = BinaryStore(str(tmp_path / "results.bin"))
+    store.append(results(2023, [1, 2]))
+    with pytest.raises(ValueError, match="bib number 2 of 2023"):
+        store.append(results(2023, [3, 2]))
+    with pytest.raises(ValueError, match="bib number 4 of 2023"):
+        store.append(results(2023, [4, 4]))
+
+    # The rejected rows were not written
+    assert len(BinaryStore(store.path)) == 2
+
+
+def test_an_interrupted_append_keeps_the_committed_rows(tmp_path, monkeypatch):
+    path = str(tmp_path / "results.bin")
+    BinaryStore(path).append(results(2023, [1, 2]))
+
+    # Fail after the records, the strings and the new index were written, before the header is replaced
+    def interrupt(self, rows, strings=0):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(BinaryStore, "_write_header", interrupt)
+    with pytest.raises(KeyboardInterrupt):
+        BinaryStore(path).append(results(2023, [3, 4], ["Neu", "Neuer"]))
+    monkeypatch.undo()
+
+    store = BinaryStore(path)
+    assert len(store) == 2 and store.lookup(2023, 3) is None
+    with open(os.path.join(path, "header.json"), encoding="utf-8") as file:
+        assert json.load(file)["index"] == binstore.index_file_name(2)
+
+    # The next append overwrites the uncommitted data and removes the index of the interrupted append
+    store.append(results(2023, [5], ["Neuer"]))
+    store = BinaryStore(path)
+    assert store.year(2023)["Name"].tolist() == ["Name1", "Name2", "Neuer"]
+    assert [name for name in os.listdir(path) if name.startswith("index.")] == [binstore.index_file_name(3)]
+
+
+def test_write_binary_store_replaces_the_previous_store(tmp_path):
+    path = str(tmp_path / "results.bin")
+    write_binary_store(results(2023, [1, 2, 3]), path)
+    store = write_binary_store(results(2012, [9]), path)
+
+    assert len(store) == 1 and store.lookup(2012, 9) is not None
+    assert sorted(os.listdir(tmp_path)) == ["results.bin"]
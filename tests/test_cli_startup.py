@@ -0,0 +1,52 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from benchmark import STARTUP_BUDGETS, STARTUP_FORBIDDEN_MODULES, startup_arguments, write_startup_results
+
+# The directory of cli.py, the commands are started there like in benchmark.benchmark_startup
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+
+@pytest.fixture(scope="module")
+def results_file(tmp_path_factory):
+    """
+    This fixture saves the small synthetic results the query commands read.
+    """
+    path = str(tmp_path_factory.mktemp("startup") / "results.parquet")
+    write_startup_results(path)
+    return path
+
+
+def start_time(arguments, repeat: int = 3) -> float:
+    """
+    This function starts cli.py with the arguments in new processes and returns the shortest time in seconds.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "cli.py", *arguments], cwd=SRC_DIR, stdout=subprocess.DEVNULL, check=True)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+@pytest.mark.parametrize("command", list(STARTUP_BUDGETS))
+def test_light_commands_start_within_budget(command, results_file):
+    assert start_time(startup_arguments(command, results_file)) <= STARTUP_BUDGETS[command]
+
+
+@pytest.mark.parametrize("command", list(STARTUP_BUDGETS))
+def test_light_commands_do_not_import_heavy_modules(command, results_file):
+    # -X importtime lists every imported module as 'import time: self | cumulative | name' on stderr
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "cli.py", *startup_arguments(command, results_file)],
+        cwd=SRC_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = {line.rsplit("|", 1)[-1].strip().split(".")[0] for line in result.stderr.splitlines() if "|" in line}
+    assert modules.isdisjoint(STARTUP_FORBIDDEN_MODULES[command])
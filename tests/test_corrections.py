@@ -0,0 +1,53 @@
+import contextlib
+import io
+
+import pandas as pd
+
+import corrections
+import main
+import synthetic
+from profiling import StageProfiler
+
+
+def correction_counts(workers: int) -> dict:
+    """
+    This function processes the result lists of data/raw with the text engine and returns how often
+    each name correction was applied, as the correction report of this process counts them.
+    """
+    corrector = corrections.default_corrector()
+    corrector.counts.clear()
+    with contextlib.redirect_stdout(io.StringIO()):
+        main.main(use_cache=False, output_file=None, workers=workers, engine="text")
+    return dict(corrector.counts)
+
+
+def test_the_counts_of_worker_processes_are_reported():
+    counts = correction_counts(1)
+    assert sum(counts.values()) > 0
+    assert correction_counts(2) == counts
+
+
+def test_the_memory_pass_of_the_profiler_does_not_count_the_corrections_twice():
+    # A raw table of tabula whose runners are all named 'Weiker', which is corrected to 'Weiler'
+    results = synthetic.generate_results(20, 2023, "2023", seed=1)
+    results["Name"] = "Weiker"
+    table = synthetic.to_raw_tables(results, "2023")[0]
+    table.insert(len(table.columns), "Jahr", "2023")
+
+    corrector = corrections.default_corrector()
+    counts = []
+    for profiler in [None, StageProfiler(), StageProfiler(trace_memory=True)]:
+        corrector.counts.clear()
+        main.clean_table(table.copy(), 0, profiler, "2023.pdf")
+        counts.append(dict(corrector.counts))
+    assert sum(counts[0].values()) == 20
+    assert counts[1] == counts[0]
+    assert counts[2] == counts[0]
+
+
+def test_run_counted_returns_only_the_new_replacements():
+    corrector = corrections.default_corrector()
+    series = pd.Series([pattern for pattern, _ in corrector.rules[:1]], dtype=object)
+    corrector.apply(series)
+    _, counts = corrections.run_counted(corrector.apply, series)
+    assert counts == {0: 1}
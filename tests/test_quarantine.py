@@ -0,0 +1,93 @@
+import os
+
+import pandas as pd
+
+import main
+import watch
+from validation import QualityReport
+
+# A result list of data/raw that the text engine extracts without Java
+PDF_FILE = "2023_HACO_ErgebnislistenZieleinlaufliste.pdf"
+
+
+def test_process_year_quarantines_a_bad_cell(monkeypatch):
+    dic_df = main.get_dataframes(None, False, {PDF_FILE: "2023"}, pdf_dir=main.get_pdf_dir(), engine="text")
+    rows = sum(len(df) for df in dic_df.values())
+
+    # A birth year that is not a number failed the whole year before the rows were validated
+    page = next(iter(dic_df.values()))
+    bad_bib = page["Startnummer"].iloc[0]
+    page.iloc[0, page.columns.get_loc("Jahrgang")] = "19x0"
+    monkeypatch.setattr(main, "get_dataframes", lambda *args, **kwargs: dic_df)
+
+    df, quality = watch.process_year(main.get_pdf_dir(), [PDF_FILE], "2023", False, "text")
+    assert len(df) == rows - 1
+    assert str(bad_bib) not in df["Startnummer"].astype(str).tolist()
+
+    quarantine = quality.quarantine()
+    assert quarantine["Startnummer"].tolist() == [str(bad_bib)]
+    assert quarantine["failed_checks"].tolist() == ["birth_year_integer"]
+    assert quarantine["pdf"].tolist() == [PDF_FILE]
+
+
+def test_watcher_writes_the_reports_of_all_years(tmp_path):
+    watcher = watch.Watcher(
+        pdf_dir=str(tmp_path),
+        output_file=str(tmp_path / "results.parquet"),
+        workers=1,
+        report_file=str(tmp_path / "quality_report.csv"),
+        quarantine_file=str(tmp_path / "quarantine.csv"),
+    )
+    try:
+        for year in ("2012", "2023"):
+            filenames_prefix = {f"{year}_HACO_ErgebnislistenZieleinlaufliste.pdf": year}
+            dic_df = main.get_dataframes(None, False, filenames_prefix, pdf_dir=main.get_pdf_dir(), engine="text")
+            watcher.reports[year] = QualityReport()
+            main.get_one_dataframe(dic_df, None, watcher.reports[year])
+        watcher.write_reports()
+    finally:
+        watcher.executor.shutdown()
+
+    report = pd.read_csv(tmp_path / "quality_report.csv")
+    assert len(report) == 2 and report["quarantined"].sum() == 0
+    assert os.path.exists(tmp_path / "quarantine.csv")
+
+
+def page(places, bibs, year="2023"):
+    """
+    This function creates a page of the combined dataframe before the data types are converted.
+    """
+    return pd.DataFrame(
+        {
+            "Gesamt Platz": [f"{place}." for place in places],
+            "Startnummer": [str(bib) for bib in bibs],
+            "Jahrgang": "1980",
+            "Zeit": "41:21",
+            "Jahr": year,
+        }
+    )
+
+
+def test_bib_numbers_and_places_are_checked_across_the_pages_of_a_year():
+    quality = QualityReport()
+    assert len(quality.check(page([1, 2], [10, 11]))) == 2
+    # The same bib number in another year is no duplicate
+    assert len(quality.check(page([1], [10], "2012"))) == 1
+
+    valid = quality.check(page([3, 1, 4], [12, 13, 10]))
+    assert valid["Startnummer"].tolist() == ["12"]
+    assert quality.quarantine()["failed_checks"].tolist() == ["place_monotonic", "bib_unique"]
+
+
+def test_checking_page_by_page_quarantines_the_repeated_rows_of_a_year():
+    df = pd.concat([page([1, 2], [10, 11]), page([3, 4], [12, 11])], ignore_index=True)
+    batch = QualityReport()
+    batch.check(df)
+    stream = QualityReport()
+    for part in (df.iloc[:2], df.iloc[2:]):
+        stream.check(part)
+
+    # The earlier row has already passed when the bib number appears again on a later page
+    assert batch.quarantine()["Startnummer"].tolist() == ["11", "11"]
+    assert stream.quarantine()["Startnummer"].tolist() == ["11"]
+    assert stream.summary()["bib_unique"].sum() == 1
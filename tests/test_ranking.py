@@ -0,0 +1,37 @@
+import math
+
+import pandas as pd
+
+from ranking import RankingIndex
+
+
+def results() -> pd.DataFrame:
+    """
+    This function creates the combined rows of one year, the runner with the bib number 4 did not finish.
+    """
+    return pd.DataFrame(
+        {
+            "Startnummer": [1, 2, 3, 4],
+            "Name": ["A", "B", "C", "D"],
+            "Jahrgang": [1980, 1981, 1990, 1985],
+            "Geschlecht": ["m", "m", "w", "m"],
+            "Zeit": pd.to_timedelta(["00:40:00", "00:45:00", "00:50:00", None]),
+            "Jahr": [2023, 2023, 2023, 2023],
+        }
+    )
+
+
+def test_a_runner_without_time_has_no_rank_and_no_percentile():
+    index = RankingIndex(results())
+    placements = index.placements(2023, 4)
+    assert placements["Rang"].isna().all()
+    assert placements["Perzentil"].isna().all()
+    assert index.rank(pd.NaT, 2023) is None
+    assert math.isnan(index.percentile(pd.NaT, 2023))
+
+
+def test_the_finishers_keep_their_rank():
+    index = RankingIndex(results())
+    placements = index.placements(2023, 2)
+    assert placements["Rang"].tolist() == [2, 2, 2]
+    assert placements["Teilnehmer"].tolist() == [3, 2, 2]
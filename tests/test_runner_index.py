@@ -0,0 +1,81 @@
+import pandas as pd
+import pytest
+
+import cli
+import runner_index
+import sinks
+from runner_index import RunnerIndex, update_runner_index
+from schema import RESULTS_SCHEMA
+
+
+def rows(*runners):
+    """
+    This function creates rows of the combined dataframe from tuples (Name, Vorname1, Jahrgang, Geschlecht, Jahr).
+    """
+    return pd.DataFrame(
+        [(name, first_name, "nan", jahrgang, gender, year) for name, first_name, jahrgang, gender, year in runners],
+        columns=runner_index.PERSON_COLUMNS + ["Jahr"],
+    )
+
+
+def test_a_runner_keeps_the_id_across_years():
+    df = rows(("Ludwig", "Christian", 1987, "m", 2012), ("Ludwig", "Christian", 1987, "m", 2023))
+    ids = RunnerIndex().assign(df)
+    assert ids[0] == ids[1]
+
+
+def test_a_typo_in_the_surname_is_the_same_runner():
+    df = rows(("Weiler", "Martin", 1970, "m", 2012), ("Weiker", "Martin", 1970, "m", 2023))
+    ids = RunnerIndex().assign(df)
+    assert ids[0] == ids[1]
+
+
+def test_runners_with_other_details_are_different_runners():
+    df = rows(
+        ("Ludwig", "Christian", 1987, "m", 2012),
+        ("Ludwig", "Christian", 1960, "m", 2023),
+        ("Ludwig", "Christiane", 1987, "w", 2023),
+        ("Ludwig", "Stefan", 1987, "m", 2023),
+    )
+    assert RunnerIndex().assign(df).nunique() == 4
+
+
+def test_two_runners_with_the_same_spelling_keep_their_ids():
+    twins = ("Müller", "Thomas", 1980, "m")
+    df = rows((*twins, 2012), (*twins, 2012), (*twins, 2023), (*twins, 2023), ("Müller", "Thomas", 1980, "m", 2024))
+    index = RunnerIndex()
+    ids = index.assign(df)
+    assert ids[0] != ids[1]
+    assert sorted(ids[2:4]) == sorted(ids[:2])
+    assert ids[4] in set(ids[:2])
+
+    # The lookup of the saved index tells the runners apart by their year like assign
+    assert index.lookup(df).tolist() == ids.tolist()
+    assert len(index.to_frame()) == 2
+
+
+def test_update_adds_only_the_new_years(tmp_path):
+    path = str(tmp_path / "runner_index.csv")
+    first = rows(("Ludwig", "Christian", 1987, "m", 2012), ("Weiß", "Julia", 1990, "w", 2012))
+    index = update_runner_index(first, path)
+    ids_2012 = index.lookup(first).tolist()
+
+    df = pd.concat(
+        [first, rows(("Ludwig", "Christian", 1987, "m", 2023), ("Weiss", "Julia", 1990, "w", 2023))],
+        ignore_index=True,
+    )
+    index = update_runner_index(df, path)
+    assert index.indexed_years == {"2012", "2023"}
+    assert index.lookup(df).tolist() == ids_2012 * 2
+
+    # A second update without new years does not change the index
+    entries = pd.read_csv(path)
+    update_runner_index(df, path)
+    pd.testing.assert_frame_equal(pd.read_csv(path), entries)
+
+
+def test_improvements_without_a_runner_index_fail(tmp_path, monkeypatch):
+    monkeypatch.setattr(runner_index, "RUNNER_INDEX_FILE", str(tmp_path / "runner_index.csv"))
+    monkeypatch.setattr(sinks, "load_results", lambda *args, **kwargs: pd.DataFrame(columns=list(RESULTS_SCHEMA)))
+    with pytest.raises(SystemExit, match="No runner index"):
+        cli.main(["query", "improvements"])
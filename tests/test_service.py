@@ -0,0 +1,115 @@
+import asyncio
+import json
+import os
+import shutil
+
+import pytest
+
+import main
+import service
+
+# A result list of data/raw that the text engine extracts without Java
+PDF_FILE = "2023_HACO_ErgebnislistenZieleinlaufliste.pdf"
+
+
+@pytest.fixture
+def pdf_dir(tmp_path):
+    """
+    This fixture copies a result list of data/raw into a temporary directory and returns the directory.
+    """
+    shutil.copy(os.path.join(main.get_pdf_dir(), PDF_FILE), tmp_path / PDF_FILE)
+    return str(tmp_path)
+
+
+def test_submit_poll_and_results(pdf_dir):
+    async def run():
+        ingest = service.IngestService(workers=1, concurrent_jobs=1, engine="text", use_cache=False)
+        await ingest.start(port=0)
+        try:
+            client = service.ServiceClient(port=ingest.port)
+            status, job = await client.submit(pdf_dir=pdf_dir)
+            assert status == 202 and job["state"] == "queued"
+
+            job = await client.wait(job["id"], poll_seconds=0.05)
+            assert job["state"] == "done", job["error"]
+            assert job["quarantined"] == 0 and (await client.quarantine(job["id"])).empty
+            return job, await client.results(job["id"]), ingest.results[job["id"]]
+        finally:
+            await ingest.stop()
+
+    job, records, df = asyncio.run(run())
+    assert job["rows"] == len(df) == len(records) > 0
+    assert list(records.columns) == list(df.columns)
+    assert records["Startnummer"].tolist() == df["Startnummer"].tolist()
+    assert set(df["Jahr"].astype(int)) == {2023}
+
+
+@pytest.mark.parametrize("content_length", ["abc", "-1"])
+def test_invalid_content_length_is_a_bad_request(content_length):
+    async def run():
+        ingest = service.IngestService(workers=1, concurrent_jobs=1)
+        await ingest.start(port=0)
+        try:
+            reader, writer = await asyncio.open_connection(service.HOST, ingest.port)
+            writer.write(f"POST /jobs HTTP/1.0\r\nContent-Length: {content_length}\r\n\r\n".encode("latin-1"))
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+            return response
+        finally:
+            await ingest.stop()
+
+    assert asyncio.run(run()).startswith(b"HTTP/1.0 400 Bad Request")
+
+
+def test_only_the_last_finished_jobs_are_kept():
+    ingest = service.IngestService(max_finished_jobs=2)
+    for _ in range(4):
+        job = ingest._new_job({}, "", None)
+        ingest.results[job["id"]] = job
+        ingest._finish(job["id"])
+    assert list(ingest.jobs) == list(ingest.results) == [3, 4]
+
+
+@pytest.mark.parametrize(
+    "arguments",
+    [
+        {"pdf_dir": "/nonexistent"},
+        {"pdf_dir": 5},
+        {"files": 5},
+        {"files": [5]},
+        {"files": ["1999_missing.pdf"]},
+        {"output_file": 5},
+        {"output_file": "/tmp/results.xlsx"},
+        {"output_file": "../results.xlsx"},
+        {"output_file": "."},
+    ],
+)
+def test_invalid_job_arguments_are_a_bad_request(pdf_dir, tmp_path, arguments):
+    ingest = service.IngestService(output_dir=str(tmp_path / "output"))
+    body = json.dumps({"pdf_dir": pdf_dir, **arguments}).encode("utf-8")
+    status, payload = ingest._route("POST", "/jobs", body, "application/json")
+    assert status == 400, payload
+    assert not ingest.jobs
+
+
+@pytest.mark.parametrize("body", [b"[1, 2]", b"not json", b'"text"'])
+def test_a_body_that_is_not_a_json_object_is_a_bad_request(body):
+    status, _ = service.IngestService()._route("POST", "/jobs", body, "application/json")
+    assert status == 400
+
+
+@pytest.mark.parametrize("content_type", ["", "text/plain", "application/x-www-form-urlencoded"])
+def test_jobs_are_only_accepted_with_a_json_content_type(content_type):
+    ingest = service.IngestService()
+    status, _ = ingest._route("POST", "/jobs", b"{}", content_type)
+    assert status == 415
+    assert not ingest.jobs
+
+
+def test_the_output_is_saved_in_the_output_directory(pdf_dir, tmp_path):
+    ingest = service.IngestService(output_dir=str(tmp_path / "output"))
+    body = json.dumps({"pdf_dir": pdf_dir, "output_file": "year/results.xlsx"}).encode("utf-8")
+    status, job = ingest._route("POST", "/jobs", body, "application/json; charset=utf-8")
+    assert status == 202
+    assert job["output_file"] == os.path.realpath(tmp_path / "output" / "year" / "results.xlsx")
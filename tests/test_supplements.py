@@ -0,0 +1,58 @@
+import os
+
+import pandas as pd
+
+import main
+import supplements
+
+
+def combined() -> pd.DataFrame:
+    """
+    This function creates combined rows of two years with the columns of main.COLUMN_NAMES before the types
+    are converted.
+    """
+    return pd.DataFrame(
+        {
+            "Gesamt Platz": ["1.", "2.", "1."],
+            "Platz AK": ["1.M40", "1.W35", "1.M30"],
+            "Startnummer": ["101", "102", "101"],
+            "Name": ["A", "B", "C"],
+            "Vorname1": ["Anna", "Bert", "Carl"],
+            "Vorname2": ["nan", "nan", "nan"],
+            "Jahrgang": ["1970", "1980", "1990"],
+            "Geschlecht": ["m", "w", "m"],
+            "Zeit": ["37:09", "38:10", "36:00"],
+            "Jahr": ["2012", "2012", "2023"],
+        }
+    )
+
+
+def test_a_new_column_is_added(tmp_path):
+    clubs = tmp_path / "clubs.csv"
+    pd.DataFrame({"Startnummer": [101], "Verein": ["LT Haco"]}).to_csv(clubs, index=False)
+    lookups = supplements.load_supplements([("2012", str(clubs), ["Verein"])], str(tmp_path / "cache"))
+
+    df = main.convert_column_types(supplements.apply_supplements(combined(), lookups))
+    assert df["Verein"].tolist()[0] == "LT Haco"
+    assert df["Verein"].iloc[1:].isna().all()
+
+    # Rows of a year without the table get the column as well, e.g. the pages of another PDF file
+    page = supplements.apply_supplements(combined().iloc[2:].copy(), lookups)
+    assert "Verein" in page.columns and page["Verein"].isna().all()
+
+
+def test_the_cache_keeps_only_the_tables_in_use(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    clubs = tmp_path / "clubs.csv"
+    pd.DataFrame({"Startnummer": [101], "Verein": ["LT Haco"]}).to_csv(clubs, index=False)
+    supplements.load_supplements([("2012", str(clubs), ["Verein"])], cache_dir)
+    first = os.listdir(cache_dir)
+
+    # A changed file gets a new cache file and the old one is removed
+    pd.DataFrame({"Startnummer": [101], "Verein": ["TV Haco"]}).to_csv(clubs, index=False)
+    lookups = supplements.load_supplements([("2012", str(clubs), ["Verein"])], cache_dir)
+    assert len(os.listdir(cache_dir)) == 1 and os.listdir(cache_dir) != first
+    assert lookups["2012"][0].loc[101, "Verein"] == "TV Haco"
+
+    supplements.load_supplements([], cache_dir)
+    assert os.listdir(cache_dir) == []
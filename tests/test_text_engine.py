@@ -0,0 +1,65 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+import main
+import synthetic
+import text_engine
+from validation import UNPARSED_LINE, QualityReport
+
+
+def combined(pages):
+    """
+    This function combines processed pages into the combined dataframe with the data types of the schema.
+    """
+    return main.convert_column_types(main.combine_dataframes(pages))
+
+
+@pytest.mark.parametrize("layout, year", [("2012", 2030), ("2023", 2031)])
+def test_the_text_engine_matches_tabula_on_a_synthetic_list(layout, year):
+    results = synthetic.generate_results(120, year, layout, seed=year)
+
+    # The raw tables as tabula reads them, cleaned like the tabula engine does
+    tables = synthetic.to_raw_tables(results, layout)
+    for table in tables:
+        table.insert(len(table.columns), "Jahr", str(year))
+    tabula_pages = [main.clean_table(table, i) for i, table in enumerate(tables)]
+
+    text_pages = [text_engine.parse_page(lines, str(year)) for lines in synthetic.to_text_lines(results, layout)]
+    assert all(page.attrs["unparsed_lines"] == [] for page in text_pages)
+    pd.testing.assert_frame_equal(combined(text_pages), combined(tabula_pages))
+
+
+@pytest.mark.skipif(shutil.which("java") is None, reason="tabula needs Java")
+def test_the_text_engine_matches_tabula_on_the_result_lists():
+    pdf_dir = main.get_pdf_dir()
+    for filename, year in main.filenames_and_prefix_from_dir(pdf_dir).items():
+        tabula_pages, _ = main.extract_pdf(os.path.join(pdf_dir, filename), year, False)
+        text_pages, _ = text_engine.extract_pdf(os.path.join(pdf_dir, filename), year, False)
+        tabula_pages = [main.clean_table(df, i) for i, df in enumerate(tabula_pages)]
+        pd.testing.assert_frame_equal(combined(text_pages), combined(tabula_pages))
+
+
+def test_lines_that_look_like_rows_are_reported():
+    lines = synthetic.to_text_lines(synthetic.generate_results(5, 2031, "2023", seed=1), "2023")[0]
+    row = next(i for i, line in enumerate(lines) if line.startswith("3. "))
+
+    # A changed layout without the comma between the surname and the first names
+    lines[row] = lines[row].replace(",", "", 1)
+    page = text_engine.parse_page(lines, "2031")
+    assert len(page) == 4
+    assert page.attrs["unparsed_lines"] == [lines[row]]
+
+    quality = QualityReport()
+    quality.add_unparsed_lines("2031.pdf", page.attrs["unparsed_lines"])
+    assert quality.summary()[UNPARSED_LINE].tolist() == [1]
+    assert quality.quarantine()["line"].tolist() == [lines[row]]
+
+
+@pytest.mark.parametrize("engine, warned", [("tabula", True), ("text", False)])
+def test_the_jvm_warning_is_only_printed_for_tabula(engine, warned, monkeypatch, capsys):
+    monkeypatch.setattr(main, "tabula_uses_persistent_jvm", lambda: False)
+    main.print_extraction_timings({"2023.pdf": 1.0}, engine)
+    assert ("JPype is not installed" in capsys.readouterr().out) == warned
@@ -0,0 +1,142 @@
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import main
+import supplements
+from race_times import RACE_TIME_PATTERN
+
+
+def gender_loop(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    This function is the row by row version of main.update_column8_gender before it was vectorized.
+    """
+    df = df.reset_index(drop=True)
+    for index, row in df.iterrows():
+        if "m" in str(row.iloc[1]).lower():
+            df.iloc[index, 7] = "m"
+        elif "w" in str(row.iloc[1]).lower():
+            df.iloc[index, 7] = "w"
+    return df
+
+
+def time_formats_loop(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    This function is the row by row version of main.get_time_formats_in_columns: every cell from the 9th column on,
+    except the last column, is replaced by the first time found in it or NaN.
+    """
+    df = df.copy()
+    for k in range(8, df.shape[1] - 1):
+        for index in range(len(df)):
+            matches = re.findall(RACE_TIME_PATTERN, str(df.iloc[index, k]))
+            df.iloc[index, k] = matches[0] if matches else np.nan
+    return df
+
+
+def jahrgang_loop(df: pd.DataFrame, dic_jahrgang: dict) -> pd.DataFrame:
+    """
+    This function is the row by row version of the 2012 Jahrgang lookup before it was vectorized.
+    """
+    df = df.copy()
+    for index, row in df.iterrows():
+        key = row["Startnummer"]
+        if key in dic_jahrgang and df.at[index, "Jahr"] == "2012":
+            df.at[index, "Jahrgang"] = dic_jahrgang[key]
+    return df
+
+
+def page(age_classes: list, genders: list) -> pd.DataFrame:
+    """
+    This function creates a page with the age class place in the 2nd column and the gender in the 8th column.
+    """
+    rows = len(age_classes)
+    columns = {k: [f"c{k}"] * rows for k in range(10)}
+    columns[1] = age_classes
+    columns[7] = genders
+    return pd.DataFrame(columns)
+
+
+def test_gender_m_wins_over_w():
+    df = page(["1.MW", "2.W35", "3.M40", "4.mw"], ["x", "x", "x", "x"])
+    result = main.update_column8_gender(df.copy())
+    pd.testing.assert_frame_equal(result, gender_loop(df))
+    assert list(result.iloc[:, 7]) == ["m", "w", "m", "m"]
+
+
+def test_gender_rows_without_m_or_w_keep_their_value():
+    df = page(["1.", np.nan, "2.W", "3.K"], ["old", None, "old", "kept"])
+    result = main.update_column8_gender(df.copy())
+    pd.testing.assert_frame_equal(result, gender_loop(df))
+    assert list(result.iloc[:, 7]) == ["old", None, "w", "kept"]
+
+
+def test_gender_resets_the_index():
+    df = page(["1.M", "2.W"], ["", ""])
+    df.index = [5, 9]
+    result = main.update_column8_gender(df.copy())
+    pd.testing.assert_frame_equal(result, gender_loop(df))
+
+
+def test_time_formats_match_the_loop():
+    df = page(["1.M"] * 5, ["m"] * 5)
+    df[8] = ["37:09", "1:05:56 ", "58:23,3", "DNF", np.nan]
+    df[9] = ["x 12:34 y 56:07", "", "no time", "2:03:04,55", "1234"]
+    df[10] = ["10:00", "10:00", "10:00", "10:00", "10:00"]
+    result = main.get_time_formats_in_columns(df.copy())
+    pd.testing.assert_frame_equal(result, time_formats_loop(df), check_dtype=False)
+
+
+def test_time_formats_cells_without_time_become_nan():
+    df = page(["1.M"] * 3, ["m"] * 3)
+    df[8] = ["DNF", "", None]
+    df[9] = ["2012", "2012", "2012"]
+    result = main.get_time_formats_in_columns(df.copy())
+    assert result.iloc[:, 8].isna().all()
+    # The last column is not checked
+    assert list(result.iloc[:, 9]) == ["2012", "2012", "2012"]
+
+
+@pytest.fixture
+def jahrgang_2012(tmp_path):
+    """
+    This fixture writes a 2012 Jahrgang table like data/raw/2012_Name_Jahrgang.xlsx and returns its path.
+    """
+    path = tmp_path / "2012_Name_Jahrgang.xlsx"
+    table = pd.DataFrame({"Startnummer": [101, 102, 103], "Name": ["A", "B", "C"], "Jahrgang": [1970, 1980, 1990]})
+    table.to_excel(path, index=False)
+    return str(path)
+
+
+def combined() -> pd.DataFrame:
+    """
+    This function creates combined rows of 2012 and 2023 before the data types are converted.
+    """
+    return pd.DataFrame(
+        {
+            "Startnummer": ["101", "102", "999", "101", "abc"],
+            "Jahrgang": ["1900", "1900", "1900", "1900", "1900"],
+            "Jahr": ["2012", "2012", "2012", "2023", "2012"],
+        }
+    )
+
+
+def test_jahrgang_2012_matches_the_loop(jahrgang_2012, tmp_path):
+    lookups = supplements.load_supplements([("2012", jahrgang_2012, ["Jahrgang"])], str(tmp_path / "cache"))
+    table = pd.read_excel(jahrgang_2012, engine="openpyxl")
+    dic_jahrgang = dict(zip(table["Startnummer"].astype(str), table["Jahrgang"]))
+
+    result = supplements.apply_supplements(combined(), lookups)
+    expected = jahrgang_loop(combined(), dic_jahrgang)
+    pd.testing.assert_frame_equal(result.astype(str), expected.astype(str))
+    assert list(result["Jahrgang"].astype(str)) == ["1970", "1980", "1900", "1900", "1900"]
+
+
+def test_jahrgang_2012_without_the_excel_file(tmp_path):
+    missing = str(tmp_path / "2012_Name_Jahrgang.xlsx")
+    lookups = supplements.load_supplements([("2012", missing, ["Jahrgang"])], str(tmp_path / "cache"))
+    assert lookups == {}
+
+    result = supplements.apply_supplements(combined(), lookups)
+    pd.testing.assert_frame_equal(result, combined())